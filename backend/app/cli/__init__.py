@@ -0,0 +1,4 @@
+"""Command-line maintenance jobs.
+
+Each module is runnable with ``python -m app.cli.<name>``.
+"""
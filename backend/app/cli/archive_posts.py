@@ -0,0 +1,53 @@
+"""Move deleted posts into the posts_archive table.
+
+Usage:
+    python -m app.cli.archive_posts [--unpublished-days 90] [--batch-size 500]
+
+Runs the same batched archiver as the optional background task (see
+POST_ARCHIVE_INTERVAL_SECONDS) once, until nothing is left to archive.
+"""
+
+import argparse
+import asyncio
+from datetime import timedelta
+
+from ..database import AsyncSessionLocal, async_engine
+from ..services.archive import ARCHIVE_BATCH_SIZE, run_archiver
+
+
+async def run(unpublished_days: int | None, batch_size: int) -> int:
+    """Archive all archivable posts.
+
+    Args:
+        unpublished_days: Also archive posts unpublished for this many days.
+        batch_size: Posts moved per transaction.
+
+    Returns:
+        Number of posts archived.
+    """
+    try:
+        return await run_archiver(
+            AsyncSessionLocal,
+            timedelta(days=unpublished_days) if unpublished_days is not None else None,
+            batch_size
+        )
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    """Archive posts and print how many were moved."""
+    parser = argparse.ArgumentParser(description="Move deleted posts into posts_archive.")
+    parser.add_argument(
+        "--unpublished-days",
+        type=int,
+        default=None,
+        help="Also archive posts unpublished for this many days"
+    )
+    parser.add_argument("--batch-size", type=int, default=ARCHIVE_BATCH_SIZE)
+    args = parser.parse_args()
+    print(f"archived: {asyncio.run(run(args.unpublished_days, args.batch_size))}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+"""Recompute the row counters from the source tables.
+
+Usage:
+    python -m app.cli.reconcile_counters
+
+Intended to run periodically (e.g. from cron) to repair any drift
+between ``row_counters`` and the real table sizes.
+"""
+
+import asyncio
+
+from ..database import AsyncSessionLocal, async_engine
+from ..services.counters import reconcile_counters
+
+
+async def run() -> dict[str, int]:
+    """Reconcile all counters.
+
+    Returns:
+        Mapping of counter name to its reconciled value.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            return await reconcile_counters(db)
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    """Reconcile all counters and print their values."""
+    for name, value in sorted(asyncio.run(run()).items()):
+        print(f"{name}: {value}")
+
+
+if __name__ == "__main__":
+    main()
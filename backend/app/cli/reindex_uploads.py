@@ -0,0 +1,37 @@
+"""Rebuild the upload metadata index from the upload directory.
+
+Usage:
+    python -m app.cli.reindex_uploads
+
+Adds rows for files that are on disk but not indexed (with an unknown
+owner) and removes rows whose file no longer exists.
+"""
+
+import asyncio
+
+from ..database import AsyncSessionLocal, async_engine
+from ..routers.files import UPLOAD_DIRECTORY
+from ..services.uploads import reindex_uploads
+
+
+async def run() -> dict[str, int]:
+    """Reindex the upload directory.
+
+    Returns:
+        Counts of added, removed and total uploads.
+    """
+    try:
+        async with AsyncSessionLocal() as db:
+            return await reindex_uploads(db, UPLOAD_DIRECTORY)
+    finally:
+        await async_engine.dispose()
+
+
+def main() -> None:
+    """Reindex uploads and print a summary."""
+    result = asyncio.run(run())
+    print(f"added: {result['added']}, removed: {result['removed']}, total: {result['total']}")
+
+
+if __name__ == "__main__":
+    main()
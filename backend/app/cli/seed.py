@@ -0,0 +1,91 @@
+"""Load a large synthetic dataset for performance testing.
+
+Usage:
+    python -m app.cli.seed --users 1000000 --posts 10000000 --files 100000
+
+Writes to the database in ``DATABASE_URL`` (creating missing tables) and
+to the upload directory. Every seeded user's password is ``--password``.
+Never point this at a production database.
+"""
+
+import argparse
+import asyncio
+import random
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from ..database import AsyncSessionLocal, Base, async_engine, engine
+from ..routers.files import UPLOAD_DIRECTORY
+from ..services.counters import reconcile_counters
+from ..services.seeding import seed_posts, seed_uploads, seed_users, tune_for_bulk_load
+
+DEFAULT_PASSWORD = "password123"
+
+
+def parse_args(argv: list[str] | None = None) -> argparse.Namespace:
+    """Parse command-line options."""
+    parser = argparse.ArgumentParser(description="Load a synthetic dataset.")
+    parser.add_argument("--users", type=int, default=10_000, help="Users to create")
+    parser.add_argument("--posts", type=int, default=100_000, help="Posts to create")
+    parser.add_argument("--files", type=int, default=1_000, help="Uploaded files to create")
+    parser.add_argument("--password", default=DEFAULT_PASSWORD, help="Password of every user")
+    parser.add_argument(
+        "--skew",
+        type=float,
+        default=3.0,
+        help="Authorship skew exponent; 1.0 spreads posts evenly over users"
+    )
+    parser.add_argument("--upload-dir", type=Path, default=UPLOAD_DIRECTORY)
+    parser.add_argument("--seed", type=int, default=None, help="Random seed for repeatable data")
+    return parser.parse_args(argv)
+
+
+async def _reconcile() -> dict[str, int]:
+    """Bring the row counters in line with the seeded tables."""
+    try:
+        async with AsyncSessionLocal() as db:
+            return await reconcile_counters(db)
+    finally:
+        await async_engine.dispose()
+
+
+def run(args: argparse.Namespace) -> dict[str, int]:
+    """Create the tables and load the dataset.
+
+    Args:
+        args: Parsed command-line options.
+
+    Returns:
+        Number of rows created per table.
+    """
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc).replace(tzinfo=None)
+    tune_for_bulk_load(engine)
+    Base.metadata.create_all(bind=engine)
+
+    started = time.perf_counter()
+    user_ids = seed_users(engine, args.users, args.password, rng, now)
+    print(f"users: {len(user_ids)} in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    posts = seed_posts(engine, args.posts, user_ids, rng, now, skew=args.skew) if args.posts else 0
+    print(f"posts: {posts} in {time.perf_counter() - started:.1f}s")
+
+    started = time.perf_counter()
+    files = seed_uploads(
+        engine, args.files, user_ids, args.upload_dir, rng, now, skew=args.skew
+    )
+    print(f"files: {files} in {time.perf_counter() - started:.1f}s")
+
+    asyncio.run(_reconcile())
+    return {"users": len(user_ids), "posts": posts, "uploads": files}
+
+
+def main(argv: list[str] | None = None) -> None:
+    """Load the dataset and print per-table timings."""
+    run(parse_args(argv))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,37 +1,242 @@
 """Database connection and session management."""
 
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
-from typing import Generator
+import random
+from typing import Annotated, Any, AsyncGenerator, Sequence
+
+from fastapi import Depends, Request, Response
+from sqlalchemy import Engine, create_engine
+from sqlalchemy.ext.asyncio import (
+    AsyncEngine,
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
+from sqlalchemy.sql.dml import UpdateBase
 from .config import settings
+from .utils.pool_metrics import instrument_engine, instrumented_pool_class
+
+# Sync drivers mapped to their asyncio counterparts
+ASYNC_DRIVERS = {
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    """Convert a sync database URL to one using an asyncio driver.
+
+    Args:
+        url: SQLAlchemy database URL, e.g. ``mysql+pymysql://...``.
+
+    Returns:
+        The same URL with the driver swapped, e.g. ``mysql+aiomysql://...``.
+        URLs that already name an async driver are returned unchanged.
+    """
+    scheme, sep, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
 
-# Create database engine with connection pooling
+# Create sync database engine with connection pooling (CLI jobs and scripts)
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,  # Test connections before using
-    pool_size=5,
-    max_overflow=10,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
     echo=settings.DEBUG  # Log SQL queries in debug mode
 )
 
-# Session factory
+def make_async_engine(url: str, name: str) -> AsyncEngine:
+    """Create an instrumented async engine with the configured pool settings.
+
+    Args:
+        url: SQLAlchemy database URL (sync drivers are swapped for async ones).
+        name: Label the engine's pool metrics are reported under.
+
+    Returns:
+        The async engine.
+    """
+    new_engine = create_async_engine(
+        to_async_url(url),
+        poolclass=instrumented_pool_class(name),
+        pool_pre_ping=True,
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        echo=settings.DEBUG
+    )
+    instrument_engine(new_engine, settings.DB_MAX_OVERFLOW)
+    return new_engine
+
+
+# Async engine used by the API request handlers (the primary)
+async_engine = make_async_engine(
+    settings.ASYNC_DATABASE_URL or settings.DATABASE_URL, "primary"
+)
+
+# Optional read replicas for GET handlers
+replica_engines = [
+    make_async_engine(url, f"replica-{index}")
+    for index, url in enumerate(settings.DATABASE_REPLICA_URLS)
+]
+
+# Session.info flag marking a session whose reads may go to a replica
+USE_REPLICA = "use_replica"
+
+# Cookie that pins a client to the primary for a while after it writes
+PRIMARY_STICKY_COOKIE = "db_primary"
+
+SAFE_METHODS = {"GET", "HEAD", "OPTIONS"}
+
+
+class RoutingSession(Session):
+    """Session that can send reads to a read replica.
+
+    Sessions flagged with ``info[USE_REPLICA]`` run SELECTs on one
+    replica (chosen once per session, so a request sees a consistent
+    snapshot). Writes, flushes and unflagged sessions use the primary.
+    """
+
+    def __init__(self, *args: Any, replicas: Sequence[Engine] = (), **kwargs: Any) -> None:
+        """Initialize the session.
+
+        Args:
+            *args: Positional arguments for Session.
+            replicas: Sync engines of the read replicas.
+            **kwargs: Keyword arguments for Session.
+        """
+        super().__init__(*args, **kwargs)
+        self.replicas = list(replicas)
+        self._replica: Engine | None = None
+
+    def get_bind(self, mapper=None, clause=None, **kwargs: Any):
+        """Pick the engine for a statement.
+
+        Returns:
+            A replica engine for reads in replica sessions, else the primary.
+        """
+        if (
+            self.replicas
+            and self.info.get(USE_REPLICA)
+            and not self._flushing
+            and not isinstance(clause, UpdateBase)
+        ):
+            if self._replica is None:
+                self._replica = random.choice(self.replicas)
+            return self._replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+def reads_from_replica(db: AsyncSession) -> bool:
+    """Tell whether a session's reads may be served by a replica.
+
+    Args:
+        db: Database session.
+
+    Returns:
+        True if the session is flagged for replica reads and replicas exist.
+    """
+    return bool(db.info.get(USE_REPLICA) and getattr(db.sync_session, "replicas", None))
+
+
+def make_session_factory(
+    primary: AsyncEngine, replicas: Sequence[AsyncEngine] = ()
+) -> async_sessionmaker[AsyncSession]:
+    """Create a session factory routing between a primary and replicas.
+
+    Args:
+        primary: Engine for writes and primary reads.
+        replicas: Engines of the read replicas (may be empty).
+
+    Returns:
+        The async session factory.
+    """
+    return async_sessionmaker(
+        primary,
+        sync_session_class=RoutingSession,
+        replicas=[replica.sync_engine for replica in replicas],
+        autoflush=False,
+        expire_on_commit=False  # Handlers return ORM objects after commit
+    )
+
+
+# Session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = make_session_factory(async_engine, replica_engines)
 
 # Base class for declarative models
 Base = declarative_base()
 
 
-def get_db() -> Generator:
-    """Get database session.
+def get_session_factory() -> async_sessionmaker[AsyncSession]:
+    """Get the async session factory.
+
+    Dependency for endpoints that must open their own sessions, such as
+    streaming responses that outlive the request-scoped session.
+
+    Returns:
+        The async session factory.
+    """
+    return AsyncSessionLocal
+
+
+async def get_db(
+    request: Request,
+    response: Response,
+    session_factory: Annotated[async_sessionmaker[AsyncSession], Depends(get_session_factory)]
+) -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session on the primary.
 
     Dependency for FastAPI endpoints that provides a database session
-    and ensures it's properly closed after the request.
+    and ensures it's properly closed after the request. When replicas
+    are configured, unsafe requests pin the client to the primary for
+    REPLICA_STICKY_SECONDS so it reads its own writes.
+
+    Args:
+        request: Incoming request.
+        response: Response to set the stickiness cookie on.
+        session_factory: Factory for the session.
+
+    Yields:
+        AsyncSession: SQLAlchemy async database session.
+    """
+    if (
+        session_factory.kw.get("replicas")
+        and request.method not in SAFE_METHODS
+        and settings.REPLICA_STICKY_SECONDS > 0
+    ):
+        response.set_cookie(
+            PRIMARY_STICKY_COOKIE,
+            "1",
+            max_age=int(settings.REPLICA_STICKY_SECONDS),
+            httponly=True,
+            samesite="lax"
+        )
+    async with session_factory() as db:
+        yield db
+
+
+async def get_read_db(
+    request: Request,
+    session_factory: Annotated[async_sessionmaker[AsyncSession], Depends(get_session_factory)]
+) -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session whose reads may go to a replica.
+
+    Dependency for read-only endpoints. Clients that wrote recently
+    (see :func:`get_db`) keep reading from the primary. Any write made
+    through the session still goes to the primary.
+
+    Args:
+        request: Incoming request.
+        session_factory: Factory for the session.
 
     Yields:
-        Session: SQLAlchemy database session.
+        AsyncSession: SQLAlchemy async database session.
     """
-    db = SessionLocal()
-    try:
+    sticky = PRIMARY_STICKY_COOKIE in request.cookies
+    async with session_factory(info={USE_REPLICA: not sticky}) as db:
         yield db
-    finally:
-        db.close()
@@ -1,38 +1,98 @@
 """Authentication dependencies."""
 
+import hashlib
+import time
 from typing import Annotated
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.config import settings
 from app.database import get_db
 from app.models.user import User
+from app.schemas.auth import CurrentUser
+from app.services.invalidation import cache_invalidator
+from app.utils.cache import TTLCache
 from app.utils.jwt import verify_access_token
 
 # Security scheme for bearer token
 security = HTTPBearer()
 
+# Verified token payloads keyed by SHA-256 of the token; entries expire
+# at the token's own ``exp`` so an expired token is never served
+token_cache = TTLCache(max_size=settings.JWT_CACHE_SIZE, name="token")
 
-def get_current_user(
+# User identities keyed by user ID. Writes in this process invalidate
+# entries immediately, other workers on their next invalidation poll
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_SIZE,
+    default_ttl=settings.USER_CACHE_TTL_SECONDS,
+    name="user"
+)
+cache_invalidator.register("user", user_cache)
+
+
+def invalidate_user_cache(user_id: int) -> None:
+    """Drop a cached user identity after the user is changed or deleted.
+
+    Only affects this process; the write must also call
+    ``publish_invalidation(db, "user", user_id)`` before committing so
+    that other workers drop theirs.
+
+    Args:
+        user_id: ID of the user whose identity is stale.
+    """
+    user_cache.delete(user_id)
+
+
+def verify_access_token_cached(token: str) -> dict:
+    """Verify a JWT, reusing the payload of a previously verified token.
+
+    Args:
+        token: JWT access token.
+
+    Returns:
+        Decoded token payload.
+
+    Raises:
+        HTTPException: 401 if the token is invalid or expired.
+    """
+    key = hashlib.sha256(token.encode("utf-8")).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
+        return payload
+
+    payload = verify_access_token(token)
+    exp = payload.get("exp")
+    if isinstance(exp, (int, float)):
+        token_cache.set(key, payload, ttl=exp - time.time())
+    return payload
+
+
+async def get_current_user(
     credentials: Annotated[HTTPAuthorizationCredentials, Depends(security)],
-    db: Annotated[Session, Depends(get_db)]
-) -> User:
+    db: Annotated[AsyncSession, Depends(get_db)]
+) -> CurrentUser:
     """Get current authenticated user from JWT token.
-    
+
+    The user's identity is served from a TTL cache when possible, so
+    most authenticated requests do not query the users table.
+
     Args:
         credentials: HTTP Authorization credentials (Bearer token).
         db: Database session.
-        
+
     Returns:
-        Current authenticated User object.
-        
+        Identity of the current authenticated user.
+
     Raises:
         HTTPException: 401 if token is invalid or user not found.
+        HTTPException: 403 if the user account is inactive.
     """
     token = credentials.credentials
     
     # Verify token and get payload
-    payload = verify_access_token(token)
+    payload = verify_access_token_cached(token)
     
     # Get user_id from token payload
     user_id: str = payload.get("sub")
@@ -43,13 +103,25 @@ def get_current_user(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Get user from database
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    # Get user from cache, falling back to the database
+    user = user_cache.get(int(user_id))
     if user is None:
+        generation = user_cache.generation
+        db_user = await db.get(User, int(user_id))
+        if db_user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user = CurrentUser.model_validate(db_user)
+        # Not cached if the user changed while it was being loaded
+        user_cache.set(user.id, user, generation=generation)
+
+    if not user.is_active:
         raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="User not found",
-            headers={"WWW-Authenticate": "Bearer"},
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Inactive user",
         )
-    
+
     return user
\ No newline at end of file
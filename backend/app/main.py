@@ -1,11 +1,30 @@
 """FastAPI application entry point."""
 
+import asyncio
+import logging
+import time
+from datetime import timedelta
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from .config import settings
-from .database import engine, Base
-from .routers import users_router, posts_router, files_router, auth_router
+from .database import AsyncSessionLocal, async_engine, replica_engines, Base
+from .middleware import (
+    BodySizeLimitMiddleware,
+    RequestMetricsMiddleware,
+    SQLAccountingMiddleware,
+)
+from .routers import users_router, posts_router, files_router, auth_router, metrics_router
+from .routers.files import MAX_UPLOAD_BODY_SIZE, UPLOAD_DIRECTORY
+from .services.archive import archive_periodically
+from .services.hashing import password_hasher
+from .services.invalidation import cache_invalidator
+from .services.schema import ensure_schema
+from .services.uploads import purge_blobs_periodically
+from .utils.prometheus import STARTUP_DURATION, mark_worker_dead
+
+logger = logging.getLogger(__name__)
 
 # Create FastAPI application
 app = FastAPI(
@@ -15,7 +34,17 @@ app = FastAPI(
     debug=settings.DEBUG
 )
 
-# Configure CORS
+# Count SQL statements per request (Server-Timing header, N+1 warnings)
+app.add_middleware(SQLAccountingMiddleware)
+
+# Refuse oversized uploads before their body is read
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_body_size=MAX_UPLOAD_BODY_SIZE,
+    path_prefix="/api/v1/files/upload"
+)
+
+# Configure CORS (added last so it also wraps early rejections)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["*"],  # Configure appropriately for production
@@ -24,15 +53,61 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Record request metrics (outermost, so every response is counted)
+app.add_middleware(RequestMetricsMiddleware)
+
 
 @app.on_event("startup")
-def startup_event() -> None:
-    """Create database tables on application startup.
+async def startup_event() -> None:
+    """Make sure the database schema is current, then report the startup time.
+
+    Only compares the stored schema fingerprint unless the models changed
+    (see app.services.schema); one worker then creates the missing tables.
+    """
+    start = time.perf_counter()
+    outcome = await ensure_schema(
+        async_engine, Base.metadata, lock_timeout=settings.SCHEMA_LOCK_TIMEOUT_SECONDS
+    )
+    elapsed = time.perf_counter() - start
+    STARTUP_DURATION.labels(outcome).set(elapsed)
+    logger.info("Startup finished in %.3fs (schema %s)", elapsed, outcome)
+
+    if settings.CACHE_INVALIDATION_POLL_SECONDS > 0:
+        app.state.cache_invalidator = asyncio.create_task(cache_invalidator.run(
+            async_engine, settings.CACHE_INVALIDATION_POLL_SECONDS
+        ))
+
+    if settings.POST_ARCHIVE_INTERVAL_SECONDS > 0:
+        days = settings.POST_ARCHIVE_UNPUBLISHED_DAYS
+        app.state.post_archiver = asyncio.create_task(archive_periodically(
+            async_engine,
+            AsyncSessionLocal,
+            settings.POST_ARCHIVE_INTERVAL_SECONDS,
+            timedelta(days=days) if days is not None else None,
+            settings.POST_ARCHIVE_BATCH_SIZE
+        ))
+    if settings.UPLOAD_STORAGE_MODE == "cas" and settings.BLOB_PURGE_INTERVAL_SECONDS > 0:
+        app.state.blob_purger = asyncio.create_task(purge_blobs_periodically(
+            AsyncSessionLocal, UPLOAD_DIRECTORY, settings.BLOB_PURGE_INTERVAL_SECONDS
+        ))
+
+
+@app.on_event("shutdown")
+async def shutdown_event() -> None:
+    """Close pooled database connections and hashing workers on shutdown.
 
-    This creates all tables defined in SQLAlchemy models.
-    For production, consider using Alembic migrations instead.
+    Also stops the background tasks and retires this worker's live
+    gauges from the multiprocess metrics.
     """
-    Base.metadata.create_all(bind=engine)
+    for name in ("cache_invalidator", "post_archiver", "blob_purger"):
+        task = getattr(app.state, name, None)
+        if task is not None:
+            task.cancel()
+    await async_engine.dispose()
+    for replica_engine in replica_engines:
+        await replica_engine.dispose()
+    password_hasher.shutdown()
+    mark_worker_dead()
 
 
 @app.get("/health", tags=["health"])
@@ -53,4 +128,5 @@ def health_check() -> dict:
 app.include_router(auth_router)
 app.include_router(users_router)
 app.include_router(posts_router)
-app.include_router(files_router)
\ No newline at end of file
+app.include_router(files_router)
+app.include_router(metrics_router)
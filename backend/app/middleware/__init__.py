@@ -0,0 +1,7 @@
+"""ASGI middleware package."""
+
+from .body_limit import BodySizeLimitMiddleware
+from .request_metrics import RequestMetricsMiddleware
+from .sql_accounting import SQLAccountingMiddleware
+
+__all__ = ["BodySizeLimitMiddleware", "RequestMetricsMiddleware", "SQLAccountingMiddleware"]
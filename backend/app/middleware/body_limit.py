@@ -0,0 +1,97 @@
+"""Early rejection of oversized request bodies."""
+
+import json
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+class _BodyTooLarge(Exception):
+    """Raised from ``receive`` once a body passes the size limit."""
+
+
+class BodySizeLimitMiddleware:
+    """Reject requests whose body is too large.
+
+    A declared ``Content-Length`` is checked before the body is read, so
+    an oversized upload is refused without spooling any of it. Bodies
+    without one (chunked uploads) are counted as they are received, and
+    refused as soon as the running total passes the limit.
+
+    Attributes:
+        max_body_size: Largest accepted body in bytes.
+        path_prefix: Only requests under this path are checked.
+    """
+
+    def __init__(self, app: ASGIApp, max_body_size: int, path_prefix: str = "/") -> None:
+        """Wrap an ASGI application.
+
+        Args:
+            app: The ASGI application to wrap.
+            max_body_size: Largest accepted body in bytes.
+            path_prefix: Only requests under this path are checked.
+        """
+        self.app = app
+        self.max_body_size = max_body_size
+        self.path_prefix = path_prefix
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI request."""
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefix):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = dict(scope["headers"]).get(b"content-length")
+        if content_length is not None:
+            try:
+                too_large = int(content_length) > self.max_body_size
+            except ValueError:
+                too_large = False
+            if too_large:
+                await self._reject(send)
+                return
+
+        received = 0
+        exceeded = False
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_body_size:
+                    exceeded = True
+                    raise _BodyTooLarge()
+            return message
+
+        async def guarded_send(message: Message) -> None:
+            nonlocal response_started
+            if exceeded:
+                # Whatever the app answers to the aborted read (e.g. a 400
+                # for a body it could not parse) is replaced by the 413
+                return
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, guarded_send)
+        except Exception:
+            if not exceeded:
+                raise
+        if exceeded and not response_started:
+            await self._reject(send)
+
+    async def _reject(self, send: Send) -> None:
+        """Send a 413 response without reading the request body."""
+        body = json.dumps({"detail": "Request body too large"}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("ascii")),
+                (b"connection", b"close"),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,58 @@
+"""Per-route request count and latency metrics."""
+
+import time
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..utils.prometheus import REQUEST_DURATION, REQUESTS_IN_PROGRESS, REQUESTS_TOTAL
+
+# Route label for requests that matched no route (404s, early rejections),
+# so that arbitrary paths cannot blow up the label cardinality
+UNMATCHED_ROUTE = "unmatched"
+
+
+class RequestMetricsMiddleware:
+    """Record request count, in-flight requests and latency per route.
+
+    Requests are labelled with the route template (e.g.
+    ``/api/v1/posts/{post_id}``) rather than the raw path, plus the method
+    and response status. Latency covers the whole response, including
+    streamed bodies.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        """Wrap an ASGI application.
+
+        Args:
+            app: The ASGI application to wrap.
+        """
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        method = scope["method"]
+        in_progress = REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            elapsed = time.perf_counter() - start
+            in_progress.dec()
+            # The router stores the matched route in the (shared) scope
+            route = getattr(scope.get("route"), "path", None) or UNMATCHED_ROUTE
+            labels = (method, route, str(status_code))
+            REQUESTS_TOTAL.labels(*labels).inc()
+            REQUEST_DURATION.labels(*labels).observe(elapsed)
@@ -0,0 +1,66 @@
+"""Per-request SQL accounting with N+1 detection."""
+
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from ..config import settings
+from ..utils.sql_accounting import track_queries
+
+logger = logging.getLogger(__name__)
+
+
+class SQLAccountingMiddleware:
+    """Count the SQL statements of each request and report them.
+
+    Adds a ``Server-Timing`` header such as
+    ``db;dur=4.2;desc="3 queries, 1 repeated"`` (duration in
+    milliseconds) and logs a warning when one statement shape runs
+    ``repeat_threshold`` times or more in a request, the usual sign of an
+    N+1 query pattern. Statements run after the response headers are sent
+    (e.g. while streaming a body) are not included.
+
+    Attributes:
+        repeat_threshold: Executions of one statement shape that count as
+            repeated; None reads SQL_REPEAT_THRESHOLD on every request.
+    """
+
+    def __init__(self, app: ASGIApp, repeat_threshold: int | None = None) -> None:
+        """Wrap an ASGI application.
+
+        Args:
+            app: The ASGI application to wrap.
+            repeat_threshold: Executions of one statement shape that count
+                as repeated (defaults to the SQL_REPEAT_THRESHOLD setting).
+        """
+        self.app = app
+        self.repeat_threshold = repeat_threshold
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Handle an ASGI request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries() as stats:
+
+            async def send_with_timing(message: Message) -> None:
+                if message["type"] == "http.response.start" and stats.count:
+                    repeated = stats.repeated(
+                        self.repeat_threshold or settings.SQL_REPEAT_THRESHOLD
+                    )
+                    headers = MutableHeaders(scope=message)
+                    headers.append(
+                        "Server-Timing",
+                        f'db;dur={stats.duration * 1000:.1f};'
+                        f'desc="{stats.count} queries, {len(repeated)} repeated"'
+                    )
+                    for statement, count in repeated.items():
+                        logger.warning(
+                            "Possible N+1: %s %s ran %d times: %s",
+                            scope["method"], scope["path"], count, statement
+                        )
+                await send(message)
+
+            await self.app(scope, receive, send_with_timing)
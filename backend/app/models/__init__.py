@@ -1,6 +1,9 @@
 """Database models package."""
 
 from .user import User, UserRole
-from .post import Post
+from .post import Post, PostArchive, PostStatus
+from .counter import RowCounter
+from .upload import Upload, UploadBlob
+from .cache_invalidation import CacheInvalidation
 
-__all__ = ["User", "UserRole", "Post"]
+__all__ = ["User", "UserRole", "Post", "PostArchive", "PostStatus", "RowCounter", "Upload", "UploadBlob", "CacheInvalidation"]
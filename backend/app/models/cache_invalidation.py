@@ -0,0 +1,38 @@
+"""Cache invalidation log database model."""
+
+from datetime import datetime
+from sqlalchemy import String, BigInteger, Integer, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+from ..database import Base
+
+
+class CacheInvalidation(Base):
+    """Changed row whose cached copies every worker must drop.
+
+    Written and polled by app.services.invalidation.
+
+    Attributes:
+        id: Increasing sequence number; workers poll for ids they have not seen.
+        kind: Resource type of the row (e.g. ``user``).
+        key: Id (or stored name) of the row, as a string.
+        created_at: Timestamp (UTC) when the invalidation was published.
+    """
+
+    __tablename__ = "cache_invalidations"
+    __table_args__ = {"sqlite_autoincrement": True}
+
+    # SQLite only autoincrements an INTEGER primary key
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True
+    )
+    kind: Mapped[str] = mapped_column(String(32), nullable=False)
+    key: Mapped[str] = mapped_column(String(255), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, index=True)
+
+    def __repr__(self) -> str:
+        """String representation of CacheInvalidation.
+
+        Returns:
+            String representation showing id, kind and key.
+        """
+        return f"<CacheInvalidation(id={self.id}, kind='{self.kind}', key='{self.key}')>"
@@ -0,0 +1,27 @@
+"""Row counter database model."""
+
+from sqlalchemy import String, BigInteger
+from sqlalchemy.orm import Mapped, mapped_column
+from ..database import Base
+
+
+class RowCounter(Base):
+    """Incrementally maintained row count for a table or table slice.
+
+    Attributes:
+        name: Counter name (e.g. ``users`` or ``posts:published``).
+        value: Current number of rows.
+    """
+
+    __tablename__ = "row_counters"
+
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    value: Mapped[int] = mapped_column(BigInteger, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        """String representation of RowCounter.
+
+        Returns:
+            String representation showing name and value.
+        """
+        return f"<RowCounter(name='{self.name}', value={self.value})>"
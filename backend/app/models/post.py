@@ -2,11 +2,11 @@
 
 import enum
 from datetime import datetime
-from sqlalchemy import String, Text, DateTime, Enum, ForeignKey, func
+from sqlalchemy import DDL, String, Text, DateTime, Enum, ForeignKey, Index, event, func
 from sqlalchemy.orm import Mapped, mapped_column
 from ..database import Base
 
-class PostStatus(enum.Enum):
+class PostStatus(str, enum.Enum):
     """Post status enumeration.
     
     Attributes:
@@ -34,6 +34,21 @@ class Post(Base):
     """
 
     __tablename__ = "posts"
+    __table_args__ = (
+        # Filtered listings (see list_posts): equality on the leading column,
+        # range and order on created_at, id as the keyset tie-breaker
+        Index("ix_posts_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_posts_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_posts_created_at_id", "created_at", "id"),
+        # Full-text index for search; SQLite uses the posts_fts table instead
+        Index(
+            "ix_posts_title_content_fulltext", "title", "content", mysql_prefix="FULLTEXT"
+        ).ddl_if(dialect="mysql"),
+        # Never reuse the id of a removed (e.g. archived) post. Only takes
+        # effect when the table is created; InnoDB before MySQL 8.0 may
+        # still reuse ids after a restart, which the archiver tolerates
+        {"sqlite_autoincrement": True},
+    )
 
     # Primary key
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
@@ -70,3 +85,58 @@ class Post(Base):
             String representation showing title, status, and user_id.
         """
         return f"<Post(title='{self.title}', status={self.status}, user_id={self.user_id})>"
+
+
+class PostArchive(Base):
+    """Post moved out of ``posts`` by the archiver (see app.services.archive).
+
+    Keeps the post's original id, so that it can be restored in place.
+
+    Attributes:
+        id: Identifier the post had (and gets back on restore).
+        title: Title of the post.
+        content: Content of the post.
+        status: Status of the post when it was archived.
+        user_id: Identifier of the user who authored the post.
+        created_at: Timestamp when the post was created.
+        updated_at: Timestamp when the post was last updated.
+        archived_at: Timestamp when the post was archived.
+    """
+
+    __tablename__ = "posts_archive"
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=False)
+    title: Mapped[str] = mapped_column(String(200), nullable=False)
+    content: Mapped[str] = mapped_column(Text, nullable=False)
+    status: Mapped[PostStatus] = mapped_column(Enum(PostStatus), nullable=False)
+    user_id: Mapped[int] = mapped_column(nullable=False, index=True)
+    created_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
+    archived_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        """String representation of PostArchive.
+
+        Returns:
+            String representation showing id, status, and archived_at.
+        """
+        return f"<PostArchive(id={self.id}, status={self.status}, archived_at={self.archived_at})>"
+
+
+# SQLite has no FULLTEXT indexes; search uses an FTS5 table kept in sync
+# by app.services.search (rowid is the post id)
+event.listen(
+    Post.__table__,
+    "after_create",
+    DDL("CREATE VIRTUAL TABLE IF NOT EXISTS posts_fts USING fts5(title, content)")
+    .execute_if(dialect="sqlite")
+)
+event.listen(
+    Post.__table__,
+    "before_drop",
+    DDL("DROP TABLE IF EXISTS posts_fts").execute_if(dialect="sqlite")
+)
@@ -0,0 +1,93 @@
+"""Upload metadata database model."""
+
+from datetime import datetime
+from sqlalchemy import String, BigInteger, Integer, DateTime, ForeignKey, func
+from sqlalchemy.orm import Mapped, mapped_column
+from ..database import Base
+
+
+class UploadBlob(Base):
+    """Content-addressed file body shared by identical uploads.
+
+    Attributes:
+        sha256: Hex SHA-256 digest of the content (primary key).
+        size: Content size in bytes.
+        ref_count: Number of uploads referencing this blob.
+        created_at: Timestamp when the blob was first stored.
+    """
+
+    __tablename__ = "upload_blobs"
+
+    sha256: Mapped[str] = mapped_column(String(64), primary_key=True)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    ref_count: Mapped[int] = mapped_column(Integer, default=1, nullable=False)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.now(),
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        """String representation of UploadBlob.
+
+        Returns:
+            String representation showing digest and reference count.
+        """
+        return f"<UploadBlob(sha256='{self.sha256}', ref_count={self.ref_count})>"
+
+
+class Upload(Base):
+    """Metadata for a file stored in the upload directory.
+
+    Attributes:
+        id: Unique identifier for the upload.
+        stored_name: Name of the file on disk (with UUID prefix).
+        original_name: Filename as sent by the client.
+        owner_id: Identifier of the uploading user (None if unknown).
+        size: File size in bytes.
+        media_type: MIME type of the file.
+        blob_sha256: Digest of the shared blob holding the content, or
+            None if the file is stored under ``stored_name``.
+        created_at: Timestamp when the file was uploaded.
+    """
+
+    __tablename__ = "uploads"
+
+    # Primary key
+    id: Mapped[int] = mapped_column(primary_key=True, index=True)
+
+    # File information
+    stored_name: Mapped[str] = mapped_column(String(255), unique=True, index=True, nullable=False)
+    original_name: Mapped[str] = mapped_column(String(255), nullable=False)
+    size: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    media_type: Mapped[str | None] = mapped_column(String(100), nullable=True)
+
+    # Foreign key to User (kept when the user is deleted)
+    owner_id: Mapped[int | None] = mapped_column(
+        ForeignKey("users.id", ondelete="SET NULL"),
+        index=True,
+        nullable=True
+    )
+
+    # Content-addressed blob (content-addressed storage mode only)
+    blob_sha256: Mapped[str | None] = mapped_column(
+        ForeignKey("upload_blobs.sha256"),
+        index=True,
+        nullable=True
+    )
+
+    # Timestamps
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime,
+        server_default=func.now(),
+        index=True,
+        nullable=False
+    )
+
+    def __repr__(self) -> str:
+        """String representation of Upload.
+
+        Returns:
+            String representation showing stored name and owner.
+        """
+        return f"<Upload(stored_name='{self.stored_name}', owner_id={self.owner_id})>"
@@ -2,20 +2,21 @@
 from datetime import timedelta
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
-import bcrypt
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.schemas.auth import LoginRequest, TokenResponse
 from app.database import get_db
 from app.models.user import User
 from app.utils.jwt import create_access_token, ACCESS_TOKEN_EXPIRE_MINUTES
+from app.services.hashing import verify_password_async
 
 router = APIRouter(prefix="/api/v1/auth", tags=["auth"])
 
 @router.post("/login", response_model=TokenResponse, status_code=status.HTTP_200_OK)
-def login(
+async def login(
     credentials: LoginRequest,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)]
 ) -> TokenResponse:
     """Login endpoint - authenticate user and return JWT token.
     
@@ -28,9 +29,10 @@ def login(
         
     Raises:
         HTTPException: 401 if credentials are invalid.
+        HTTPException: 503 if the password hashing queue is full.
     """
     # Find user by username
-    user = db.query(User).filter(User.username == credentials.username).first()
+    user = await db.scalar(select(User).where(User.username == credentials.username))
     
     if not user:
         raise HTTPException(
@@ -39,11 +41,8 @@ def login(
             headers={"WWW-Authenticate": "Bearer"},
         )
     
-    # Verify password
-    if not bcrypt.checkpw(
-        credentials.password.encode('utf-8'),
-        user.password_hash.encode('utf-8')
-    ):
+    # Verify password (on the hashing process pool)
+    if not await verify_password_async(credentials.password, user.password_hash):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect username or password",
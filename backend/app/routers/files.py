@@ -1,15 +1,41 @@
 """File upload API endpoints."""
 
-from typing import Annotated
-from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends
-from fastapi.responses import FileResponse
+from typing import Annotated, Optional
+from fastapi import APIRouter, UploadFile, File, HTTPException, status, Depends, Query, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import Response, StreamingResponse
 from pathlib import Path
 from urllib.parse import quote
+import hashlib
+import os
 import uuid
-import mimetypes
 
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.config import settings
+from app.database import get_db, get_read_db
 from app.dependencies.auth import get_current_user
-from app.models.user import User
+from app.models.upload import Upload
+from app.schemas.auth import CurrentUser
+from app.services.counters import UPLOADS, adjust_counter, get_counter
+from app.services.invalidation import publish_invalidation
+from app.services.uploads import (
+    discard_blob,
+    file_meta_cache,
+    get_file_meta,
+    release_blob,
+    store_blob,
+    upload_to_dict,
+)
+from app.utils.http_range import (
+    RangeNotSatisfiable,
+    http_date,
+    if_range_allows,
+    is_not_modified,
+    parse_range_header,
+)
+from app.utils.pagination import encode_cursor, decode_cursor
     
 
 router = APIRouter(prefix="/api/v1/files", tags=["files"])
@@ -17,18 +43,129 @@ router = APIRouter(prefix="/api/v1/files", tags=["files"])
 UPLOAD_DIRECTORY = Path("./uploads")
 UPLOAD_DIRECTORY.mkdir(parents=True, exist_ok=True)
 MAX_FILE_SIZE = 10 * 1024 * 1024  # 10 MB
+# Allowance for multipart boundaries and part headers on top of the file
+MAX_UPLOAD_BODY_SIZE = MAX_FILE_SIZE + 64 * 1024
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1 MB
+DOWNLOAD_CHUNK_SIZE = 64 * 1024  # 64 KB
 ALLOWED_FILE_TYPES = {"image/png", "image/jpeg", "application/pdf"}
 
+
+def _temp_directory() -> Path:
+    """Directory for in-progress uploads, on the same filesystem as the uploads."""
+    temp_dir = UPLOAD_DIRECTORY / ".tmp"
+    temp_dir.mkdir(parents=True, exist_ok=True)
+    return temp_dir
+
+
+def _write_chunk(handle, digest, chunk: bytes) -> None:
+    """Write a chunk to the temp file and feed it to the content digest."""
+    digest.update(chunk)
+    handle.write(chunk)
+
+
+def _finalize_upload(handle) -> None:
+    """Flush a completed temp file to disk and close it."""
+    handle.flush()
+    os.fsync(handle.fileno())
+    handle.close()
+
+
+def _discard_upload(handle, temp_path: Path) -> None:
+    """Close and remove an abandoned temp file."""
+    handle.close()
+    temp_path.unlink(missing_ok=True)
+
+
+async def _stream_ranges(
+    handle,
+    ranges: list[tuple[int, int]],
+    part_headers: list[bytes] | None = None,
+    closing: bytes = b""
+):
+    """Yield the requested byte ranges of an open file, reading off the event loop.
+
+    Args:
+        handle: File opened in binary mode; closed when iteration ends.
+        ranges: Inclusive ``(start, end)`` byte ranges to send.
+        part_headers: Multipart headers preceding each range, if any.
+        closing: Multipart closing delimiter, if any.
+
+    Yields:
+        Chunks of the response body.
+    """
+    try:
+        for index, (start, end) in enumerate(ranges):
+            if part_headers:
+                yield part_headers[index]
+            await run_in_threadpool(handle.seek, start)
+            remaining = end - start + 1
+            while remaining > 0:
+                chunk = await run_in_threadpool(handle.read, min(DOWNLOAD_CHUNK_SIZE, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                yield chunk
+            if part_headers:
+                yield b"\r\n"
+        if closing:
+            yield closing
+    finally:
+        await run_in_threadpool(handle.close)
+
+
+async def receive_upload(file: UploadFile) -> tuple[Path, int, str]:
+    """Stream an upload to a temp file in chunks, off the event loop.
+
+    The content is hashed while it is written. The caller moves the temp
+    file into place once the whole upload has been received, so readers
+    never see a partial file.
+
+    Args:
+        file: Uploaded file to copy.
+
+    Returns:
+        Temp file path, number of bytes written and hex SHA-256 digest.
+
+    Raises:
+        HTTPException: 400 if the file exceeds MAX_FILE_SIZE.
+    """
+    temp_path = _temp_directory() / f"{uuid.uuid4()}.part"
+    handle = await run_in_threadpool(open, temp_path, "wb")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+            size += len(chunk)
+            if size > MAX_FILE_SIZE:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="File size exceeds the maximum limit of 10 MB."
+                )
+            await run_in_threadpool(_write_chunk, handle, digest, chunk)
+        await run_in_threadpool(_finalize_upload, handle)
+    except BaseException:
+        await run_in_threadpool(_discard_upload, handle, temp_path)
+        raise
+    return temp_path, size, digest.hexdigest()
+
 @router.post("/upload", status_code=status.HTTP_201_CREATED)
 async def upload_file(
     file: UploadFile = File(...),
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Annotated[AsyncSession, Depends(get_db)] = None
 ) -> dict:
     """Upload a single file (requires authentication).
 
+    The file is streamed to disk in chunks. BodySizeLimitMiddleware
+    rejects oversized bodies with 413: before reading when the
+    ``Content-Length`` is too large, otherwise (chunked uploads) as soon
+    as the received bytes pass the limit. In content-addressed storage
+    mode, identical content is stored only once.
+
     Args:
         file: File to upload.
         current_user: Currently authenticated user.
+        db: Database session.
 
     Returns:
         File information including filename and path.
@@ -43,24 +180,40 @@ async def upload_file(
             detail=f"File type '{file.content_type}' is not allowed."
         )
     
-    contents = await file.read()
-    if len(contents) > MAX_FILE_SIZE:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="File size exceeds the maximum limit of 10 MB."
-        )
-    
     unique_filename = f"{uuid.uuid4()}_{file.filename}"
     file_path = UPLOAD_DIRECTORY / unique_filename
-    
-    with open(file_path, "wb") as f:
-        f.write(contents)
-    
+    content_addressed = settings.UPLOAD_STORAGE_MODE == "cas"
+
+    temp_path, size, sha256 = await receive_upload(file)
+    try:
+        if content_addressed:
+            file_path = await store_blob(db, UPLOAD_DIRECTORY, temp_path, size, sha256)
+        else:
+            await run_in_threadpool(os.replace, temp_path, file_path)
+
+        # Record the upload in the metadata index
+        db.add(Upload(
+            stored_name=unique_filename,
+            original_name=file.filename,
+            size=size,
+            media_type=file.content_type,
+            owner_id=current_user.id,
+            blob_sha256=sha256 if content_addressed else None
+        ))
+        await db.flush()
+        await adjust_counter(db, UPLOADS, 1)
+        await db.commit()
+    except BaseException:
+        await run_in_threadpool(temp_path.unlink, True)
+        if not content_addressed:
+            await run_in_threadpool(file_path.unlink, True)
+        raise
+
     return {
         "message": "File uploaded successfully",
         "filename": file.filename,
         "saved_as": unique_filename,
-        "size": len(contents),
+        "size": size,
         "content_type": file.content_type,
         "path": str(file_path),
         "url": f"/api/v1/files/{unique_filename}",
@@ -68,85 +221,190 @@ async def upload_file(
     }
 
 @router.get("/{filename}")
-async def get_file(filename: str, download: bool = False):
+async def get_file(
+    filename: str,
+    request: Request,
+    download: bool = False,
+    db: Annotated[AsyncSession, Depends(get_read_db)] = None
+) -> Response:
     """View or download a file by filename.
 
+    Headers come from cached upload metadata, so conditional requests
+    are answered with 304 without touching the file. Single and
+    multiple byte ranges are served as 206 responses.
+
     Args:
         filename: The saved filename (with UUID prefix).
+        request: Incoming request (for Range and conditional headers).
         download: If True, force download. If False, display in browser (default).
+        db: Database session.
 
     Returns:
-        FileResponse: The requested file.
+        The file body (200), a partial body (206) or 304 Not Modified.
 
     Raises:
         HTTPException: 404 if file not found.
+        HTTPException: 416 if no requested range overlaps the file.
     """
-    file_path = UPLOAD_DIRECTORY / filename
-
-    if not file_path.exists() or not file_path.is_file():
+    meta = await get_file_meta(db, UPLOAD_DIRECTORY, filename)
+    if meta is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found."
         )
 
-    media_type, _ = mimetypes.guess_type(str(file_path))
-    if media_type is None:
-        media_type = "application/octet-stream"
-
     # Control whether to display inline or force download
     # Use URL encoding for non-ASCII filenames (RFC 5987)
     encoded_filename = quote(filename)
-    headers = {}
+    headers = {
+        "ETag": meta.etag,
+        "Last-Modified": http_date(meta.last_modified),
+        "Accept-Ranges": "bytes",
+    }
+
+    if is_not_modified(request.headers, meta.etag, meta.last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
     if download:
         headers["Content-Disposition"] = f"attachment; filename*=UTF-8''{encoded_filename}"
     else:
         headers["Content-Disposition"] = f"inline; filename*=UTF-8''{encoded_filename}"
 
-    return FileResponse(
-        path=str(file_path),
-        media_type=media_type,
+    ranges = []
+    range_header = request.headers.get("range")
+    if range_header and if_range_allows(request.headers, meta.etag, meta.last_modified):
+        try:
+            ranges = parse_range_header(range_header, meta.size)
+        except RangeNotSatisfiable:
+            raise HTTPException(
+                status_code=status.HTTP_416_RANGE_NOT_SATISFIABLE,
+                detail="Requested range not satisfiable.",
+                headers={"Content-Range": f"bytes */{meta.size}"}
+            )
+
+    try:
+        handle = await run_in_threadpool(open, meta.path, "rb")
+    except FileNotFoundError:
+        file_meta_cache.delete(filename)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="File not found."
+        )
+
+    if not ranges:
+        headers["Content-Length"] = str(meta.size)
+        return StreamingResponse(
+            _stream_ranges(handle, [(0, meta.size - 1)]),
+            media_type=meta.media_type,
+            headers=headers
+        )
+
+    if len(ranges) == 1:
+        start, end = ranges[0]
+        headers["Content-Range"] = f"bytes {start}-{end}/{meta.size}"
+        headers["Content-Length"] = str(end - start + 1)
+        return StreamingResponse(
+            _stream_ranges(handle, ranges),
+            status_code=status.HTTP_206_PARTIAL_CONTENT,
+            media_type=meta.media_type,
+            headers=headers
+        )
+
+    boundary = uuid.uuid4().hex
+    part_headers = [
+        (
+            f"--{boundary}\r\nContent-Type: {meta.media_type}\r\n"
+            f"Content-Range: bytes {start}-{end}/{meta.size}\r\n\r\n"
+        ).encode("latin-1")
+        for start, end in ranges
+    ]
+    closing = f"--{boundary}--\r\n".encode("latin-1")
+    headers["Content-Length"] = str(
+        sum(len(h) + (end - start + 1) + 2 for h, (start, end) in zip(part_headers, ranges))
+        + len(closing)
+    )
+    return StreamingResponse(
+        _stream_ranges(handle, ranges, part_headers, closing),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type=f"multipart/byteranges; boundary={boundary}",
         headers=headers
     )
 
 #list files
 @router.get("/", status_code=status.HTTP_200_OK)
 async def list_files(
-    current_user: User = Depends(get_current_user)
+    skip: int = Query(0, ge=0, description="Number of files to skip"),
+    limit: int = Query(50, ge=1, le=500, description="Maximum number of files to return"),
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    owner_id: Optional[int] = Query(None, description="Only files uploaded by this user"),
+    mine: bool = Query(False, description="Only files uploaded by the current user"),
+    include_total: bool = Query(True, description="Whether to return the total count"),
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Annotated[AsyncSession, Depends(get_read_db)] = None
 ) -> dict:
-    """List all uploaded files (requires authentication).
+    """List uploaded files from the metadata index (requires authentication).
 
     Args:
+        skip: Number of files to skip (offset mode).
+        limit: Maximum number of files to return.
+        cursor: Opaque cursor returned as ``next_cursor`` by a previous page.
+        owner_id: Only return files uploaded by this user.
+        mine: Only return files uploaded by the current user.
+        include_total: Whether to return the total count.
         current_user: Currently authenticated user.
+        db: Database session.
 
     Returns:
-        A dictionary containing a list of uploaded files with their details.
+        A dictionary containing a page of uploaded files with their details.
 
     Raises:
+        HTTPException: 400 if the cursor is malformed.
         HTTPException: 401 if user is not authenticated.
     """
-    files = []
-    for file_path in UPLOAD_DIRECTORY.iterdir():
-        if file_path.is_file():
-            media_type, _ = mimetypes.guess_type(str(file_path))
-            files.append({
-                "filename": file_path.name,
-                "size": file_path.stat().st_size,
-                "path": str(file_path),
-                "url": f"/api/v1/files/{file_path.name}",
-                "media_type": media_type
-            })
-    return {"files": files, "total": len(files)}
+    if mine:
+        owner_id = current_user.id
+
+    query = select(Upload).order_by(Upload.id)
+    if owner_id is not None:
+        query = query.where(Upload.owner_id == owner_id)
+    if cursor is not None:
+        query = query.where(Upload.id > decode_cursor(cursor))
+    else:
+        query = query.offset(skip)
+    uploads = list(await db.scalars(query.limit(limit + 1)))
+
+    next_cursor = None
+    if len(uploads) > limit:
+        uploads = uploads[:limit]
+        next_cursor = encode_cursor(uploads[-1].id)
+
+    total = None
+    if include_total:
+        if owner_id is None:
+            total = await get_counter(db, UPLOADS)
+        else:
+            total = await db.scalar(
+                select(func.count()).select_from(Upload).where(Upload.owner_id == owner_id)
+            )
+
+    return {
+        "files": [upload_to_dict(upload, UPLOAD_DIRECTORY) for upload in uploads],
+        "total": total,
+        "next_cursor": next_cursor
+    }
 
 @router.delete("/{filename}", status_code=status.HTTP_200_OK)
 async def delete_file(
     filename: str,
-    current_user: User = Depends(get_current_user)
+    current_user: CurrentUser = Depends(get_current_user),
+    db: Annotated[AsyncSession, Depends(get_db)] = None
 ) -> dict:
     """Delete a file by filename (requires authentication).
 
     Args:
         filename: The saved filename (with UUID prefix).
         current_user: Currently authenticated user.
+        db: Database session.
 
     Returns:
         A dictionary confirming deletion.
@@ -156,14 +414,26 @@ async def delete_file(
         HTTPException: 401 if user is not authenticated.
     """
     file_path = UPLOAD_DIRECTORY / filename
+    upload = await db.scalar(select(Upload).where(Upload.stored_name == filename))
 
-    if not file_path.exists() or not file_path.is_file():
+    if upload is None and not await run_in_threadpool(file_path.is_file):
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="File not found."
         )
 
-    file_path.unlink()
+    if upload is not None:
+        await db.delete(upload)
+        await db.flush()
+        sha256 = upload.blob_sha256
+        unreferenced = sha256 is not None and await release_blob(db, sha256)
+        await adjust_counter(db, UPLOADS, -1)
+        publish_invalidation(db, "file", filename)
+        await db.commit()
+        if unreferenced:
+            await discard_blob(db, UPLOAD_DIRECTORY, sha256)
+    await run_in_threadpool(file_path.unlink, True)
+    file_meta_cache.delete(filename)
 
     return {
         "message": "File deleted successfully",
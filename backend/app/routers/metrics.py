@@ -0,0 +1,36 @@
+"""Operational metrics endpoints."""
+
+from fastapi import APIRouter, Response
+
+from ..utils.pool_metrics import pool_metrics
+from ..utils.prometheus import render_latest
+
+router = APIRouter(prefix="/metrics", tags=["metrics"])
+
+
+@router.get("", response_class=Response)
+async def get_metrics() -> Response:
+    """Expose request metrics in the Prometheus text format.
+
+    Aggregated across all workers when PROMETHEUS_MULTIPROC_DIR is set.
+
+    Returns:
+        Prometheus exposition of request counts, latencies and in-flight
+        requests.
+    """
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+@router.get("/pool")
+async def get_pool_metrics() -> dict:
+    """Report connection pool usage for this worker process.
+
+    Includes live pool state, checkout wait and connection hold time
+    statistics (with cumulative histogram buckets), overflow use and
+    checkout timeouts for the primary and each replica engine.
+
+    Returns:
+        Dictionary with one entry per engine, keyed by engine name.
+    """
+    return {"pools": {name: metrics.snapshot() for name, metrics in pool_metrics.items()}}
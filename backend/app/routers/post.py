@@ -1,19 +1,46 @@
 """Post CRUD API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
-from typing import Annotated, List
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from datetime import datetime
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from typing import Annotated, List, Literal, Optional
 
-from ..database import get_db
-from ..schemas.post import PostCreate, PostUpdate, PostResponse, PostListResponse
-from ..models.post import Post
+from ..database import get_db, get_read_db, get_session_factory, reads_from_replica
+from ..schemas.post import (
+    PostCreate,
+    PostUpdate,
+    PostResponse,
+    PostListResponse,
+    PostSearchResponse,
+)
+from ..models.post import Post, PostArchive, PostStatus
+from ..utils.pagination import (
+    decode_cursor,
+    decode_time_cursor,
+    encode_cursor,
+    encode_time_cursor,
+)
+from ..utils.serialization import FastJSONResponse, dump_rows, response_columns
+from ..services.archive import restore_archived_post
+from ..services.export import EXPORT_FORMATS, export_query, stream_export
+from ..services.counters import POSTS, adjust_counter, get_counter, post_status_counter
+from ..services.response_cache import (
+    build_response,
+    cache_response,
+    conditional_response,
+    post_response_cache,
+)
+from ..services.invalidation import publish_invalidation
+from ..services.search import search_posts, sync_post_index
 
 router = APIRouter(prefix="/api/v1/posts", tags=["posts"])
 
 @router.post("/", response_model=PostResponse, status_code=status.HTTP_201_CREATED)
-def create_post(
+async def create_post(
     post: PostCreate,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Post:
     """Create a new post.
 
@@ -26,62 +53,262 @@ def create_post(
     """
     db_post = Post(**post.model_dump(), user_id=1)  # Assuming user_id=1 for simplicity
     db.add(db_post)
-    db.commit()
-    db.refresh(db_post)
+    await db.flush()
+    await adjust_counter(db, POSTS, 1)
+    await adjust_counter(db, post_status_counter(db_post.status), 1)
+    await sync_post_index(db, db_post)
+    await db.commit()
+    await db.refresh(db_post)
     return db_post
 
+# list_posts sort orders: "id" keeps the original insertion order
+PostSort = Literal["id", "newest", "oldest"]
+
+def post_list_query(
+    author_id: int | None = None,
+    post_status: PostStatus | None = None,
+    created_from: datetime | None = None,
+    created_to: datetime | None = None,
+    sort: PostSort = "id",
+    cursor: str | None = None
+) -> Select:
+    """Build the filtered, ordered query behind :func:`list_posts`.
+
+    With an author or status filter and a ``newest``/``oldest`` sort, the
+    ``(user_id, created_at, id)`` and ``(status, created_at, id)`` indexes
+    serve both the filter and the order, so pages are read in index order
+    without sorting.
+
+    Deleted posts are left out unless ``post_status`` asks for them.
+
+    Args:
+        author_id: Only posts by this user.
+        post_status: Only posts with this status.
+        created_from: Only posts created at or after this time.
+        created_to: Only posts created before this time.
+        sort: Order of the results.
+        cursor: Cursor from a previous page with the same sort.
+
+    Returns:
+        Select of the PostResponse columns, without offset or limit.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    query = select(*response_columns(Post, PostResponse))
+    if author_id is not None:
+        query = query.where(Post.user_id == author_id)
+    if post_status is None:
+        query = query.where(Post.status != PostStatus.DELETED)
+    else:
+        query = query.where(Post.status == post_status)
+    if created_from is not None:
+        query = query.where(Post.created_at >= created_from)
+    if created_to is not None:
+        query = query.where(Post.created_at < created_to)
+
+    if sort == "id":
+        if cursor is not None:
+            query = query.where(Post.id > decode_cursor(cursor))
+        return query.order_by(Post.id)
+
+    position = tuple_(Post.created_at, Post.id)
+    if cursor is not None:
+        after = tuple_(*decode_time_cursor(cursor))
+        query = query.where(position < after if sort == "newest" else position > after)
+    if sort == "newest":
+        return query.order_by(Post.created_at.desc(), Post.id.desc())
+    return query.order_by(Post.created_at, Post.id)
+
 @router.get("/", response_model=PostListResponse)
-def list_posts(
+async def list_posts(
     skip: int = Query(0, ge=0, description="Number of posts to skip"),
     limit: int = Query(10, ge=1, le=100, description="Maximum number of posts to return"),
-    db: Annotated[Session, Depends(get_db)] = None
-) -> PostListResponse:
-    """List posts with pagination.
+    cursor: Optional[str] = Query(None, description="Cursor from a previous page"),
+    include_total: bool = Query(True, description="Whether to return the total count"),
+    author_id: Optional[int] = Query(None, description="Only posts by this user"),
+    post_status: Optional[PostStatus] = Query(None, alias="status", description="Only posts with this status"),
+    created_from: Optional[datetime] = Query(None, description="Only posts created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only posts created before this time"),
+    sort: PostSort = Query("id", description="id, newest or oldest first"),
+    db: Annotated[AsyncSession, Depends(get_read_db)] = None
+) -> FastJSONResponse:
+    """List posts with optional filters and pagination.
+
+    Deleted posts are only listed when asked for with ``status=deleted``.
+    Supports offset pagination via ``skip`` and keyset pagination via
+    ``cursor``; when ``cursor`` is given, ``skip`` is ignored. Only the
+    response columns are read, and rows are encoded without re-validation.
+
+    The total comes from the row counters when filtering by status alone
+    (or not at all); other filters count the matching rows.
 
     Args:
         skip: Number of posts to skip.
         limit: Maximum number of posts to return.
+        cursor: Opaque cursor returned as ``next_cursor`` by a previous page.
+        include_total: Whether to return the total count; pass false to skip it.
+        author_id: Only posts by this user.
+        post_status: Only posts with this status.
+        created_from: Only posts created at or after this time.
+        created_to: Only posts created before this time.
+        sort: ``id`` (default), ``newest`` or ``oldest`` first by creation time.
         db: Database session.
 
     Returns:
         Paginated list of posts.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    query = post_list_query(author_id, post_status, created_from, created_to, sort, cursor)
+
+    total = None
+    if include_total and author_id is None and created_from is None and created_to is None:
+        if post_status is None:
+            total = await get_counter(db, POSTS) - await get_counter(
+                db, post_status_counter(PostStatus.DELETED)
+            )
+        else:
+            total = await get_counter(db, post_status_counter(post_status))
+    elif include_total:
+        filters = post_list_query(author_id, post_status, created_from, created_to)
+        total = await db.scalar(select(func.count()).select_from(filters.subquery()))
+
+    if cursor is None:
+        query = query.offset(skip)
+    posts = (await db.execute(query.limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(posts) > limit:
+        posts = posts[:limit]
+        last = posts[-1]
+        next_cursor = (
+            encode_cursor(last.id) if sort == "id" else encode_time_cursor(last.created_at, last.id)
+        )
+
+    page = (skip // limit) + 1 if cursor is None else None
+    # Rows come straight from the database, so skip output validation
+    return FastJSONResponse({
+        "posts": dump_rows(posts, PostResponse),
+        "total": total,
+        "page": page,
+        "page_size": limit,
+        "next_cursor": next_cursor
+    })
+
+@router.get("/export")
+async def export_posts(
+    session_factory: Annotated[async_sessionmaker[AsyncSession], Depends(get_session_factory)],
+    format: Annotated[str, Query(pattern="^(ndjson|csv)$", description="Export format")] = "ndjson",
+    include_deleted: bool = Query(False, description="Also export deleted posts")
+) -> StreamingResponse:
+    """Export all posts as a stream of NDJSON or CSV.
+
+    Rows are read with a server-side cursor and written as they arrive,
+    so memory use stays flat however large the table is. Columns match
+    ``PostResponse``. Deleted posts are left out, as in :func:`list_posts`,
+    unless ``include_deleted`` is set.
+
+    Args:
+        session_factory: Factory for the session the stream reads with.
+        format: ``ndjson`` (one JSON object per line) or ``csv``.
+        include_deleted: Whether to export deleted posts too.
+
+    Returns:
+        Streaming response with the exported posts.
+    """
+    query = export_query(Post, PostResponse)
+    if not include_deleted:
+        query = query.where(Post.status != PostStatus.DELETED)
+    return StreamingResponse(
+        stream_export(session_factory, query, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="posts.{format}"'}
+    )
+
+@router.get("/search", response_model=PostSearchResponse)
+async def search(
+    q: Annotated[str, Query(min_length=1, max_length=200, description="Search text")],
+    skip: Annotated[int, Query(ge=0, description="Number of results to skip")] = 0,
+    limit: Annotated[int, Query(ge=1, le=100, description="Maximum number of results")] = 10,
+    db: Annotated[AsyncSession, Depends(get_read_db)] = None
+) -> PostSearchResponse:
+    """Search post titles and content, best matches first.
+
+    Backed by the FULLTEXT index on MySQL and an FTS5 table on SQLite.
+    Deleted posts are not returned.
+
+    Args:
+        q: Search text.
+        skip: Number of results to skip.
+        limit: Maximum number of results to return.
+        db: Database session.
+
+    Returns:
+        Ranked page of matching posts.
     """
-    total = db.query(Post).count()
-    posts = db.query(Post).offset(skip).limit(limit).all()
-    page = (skip // limit) + 1 if limit > 0 else 1
-    return PostListResponse(posts=posts, total=total, page=page, page_size=limit)
+    # Fetch one extra result to find out whether another page exists
+    matches = await search_posts(db, q, skip, limit + 1)
+    page_matches = matches[:limit]
+    rows = dump_rows([post for post, _ in page_matches], PostResponse)
+    results = [{**row, "score": score} for row, (_, score) in zip(rows, page_matches)]
+    return PostSearchResponse(
+        query=q,
+        posts=results,
+        page=(skip // limit) + 1,
+        page_size=limit,
+        has_more=len(matches) > limit
+    )
 
 @router.get("/{post_id}", response_model=PostResponse)
-def get_post(
+async def get_post(
     post_id: int,
-    db: Annotated[Session, Depends(get_db)]
-) -> Post:
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_read_db)]
+) -> Response:
     """Retrieve a post by ID.
 
+    Responses carry an ETag derived from the post's id, updated_at and body;
+    a matching ``If-None-Match`` gets 304. A body read from the primary is
+    cached until the post is updated or deleted; bodies read from a
+    replica are not cached.
+
     Args:
         post_id: ID of the post to retrieve.
+        request: Incoming request (for conditional headers).
         db: Database session.
 
     Returns:
-        The requested post data.
+        The requested post data, or 304 Not Modified.
 
     Raises:
         HTTPException: If the post is not found.
     """
-    db_post = db.query(Post).filter(Post.id == post_id).first()
-    
-    if not db_post:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Post not found"
-        )
-    return db_post 
+    cached = post_response_cache.get(post_id)
+    if cached is None:
+        generation = post_response_cache.generation
+        db_post = await db.get(Post, post_id)
+
+        if not db_post:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Post not found"
+            )
+        if reads_from_replica(db):
+            # A lagging replica may return the version an update replaced
+            cached = build_response("post", db_post, PostResponse)
+        else:
+            cached = cache_response(
+                post_response_cache, "post", db_post, PostResponse, generation=generation
+            )
+    return conditional_response(request, cached)
 
 @router.put("/{post_id}", response_model=PostResponse)
-def update_post(
+async def update_post(
     post_id: int,
     post_update: PostUpdate,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)]
 ) -> Post:
     """Update an existing post.
 
@@ -96,7 +323,7 @@ def update_post(
     Raises:
         HTTPException: If the post is not found.
     """
-    db_post = db.query(Post).filter(Post.id == post_id).first()
+    db_post = await db.get(Post, post_id)
     
     if not db_post:
         raise HTTPException(
@@ -104,17 +331,25 @@ def update_post(
             detail="Post not found"
         )
     
+    old_status = db_post.status
     for field, value in post_update.model_dump(exclude_unset=True).items():
         setattr(db_post, field, value)
-    
-    db.commit()
-    db.refresh(db_post)
+
+    await db.flush()
+    if db_post.status != old_status:
+        await adjust_counter(db, post_status_counter(old_status), -1)
+        await adjust_counter(db, post_status_counter(db_post.status), 1)
+    await sync_post_index(db, db_post)
+    publish_invalidation(db, "post", post_id)
+    await db.commit()
+    post_response_cache.delete(post_id)
+    await db.refresh(db_post)
     return db_post
 
 @router.delete("/{post_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_post(
+async def delete_post(
     post_id: int,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)]
 ) -> None:
     """Delete a post by ID.
 
@@ -125,7 +360,7 @@ def delete_post(
     Raises:
         HTTPException: If the post is not found.
     """
-    db_post = db.query(Post).filter(Post.id == post_id).first()
+    db_post = await db.get(Post, post_id)
     
     if not db_post:
         raise HTTPException(
@@ -133,5 +368,68 @@ def delete_post(
             detail="Post not found"
         )
     
+    old_status = db_post.status
     db_post.status = "deleted"
-    db.commit()
+    await db.flush()
+    if old_status != PostStatus.DELETED:
+        await adjust_counter(db, post_status_counter(old_status), -1)
+        await adjust_counter(db, post_status_counter(PostStatus.DELETED), 1)
+    await sync_post_index(db, db_post)
+    publish_invalidation(db, "post", post_id)
+    await db.commit()
+    post_response_cache.delete(post_id)
+
+@router.post("/{post_id}/restore", response_model=PostResponse)
+async def restore_post(
+    post_id: int,
+    db: Annotated[AsyncSession, Depends(get_db)]
+) -> Post:
+    """Undo the deletion of a post, whether or not it was archived yet.
+
+    A deleted post comes back as a draft. An archived post returns to the
+    ``posts`` table under its original id.
+
+    Args:
+        post_id: ID of the post to restore.
+        db: Database session.
+
+    Returns:
+        The restored post data.
+
+    Raises:
+        HTTPException: 404 if the post is neither in posts nor archived,
+            409 if it is not deleted, its id has been reused or its
+            archived author no longer exists.
+    """
+    db_post = await db.get(Post, post_id)
+    if db_post is None:
+        db_post = await restore_archived_post(db, post_id)
+        if db_post is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Post not found"
+            )
+    elif db_post.status != PostStatus.DELETED:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Post is not deleted"
+        )
+    elif await db.get(PostArchive, post_id) is not None:
+        # The id was reused after the original post was archived, so it is
+        # ambiguous which of the two posts is meant
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Post id is in use again"
+        )
+    else:
+        db_post.status = PostStatus.DRAFT
+        await db.flush()
+        await adjust_counter(db, post_status_counter(PostStatus.DELETED), -1)
+        await adjust_counter(db, post_status_counter(PostStatus.DRAFT), 1)
+        await sync_post_index(db, db_post)
+        publish_invalidation(db, "post", post_id)
+        await db.commit()
+        post_response_cache.delete(post_id)
+
+    await db.refresh(db_post)
+    return db_post
@@ -1,21 +1,46 @@
 """User CRUD API endpoints."""
 
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status, Query
+from fastapi.responses import StreamingResponse
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 from typing import Annotated
 
-from ..database import get_db
-from ..schemas.user import UserCreate, UserUpdate, UserResponse, UserListResponse
+from ..database import get_db, get_read_db, get_session_factory, reads_from_replica
+from ..dependencies.auth import invalidate_user_cache
+from ..schemas.user import (
+    UserCreate,
+    UserUpdate,
+    UserResponse,
+    UserListResponse,
+    UserBulkCreate,
+    UserBulkResponse,
+)
 from ..models.user import User
-from ..utils.security import hash_password
+from ..utils.pagination import encode_cursor, decode_cursor
+from ..utils.serialization import FastJSONResponse, dump_rows, response_columns
+from ..services.export import EXPORT_FORMATS, export_query, stream_export
+from ..services.counters import USERS, adjust_counter, get_counter
+from ..services.response_cache import (
+    build_response,
+    cache_response,
+    conditional_response,
+    user_response_cache,
+)
+from ..services.hashing import hash_password_async, hash_passwords_async
+from ..services.invalidation import publish_invalidation
 
 router = APIRouter(prefix="/api/v1/users", tags=["users"])
 
+# Rows per INSERT transaction in bulk creation
+BULK_INSERT_BATCH_SIZE = 500
+
 
 @router.post("/", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
-def create_user(
+async def create_user(
     user: UserCreate,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)]
 ) -> User:
     """Create a new user.
 
@@ -28,11 +53,14 @@ def create_user(
 
     Raises:
         HTTPException: 409 if username or email already exists.
+        HTTPException: 503 if the password hashing queue is full.
     """
     # Check for duplicate username or email
-    existing_user = db.query(User).filter(
-        (User.username == user.username) | (User.email == user.email)
-    ).first()
+    existing_user = await db.scalar(
+        select(User).where(
+            (User.username == user.username) | (User.email == user.email)
+        ).limit(1)
+    )
 
     if existing_user:
         if existing_user.username == user.username:
@@ -45,8 +73,8 @@ def create_user(
             detail="Email already exists"
         )
 
-    # Hash password before storing
-    hashed_password = hash_password(user.password)
+    # Hash password before storing (on the hashing process pool)
+    hashed_password = await hash_password_async(user.password)
 
     # Create user instance
     db_user = User(
@@ -55,78 +83,271 @@ def create_user(
     )
 
     db.add(db_user)
-    db.commit()
-    db.refresh(db_user)
+    await db.flush()
+    await adjust_counter(db, USERS, 1)
+    await db.commit()
+    await db.refresh(db_user)
 
     return db_user
 
 
+async def _insert_user_batch(
+    db: AsyncSession,
+    rows: list[tuple[int, dict]],
+    errors: dict[int, str]
+) -> list[tuple[int, dict]]:
+    """Insert a batch of users in one transaction.
+
+    The batch is sent as a single executemany. If it hits a unique
+    constraint (another request created one of the users meanwhile), it
+    is retried row by row so the remaining users are still created.
+
+    Args:
+        db: Database session.
+        rows: ``(request index, column values)`` pairs to insert.
+        errors: Per-index error messages, updated with rows that failed.
+
+    Returns:
+        The rows that were inserted.
+    """
+    try:
+        await db.execute(insert(User), [values for _, values in rows])
+        await adjust_counter(db, USERS, len(rows))
+        await db.commit()
+        return rows
+    except IntegrityError:
+        await db.rollback()
+
+    inserted = []
+    for index, values in rows:
+        try:
+            async with db.begin_nested():
+                await db.execute(insert(User), [values])
+            inserted.append((index, values))
+        except IntegrityError:
+            errors[index] = "Username or email already exists"
+    await adjust_counter(db, USERS, len(inserted))
+    await db.commit()
+    return inserted
+
+
+@router.post("/bulk", response_model=UserBulkResponse)
+async def create_users_bulk(
+    payload: UserBulkCreate,
+    db: Annotated[AsyncSession, Depends(get_db)]
+) -> dict:
+    """Create many users in one request.
+
+    Duplicates are checked with a single query, passwords are hashed in
+    parallel on the hashing pool and rows are inserted in batches of
+    BULK_INSERT_BATCH_SIZE. Items fail independently: the response has
+    one result per item, in request order.
+
+    Args:
+        payload: Users to create.
+        db: Database session.
+
+    Returns:
+        Counts of created and failed items and the per-item results.
+    """
+    items = payload.users
+    errors: dict[int, str] = {}
+
+    # Check every username and email against existing users at once
+    existing = (await db.execute(
+        select(User.username, User.email).where(
+            User.username.in_({item.username for item in items}) |
+            User.email.in_({item.email for item in items})
+        )
+    )).all()
+    usernames = {username for username, _ in existing}
+    emails = {email for _, email in existing}
+
+    # Earlier items win over later duplicates within the request
+    accepted = []
+    for index, item in enumerate(items):
+        if item.username in usernames:
+            errors[index] = "Username already exists"
+        elif item.email in emails:
+            errors[index] = "Email already exists"
+        else:
+            accepted.append(index)
+            usernames.add(item.username)
+            emails.add(item.email)
+
+    # End the read transaction so the pooled connection is not held
+    # while bcrypt runs; the inserts below start a new one
+    await db.rollback()
+
+    # Hash passwords in parallel (on the hashing process pool)
+    hashes = await hash_passwords_async([items[index].password for index in accepted])
+    rows = []
+    for index, hashed_password in zip(accepted, hashes):
+        if hashed_password is None:
+            errors[index] = "Server is busy, please retry shortly"
+            continue
+        rows.append((index, {
+            **items[index].model_dump(exclude={"password"}),
+            "password_hash": hashed_password
+        }))
+
+    created: dict[int, User] = {}
+    for start in range(0, len(rows), BULK_INSERT_BATCH_SIZE):
+        inserted = await _insert_user_batch(
+            db, rows[start:start + BULK_INSERT_BATCH_SIZE], errors
+        )
+        if not inserted:
+            continue
+        # Load the new rows (with ids and timestamps) for the response
+        users = await db.scalars(
+            select(User).where(User.username.in_([values["username"] for _, values in inserted]))
+        )
+        by_username = {user.username: user for user in users}
+        for index, values in inserted:
+            created[index] = by_username[values["username"]]
+
+    results = [
+        {"index": index, "success": True, "user": created[index]} if index in created
+        else {"index": index, "success": False, "error": errors[index]}
+        for index in range(len(items))
+    ]
+    return {"created": len(created), "failed": len(items) - len(created), "results": results}
+
+
 @router.get("/", response_model=UserListResponse)
-def list_users(
+async def list_users(
     skip: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(ge=1, le=100)] = 10,
-    db: Annotated[Session, Depends(get_db)] = None
-) -> dict:
+    cursor: Annotated[str | None, Query(description="Cursor from a previous page")] = None,
+    include_total: Annotated[bool, Query(description="Whether to return the total count")] = True,
+    db: Annotated[AsyncSession, Depends(get_read_db)] = None
+) -> FastJSONResponse:
     """List users with pagination.
 
+    Supports two modes: offset pagination via ``skip`` and keyset
+    pagination via ``cursor``. Keyset pages cost the same at any depth;
+    when ``cursor`` is given, ``skip`` is ignored. Only the response
+    columns are read, and rows are encoded without re-validation.
+
     Args:
         skip: Number of users to skip (offset).
         limit: Maximum number of users to return (max 100).
+        cursor: Opaque cursor returned as ``next_cursor`` by a previous page.
+        include_total: Whether to return the total count; pass false to skip it.
         db: Database session.
 
     Returns:
         Paginated list of users with metadata.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
     """
-    # Get total count
-    total = db.query(User).count()
+    # Get total count from the maintained counter
+    total = await get_counter(db, USERS) if include_total else None
+
+    # Get paginated users in a stable order, fetching one extra row
+    # to find out whether another page exists
+    query = select(*response_columns(User, UserResponse)).order_by(User.id)
+    if cursor is not None:
+        query = query.where(User.id > decode_cursor(cursor))
+    else:
+        query = query.offset(skip)
+    users = (await db.execute(query.limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(users) > limit:
+        users = users[:limit]
+        next_cursor = encode_cursor(users[-1].id)
+
+    # Calculate page number (only meaningful in offset mode)
+    page = (skip // limit) + 1 if cursor is None else None
+
+    # Rows come straight from the database, so skip output validation
+    return FastJSONResponse({
+        "users": dump_rows(users, UserResponse),
+        "total": total,
+        "page": page,
+        "page_size": limit,
+        "next_cursor": next_cursor
+    })
 
-    # Get paginated users
-    users = db.query(User).offset(skip).limit(limit).all()
 
-    # Calculate page number
-    page = (skip // limit) + 1 if limit > 0 else 1
+@router.get("/export")
+async def export_users(
+    session_factory: Annotated[async_sessionmaker[AsyncSession], Depends(get_session_factory)],
+    format: Annotated[str, Query(pattern="^(ndjson|csv)$", description="Export format")] = "ndjson"
+) -> StreamingResponse:
+    """Export all users as a stream of NDJSON or CSV.
 
-    return {
-        "users": users,
-        "total": total,
-        "page": page,
-        "page_size": limit
-    }
+    Rows are read with a server-side cursor and written as they arrive,
+    so memory use stays flat however large the table is. Columns match
+    ``UserResponse`` except ``password_hash``, which is never read.
+
+    Args:
+        session_factory: Factory for the session the stream reads with.
+        format: ``ndjson`` (one JSON object per line) or ``csv``.
+
+    Returns:
+        Streaming response with the exported users.
+    """
+    return StreamingResponse(
+        stream_export(session_factory, export_query(User, UserResponse), format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="users.{format}"'}
+    )
 
 
 @router.get("/{user_id}", response_model=UserResponse)
-def get_user(
+async def get_user(
     user_id: int,
-    db: Annotated[Session, Depends(get_db)]
-) -> User:
+    request: Request,
+    db: Annotated[AsyncSession, Depends(get_read_db)]
+) -> Response:
     """Get a user by ID.
 
+    Responses carry an ETag derived from the user's id, updated_at and body;
+    a matching ``If-None-Match`` gets 304. A body read from the primary is
+    cached until the user is updated or deleted, so hot rows skip the
+    database; bodies read from a replica are not cached.
+
     Args:
         user_id: The ID of the user to retrieve.
+        request: Incoming request (for conditional headers).
         db: Database session.
 
     Returns:
-        User data.
+        User data, or 304 Not Modified.
 
     Raises:
         HTTPException: 404 if user not found.
     """
-    user = db.query(User).filter(User.id == user_id).first()
+    cached = user_response_cache.get(user_id)
+    if cached is None:
+        generation = user_response_cache.generation
+        user = await db.get(User, user_id)
 
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"User with ID {user_id} not found"
-        )
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"User with ID {user_id} not found"
+            )
+
+        if reads_from_replica(db):
+            # A lagging replica may return the version an update replaced
+            cached = build_response("user", user, UserResponse)
+        else:
+            cached = cache_response(
+                user_response_cache, "user", user, UserResponse, generation=generation
+            )
 
-    return user
+    return conditional_response(request, cached)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
-def update_user(
+async def update_user(
     user_id: int,
     user_update: UserUpdate,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)]
 ) -> User:
     """Update a user by ID.
 
@@ -140,9 +361,10 @@ def update_user(
 
     Raises:
         HTTPException: 404 if user not found, 409 if duplicate username/email.
+        HTTPException: 503 if the password hashing queue is full.
     """
     # Get existing user
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
 
     if not db_user:
         raise HTTPException(
@@ -155,13 +377,15 @@ def update_user(
 
     # Check for duplicate username/email if being updated
     if "username" in update_data or "email" in update_data:
-        existing = db.query(User).filter(
-            User.id != user_id,
-            (
-                (User.username == update_data.get("username")) |
-                (User.email == update_data.get("email"))
-            )
-        ).first()
+        existing = await db.scalar(
+            select(User).where(
+                User.id != user_id,
+                (
+                    (User.username == update_data.get("username")) |
+                    (User.email == update_data.get("email"))
+                )
+            ).limit(1)
+        )
 
         if existing:
             if existing.username == update_data.get("username"):
@@ -176,22 +400,25 @@ def update_user(
 
     # Hash password if being updated
     if "password" in update_data:
-        update_data["password_hash"] = hash_password(update_data.pop("password"))
+        update_data["password_hash"] = await hash_password_async(update_data.pop("password"))
 
     # Update user attributes
     for key, value in update_data.items():
         setattr(db_user, key, value)
 
-    db.commit()
-    db.refresh(db_user)
+    publish_invalidation(db, "user", user_id)
+    await db.commit()
+    invalidate_user_cache(user_id)
+    user_response_cache.delete(user_id)
+    await db.refresh(db_user)
 
     return db_user
 
 
 @router.delete("/{user_id}", status_code=status.HTTP_204_NO_CONTENT)
-def delete_user(
+async def delete_user(
     user_id: int,
-    db: Annotated[Session, Depends(get_db)]
+    db: Annotated[AsyncSession, Depends(get_db)]
 ) -> None:
     """Delete a user by ID.
 
@@ -202,7 +429,7 @@ def delete_user(
     Raises:
         HTTPException: 404 if user not found.
     """
-    db_user = db.query(User).filter(User.id == user_id).first()
+    db_user = await db.get(User, user_id)
 
     if not db_user:
         raise HTTPException(
@@ -210,5 +437,10 @@ def delete_user(
             detail=f"User with ID {user_id} not found"
         )
 
-    db.delete(db_user)
-    db.commit()
+    await db.delete(db_user)
+    await db.flush()
+    await adjust_counter(db, USERS, -1)
+    publish_invalidation(db, "user", user_id)
+    await db.commit()
+    invalidate_user_cache(user_id)
+    user_response_cache.delete(user_id)
@@ -1,6 +1,23 @@
 """Pydantic schemas package."""
 
-from .user import UserBase, UserCreate, UserUpdate, UserResponse, UserListResponse
-from .post import PostBase, PostCreate, PostUpdate, PostResponse, PostListResponse
+from .user import (
+    UserBase,
+    UserCreate,
+    UserUpdate,
+    UserResponse,
+    UserListResponse,
+    UserBulkCreate,
+    UserBulkItemResult,
+    UserBulkResponse,
+)
+from .post import (
+    PostBase,
+    PostCreate,
+    PostUpdate,
+    PostResponse,
+    PostListResponse,
+    PostSearchResult,
+    PostSearchResponse,
+)
 
-__all__ = ["UserBase", "UserCreate", "UserUpdate", "UserResponse", "UserListResponse", "PostBase", "PostCreate", "PostUpdate", "PostResponse", "PostListResponse"]
+__all__ = ["UserBase", "UserCreate", "UserUpdate", "UserResponse", "UserListResponse", "UserBulkCreate", "UserBulkItemResult", "UserBulkResponse", "PostBase", "PostCreate", "PostUpdate", "PostResponse", "PostListResponse", "PostSearchResult", "PostSearchResponse"]
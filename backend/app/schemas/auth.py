@@ -1,5 +1,5 @@
 """Authentication schemas."""
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 class LoginRequest(BaseModel):
     """Login request schema.
@@ -19,4 +19,23 @@ class TokenResponse(BaseModel):
         token_type: Type of the token (e.g., Bearer).
     """
     access_token: str
-    token_type: str = "bearer"
\ No newline at end of file
+    token_type: str = "bearer"
+
+class CurrentUser(BaseModel):
+    """Identity of the authenticated user attached to a request.
+
+    A lightweight, immutable snapshot of the ``User`` row that can be
+    cached between requests.
+
+    Attributes:
+        id: User's unique identifier.
+        username: User's username.
+        role: User's role (admin or user).
+        is_active: Whether the account is active.
+    """
+    id: int
+    username: str
+    role: str
+    is_active: bool
+
+    model_config = ConfigDict(from_attributes=True, frozen=True)
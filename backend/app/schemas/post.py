@@ -67,15 +67,44 @@ class PostListResponse(BaseModel):
     """Schema for paginated post list response.
 
     Attributes:
-        total: Total number of posts.
+        total: Total number of posts, None when not requested.
         posts: List of PostResponse items.
+        page: Current page number (None when paginating by cursor).
+        page_size: Number of posts per page.
+        next_cursor: Opaque cursor for the next page, None on the last page.
     """
 
     posts: list[PostResponse] = Field(..., description="List of posts")
-    total: int = Field(..., description="Total number of posts in database")
-    page: int = Field(..., description="Current page number")
+    total: Optional[int] = Field(None, description="Total number of posts in database")
+    page: Optional[int] = Field(None, description="Current page number (offset mode only)")
     page_size: int = Field(..., description="Number of posts per page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page")
 
     model_config = ConfigDict(from_attributes=True)
 
-    
\ No newline at end of file
+    
+class PostSearchResult(PostResponse):
+    """Schema for a post matched by a search.
+
+    Attributes:
+        score: Relevance of the match; higher is better.
+    """
+
+    score: float = Field(..., description="Relevance score, higher is better")
+
+class PostSearchResponse(BaseModel):
+    """Schema for ranked, paginated search results.
+
+    Attributes:
+        query: The search text.
+        posts: Matching posts, best match first.
+        page: Current page number.
+        page_size: Number of posts per page.
+        has_more: Whether another page of results exists.
+    """
+
+    query: str = Field(..., description="Search text")
+    posts: list[PostSearchResult] = Field(..., description="Matching posts, best first")
+    page: int = Field(..., description="Current page number")
+    page_size: int = Field(..., description="Number of posts per page")
+    has_more: bool = Field(..., description="Whether another page exists")
@@ -83,14 +83,61 @@ class UserListResponse(BaseModel):
 
     Attributes:
         users: List of users.
-        total: Total number of users in database.
-        page: Current page number.
+        total: Total number of users in database, None when not requested.
+        page: Current page number (None when paginating by cursor).
         page_size: Number of users per page.
+        next_cursor: Opaque cursor for the next page, None on the last page.
     """
 
     users: list[UserResponse] = Field(..., description="List of users")
-    total: int = Field(..., description="Total users count")
-    page: int = Field(..., description="Current page number")
+    total: Optional[int] = Field(None, description="Total users count")
+    page: Optional[int] = Field(None, description="Current page number (offset mode only)")
     page_size: int = Field(..., description="Users per page")
+    next_cursor: Optional[str] = Field(None, description="Cursor for the next page")
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class UserBulkCreate(BaseModel):
+    """Schema for creating many users in one request.
+
+    Attributes:
+        users: Users to create (1-1000 per request).
+    """
+
+    users: list[UserCreate] = Field(
+        ...,
+        min_length=1,
+        max_length=1000,
+        description="Users to create"
+    )
+
+
+class UserBulkItemResult(BaseModel):
+    """Outcome of a single item in a bulk user creation.
+
+    Attributes:
+        index: Position of the item in the request.
+        success: Whether the user was created.
+        user: The created user, if successful.
+        error: Why the user was not created, if unsuccessful.
+    """
+
+    index: int = Field(..., description="Position of the item in the request")
+    success: bool = Field(..., description="Whether the user was created")
+    user: Optional[UserResponse] = Field(None, description="Created user")
+    error: Optional[str] = Field(None, description="Reason the item failed")
+
+
+class UserBulkResponse(BaseModel):
+    """Schema for bulk user creation response.
+
+    Attributes:
+        created: Number of users created.
+        failed: Number of items that failed.
+        results: Per-item results in request order.
+    """
+
+    created: int = Field(..., description="Number of users created")
+    failed: int = Field(..., description="Number of items that failed")
+    results: list[UserBulkItemResult] = Field(..., description="Per-item results")
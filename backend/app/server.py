@@ -0,0 +1,105 @@
+"""Production server launcher.
+
+Usage:
+    python -m app.server
+
+Runs uvicorn with one worker process per available CPU (or
+``SERVER_WORKERS``), the uvloop event loop and the httptools HTTP
+parser. Each worker exits gracefully after ``SERVER_MAX_REQUESTS``
+requests (plus a random jitter, so workers do not all restart at once)
+and the supervisor starts a replacement, which bounds memory growth.
+For development, run ``uvicorn app.main:app --reload`` instead.
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+import uvicorn
+
+from .config import Settings, settings
+from .utils.prometheus import MULTIPROC_DIR_ENV
+
+APP = "app.main:app"
+
+
+def available_cpus() -> int:
+    """Return the number of CPUs this process may run on.
+
+    Returns:
+        CPU count, honouring CPU affinity (e.g. ``taskset`` or cpusets).
+    """
+    if hasattr(os, "sched_getaffinity"):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def worker_count(config: Settings) -> int:
+    """Return how many worker processes to run.
+
+    Args:
+        config: Application settings.
+
+    Returns:
+        ``SERVER_WORKERS`` if set, otherwise one per available CPU.
+    """
+    return config.SERVER_WORKERS or available_cpus()
+
+
+def server_options(config: Settings) -> dict:
+    """Build the uvicorn options for the production server.
+
+    Args:
+        config: Application settings.
+
+    Returns:
+        Keyword arguments for ``uvicorn.run``.
+    """
+    return {
+        "host": config.SERVER_HOST,
+        "port": config.SERVER_PORT,
+        "workers": worker_count(config),
+        "loop": "uvloop",
+        "http": "httptools",
+        "backlog": config.SERVER_BACKLOG,
+        "timeout_keep_alive": config.SERVER_KEEP_ALIVE_SECONDS,
+        "timeout_graceful_shutdown": config.SERVER_GRACEFUL_SHUTDOWN_SECONDS,
+        "limit_max_requests": config.SERVER_MAX_REQUESTS or None,
+        "limit_max_requests_jitter": config.SERVER_MAX_REQUESTS_JITTER,
+        "proxy_headers": True,
+        "forwarded_allow_ips": config.SERVER_FORWARDED_ALLOW_IPS,
+        "access_log": config.SERVER_ACCESS_LOG,
+    }
+
+
+def prepare_environment(config: Settings, workers: int) -> None:
+    """Set up per-worker defaults that must exist before workers start.
+
+    With several workers, Prometheus metrics need a shared multiprocess
+    directory (a fresh temporary one unless already configured), and the
+    password hashing pools share the CPUs instead of each taking all of
+    them.
+
+    Args:
+        config: Application settings.
+        workers: Number of worker processes.
+    """
+    if workers > 1 and not os.environ.get(MULTIPROC_DIR_ENV):
+        os.environ[MULTIPROC_DIR_ENV] = tempfile.mkdtemp(prefix="prometheus-")
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        # Samples of a previous run would be added to this run's totals
+        for stale in Path(os.environ[MULTIPROC_DIR_ENV]).glob("*.db"):
+            stale.unlink()
+    if config.PASSWORD_HASH_WORKERS is None:
+        os.environ["PASSWORD_HASH_WORKERS"] = str(max(1, available_cpus() // workers))
+
+
+def main() -> None:
+    """Start the production server."""
+    options = server_options(settings)
+    prepare_environment(settings, options["workers"])
+    uvicorn.run(APP, **options)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,255 @@
+"""Archiving of deleted posts.
+
+Deleting a post only marks it ``deleted``, so without archiving these
+rows stay in ``posts`` and in all its indexes. The archiver moves them,
+and optionally long-unpublished posts, into ``posts_archive``. It works
+in small batches, one short transaction each, so it never holds locks
+on many rows at once. Archived posts can be brought back with
+:func:`restore_archived_post`.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+
+from fastapi import HTTPException, status
+from sqlalchemy import ColumnElement, and_, delete, insert, or_, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker
+
+from ..models.post import Post, PostArchive, PostStatus
+from ..models.user import User
+from .counters import POSTS, adjust_counter, post_status_counter
+from .invalidation import publish_invalidation
+from .response_cache import post_response_cache
+from .schema import release_lock, try_lock
+from .search import sync_post_index, unindex_posts
+
+logger = logging.getLogger(__name__)
+
+ARCHIVE_BATCH_SIZE = 500
+
+# Lock row in schema_version electing the worker that runs the archiver
+ARCHIVER_LOCK_ROW = "archiver"
+ARCHIVER_LOCK_TIMEOUT = 600.0
+
+# Columns copied between posts and posts_archive
+_ARCHIVED_COLUMNS = ("id", "title", "content", "status", "user_id", "created_at", "updated_at")
+
+
+def _archivable(unpublished_before: datetime | None) -> ColumnElement[bool]:
+    """Build the condition selecting posts that are due for archiving."""
+    archivable = Post.status == PostStatus.DELETED
+    if unpublished_before is not None:
+        archivable = or_(archivable, and_(
+            Post.status == PostStatus.UNPUBLISHED, Post.updated_at < unpublished_before
+        ))
+    return archivable
+
+
+def _already_archived() -> ColumnElement[bool]:
+    """Build the condition matching posts whose id is taken in the archive."""
+    return select(PostArchive.id).where(PostArchive.id == Post.id).exists()
+
+
+async def archive_conflicts(
+    db: AsyncSession, unpublished_before: datetime | None = None
+) -> list[int]:
+    """Return archivable posts that cannot be archived.
+
+    These reuse the id of an archived post, which InnoDB can do after a
+    restart before MySQL 8.0. They stay in ``posts`` until the archived
+    post with the same id is restored or removed.
+
+    Args:
+        db: Database session on the primary.
+        unpublished_before: Also consider posts unpublished since before this.
+
+    Returns:
+        Ids of the conflicting posts.
+    """
+    return list(await db.scalars(
+        select(Post.id).where(_archivable(unpublished_before), _already_archived()).order_by(Post.id)
+    ))
+
+
+async def archive_batch(
+    db: AsyncSession,
+    unpublished_before: datetime | None = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE
+) -> int:
+    """Move one batch of archivable posts into ``posts_archive`` and commit.
+
+    Archivable posts are deleted ones, plus unpublished ones last updated
+    before ``unpublished_before`` when it is given. Rows locked by a
+    concurrent archiver are skipped on MySQL, and so are posts whose id
+    is already archived (see :func:`archive_conflicts`).
+
+    Args:
+        db: Database session on the primary.
+        unpublished_before: Also archive posts unpublished since before this.
+        batch_size: Maximum number of posts to move.
+
+    Returns:
+        Number of posts archived; 0 when nothing is left to archive.
+    """
+    rows = (await db.execute(
+        select(Post.id, Post.status)
+        .where(_archivable(unpublished_before), ~_already_archived())
+        .order_by(Post.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )).all()
+    if not rows:
+        return 0
+
+    post_ids = [row.id for row in rows]
+    await db.execute(insert(PostArchive).from_select(
+        _ARCHIVED_COLUMNS,
+        select(*(getattr(Post, name) for name in _ARCHIVED_COLUMNS)).where(Post.id.in_(post_ids))
+    ))
+    await unindex_posts(db, post_ids)
+    await db.execute(delete(Post).where(Post.id.in_(post_ids)))
+    await adjust_counter(db, POSTS, -len(post_ids))
+    for post_status, count in Counter(row.status for row in rows).items():
+        await adjust_counter(db, post_status_counter(post_status), -count)
+    for post_id in post_ids:
+        publish_invalidation(db, "post", post_id)
+    await db.commit()
+
+    for post_id in post_ids:
+        post_response_cache.delete(post_id)
+    return len(post_ids)
+
+
+async def run_archiver(
+    session_factory: async_sessionmaker[AsyncSession],
+    unpublished_after: timedelta | None = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    pause: float = 0.1
+) -> int:
+    """Archive batches until no archivable posts are left.
+
+    Posts that cannot be archived because their id is already in
+    ``posts_archive`` are logged.
+
+    Args:
+        session_factory: Factory for sessions on the primary.
+        unpublished_after: Also archive posts unpublished for this long.
+        batch_size: Posts per batch (and per transaction).
+        pause: Seconds to sleep between batches, to leave room for
+            foreground traffic.
+
+    Returns:
+        Total number of posts archived.
+    """
+    unpublished_before = None
+    if unpublished_after is not None:
+        unpublished_before = datetime.now(timezone.utc).replace(tzinfo=None) - unpublished_after
+
+    total = 0
+    while True:
+        async with session_factory() as db:
+            archived = await archive_batch(db, unpublished_before, batch_size)
+        total += archived
+        if archived < batch_size:
+            break
+        await asyncio.sleep(pause)
+
+    async with session_factory() as db:
+        conflicts = await archive_conflicts(db, unpublished_before)
+    if conflicts:
+        logger.warning(
+            "Not archiving %d posts whose ids are already archived: %s",
+            len(conflicts), conflicts[:20]
+        )
+    return total
+
+
+async def archive_periodically(
+    engine: AsyncEngine,
+    session_factory: async_sessionmaker[AsyncSession],
+    interval: float,
+    unpublished_after: timedelta | None = None,
+    batch_size: int = ARCHIVE_BATCH_SIZE,
+    lock_timeout: float = ARCHIVER_LOCK_TIMEOUT
+) -> None:
+    """Run the archiver every ``interval`` seconds until cancelled.
+
+    Every worker runs this loop, but each run first takes the archiver
+    lock row (see :func:`app.services.schema.try_lock`), so only one
+    worker archives at a time and the others skip that round.
+
+    Args:
+        engine: Engine of the primary database, holding the lock.
+        session_factory: Factory for sessions on the primary.
+        interval: Seconds between archiver runs.
+        unpublished_after: Also archive posts unpublished for this long.
+        batch_size: Posts per batch (and per transaction).
+        lock_timeout: Seconds after which the lock of a worker that died
+            mid-run is taken over; runs should finish well within it.
+    """
+    while True:
+        try:
+            if await try_lock(engine, ARCHIVER_LOCK_ROW, lock_timeout):
+                try:
+                    archived = await run_archiver(session_factory, unpublished_after, batch_size)
+                finally:
+                    await release_lock(engine, ARCHIVER_LOCK_ROW)
+                if archived:
+                    logger.info("Archived %d posts", archived)
+        except Exception:
+            logger.exception("Post archiver run failed")
+        await asyncio.sleep(interval)
+
+
+async def restore_archived_post(db: AsyncSession, post_id: int) -> Post | None:
+    """Move an archived post back into ``posts`` and commit.
+
+    The post keeps its id. A post archived as deleted comes back as a
+    draft; other statuses are kept.
+
+    Args:
+        db: Database session on the primary.
+        post_id: Id of the archived post.
+
+    Returns:
+        The restored post, or None if no such post is archived.
+
+    Raises:
+        HTTPException: 409 if a post with the same id exists again, or if
+            the post's author has been deleted since it was archived.
+    """
+    archived = await db.get(PostArchive, post_id)
+    if archived is None:
+        return None
+    if await db.get(Post, post_id) is not None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Post id is in use again"
+        )
+    # posts_archive.user_id has no foreign key, so the author may be gone
+    if await db.get(User, archived.user_id) is None:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Post author no longer exists"
+        )
+
+    post = Post(
+        id=archived.id,
+        title=archived.title,
+        content=archived.content,
+        status=PostStatus.DRAFT if archived.status == PostStatus.DELETED else archived.status,
+        user_id=archived.user_id,
+        created_at=archived.created_at,
+    )
+    db.add(post)
+    await db.delete(archived)
+    await db.flush()
+    await adjust_counter(db, POSTS, 1)
+    await adjust_counter(db, post_status_counter(post.status), 1)
+    await sync_post_index(db, post)
+    publish_invalidation(db, "post", post_id)
+    await db.commit()
+    post_response_cache.delete(post_id)
+    return post
@@ -0,0 +1,147 @@
+"""Incrementally maintained row counts.
+
+List endpoints report totals from the ``row_counters`` table instead of
+running ``COUNT(*)`` on every request. Write paths adjust the counters
+inside the same transaction as the row change, and
+:func:`reconcile_counters` recomputes them from the source tables to
+repair any drift.
+"""
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import USE_REPLICA
+from ..models.counter import RowCounter
+from ..models.post import Post, PostStatus
+from ..models.upload import Upload
+from ..models.user import User
+
+USERS = "users"
+POSTS = "posts"
+UPLOADS = "uploads"
+
+
+def post_status_counter(post_status: PostStatus | str) -> str:
+    """Return the counter name for posts with the given status.
+
+    Args:
+        post_status: Post status enum member or its value.
+
+    Returns:
+        Counter name such as ``posts:published``.
+    """
+    return f"{POSTS}:{PostStatus(post_status).value}"
+
+
+def _count_query(name: str):
+    """Build the ``COUNT(*)`` query that a counter mirrors.
+
+    Args:
+        name: Counter name.
+
+    Returns:
+        Select statement returning the live row count.
+
+    Raises:
+        ValueError: If the counter name is unknown.
+    """
+    if name == USERS:
+        return select(func.count()).select_from(User)
+    if name == POSTS:
+        return select(func.count()).select_from(Post)
+    if name == UPLOADS:
+        return select(func.count()).select_from(Upload)
+    if name.startswith(f"{POSTS}:"):
+        post_status = PostStatus(name.split(":", 1)[1])
+        return select(func.count()).select_from(Post).where(Post.status == post_status)
+    raise ValueError(f"Unknown counter: {name}")
+
+
+async def adjust_counter(db: AsyncSession, name: str, delta: int) -> None:
+    """Add ``delta`` to a counter within the caller's transaction.
+
+    Must be called after the row change has been flushed. If the counter
+    row does not exist yet it is seeded from a live count, which already
+    includes the flushed change.
+
+    Args:
+        db: Database session with pending changes flushed.
+        name: Counter name.
+        delta: Amount to add (negative to subtract).
+    """
+    if delta == 0:
+        return
+    increment = (
+        update(RowCounter)
+        .where(RowCounter.name == name)
+        .values(value=RowCounter.value + delta)
+    )
+    if (await db.execute(increment)).rowcount == 0:
+        value = await db.scalar(_count_query(name))
+        try:
+            async with db.begin_nested():
+                db.add(RowCounter(name=name, value=value))
+        except IntegrityError:
+            # Seeded concurrently by another transaction
+            await db.execute(increment)
+
+
+async def get_counter(db: AsyncSession, name: str) -> int:
+    """Read a counter, seeding it from a live count on first use.
+
+    Args:
+        db: Database session.
+        name: Counter name.
+
+    Returns:
+        Current counter value.
+    """
+    value = await db.scalar(select(RowCounter.value).where(RowCounter.name == name))
+    if value is not None:
+        return value
+
+    # Seed from the primary for the rest of this session; a replica may lag
+    db.info[USE_REPLICA] = False
+    value = await db.scalar(_count_query(name))
+    db.add(RowCounter(name=name, value=value))
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Another request seeded it first
+        await db.rollback()
+        return await db.scalar(select(RowCounter.value).where(RowCounter.name == name))
+    return value
+
+
+async def reconcile_counters(db: AsyncSession) -> dict[str, int]:
+    """Recompute every counter from the source tables.
+
+    Args:
+        db: Database session.
+
+    Returns:
+        Mapping of counter name to its reconciled value.
+    """
+    values = {
+        USERS: await db.scalar(_count_query(USERS)),
+        POSTS: await db.scalar(_count_query(POSTS)),
+        UPLOADS: await db.scalar(_count_query(UPLOADS)),
+    }
+    for post_status in PostStatus:
+        values[post_status_counter(post_status)] = 0
+    for post_status, count in await db.execute(
+        select(Post.status, func.count()).group_by(Post.status)
+    ):
+        values[post_status_counter(post_status)] = count
+
+    existing = set(await db.scalars(select(RowCounter.name)))
+    for name, value in values.items():
+        if name in existing:
+            await db.execute(
+                update(RowCounter).where(RowCounter.name == name).values(value=value)
+            )
+        else:
+            db.add(RowCounter(name=name, value=value))
+    await db.commit()
+    return values
@@ -0,0 +1,176 @@
+"""Bounded process pool for bcrypt password hashing.
+
+bcrypt is deliberately CPU-heavy. Running it on the request thread (or
+anyio's shared thread pool) lets a login burst starve every other
+endpoint, so hashing runs on a dedicated process pool instead. The
+number of in-flight jobs is capped; once the cap is reached, callers get
+an immediate 503 rather than queueing behind the burst.
+"""
+
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+
+from ..config import settings
+from ..utils.security import hash_password, verify_password
+
+
+class PasswordHasher:
+    """Runs password hashing jobs on a bounded process pool.
+
+    Attributes:
+        max_workers: Number of worker processes.
+        queue_limit: Maximum number of jobs running or waiting at once.
+    """
+
+    def __init__(self, max_workers: int | None = None, queue_limit: int = 64) -> None:
+        """Initialize the hasher; worker processes start on first use.
+
+        Args:
+            max_workers: Number of worker processes (defaults to CPU count).
+            queue_limit: Maximum number of in-flight jobs before rejecting.
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.queue_limit = queue_limit
+        self._executor: ProcessPoolExecutor | None = None
+        self._in_flight = 0
+
+    @property
+    def in_flight(self) -> int:
+        """Number of jobs currently running or waiting for a worker."""
+        return self._in_flight
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the process pool, creating it if needed."""
+        if self._executor is None:
+            # spawn avoids forking a parent that already runs threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._executor
+
+    async def _run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """Run ``fn(*args)`` on the pool, rejecting when the queue is full.
+
+        Raises:
+            HTTPException: 503 if the queue is full or the pool broke.
+        """
+        if self._in_flight >= self.queue_limit:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+
+        self._in_flight += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        except BrokenProcessPool:
+            # A worker died; start a fresh pool on the next call
+            self._executor = None
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        finally:
+            self._in_flight -= 1
+
+    async def hash(self, plain_password: str) -> str:
+        """Hash a password on the process pool.
+
+        Args:
+            plain_password: The plain text password to hash.
+
+        Returns:
+            The hashed password string.
+        """
+        return await self._run(hash_password, plain_password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        """Verify a password on the process pool.
+
+        Args:
+            plain_password: The plain text password to verify.
+            hashed_password: The hashed password to compare against.
+
+        Returns:
+            True if the password matches, False otherwise.
+        """
+        return await self._run(verify_password, plain_password, hashed_password)
+
+    def shutdown(self) -> None:
+        """Stop the worker processes; a later call starts a new pool."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Global hasher instance
+password_hasher = PasswordHasher(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    queue_limit=settings.PASSWORD_HASH_QUEUE_LIMIT
+)
+
+
+async def hash_password_async(plain_password: str) -> str:
+    """Hash a password without blocking the event loop.
+
+    Args:
+        plain_password: The plain text password to hash.
+
+    Returns:
+        The hashed password string.
+
+    Raises:
+        HTTPException: 503 if the hashing queue is full.
+    """
+    return await password_hasher.hash(plain_password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Verify a password without blocking the event loop.
+
+    Args:
+        plain_password: The plain text password to verify.
+        hashed_password: The hashed password to compare against.
+
+    Returns:
+        True if the password matches, False otherwise.
+
+    Raises:
+        HTTPException: 503 if the hashing queue is full.
+    """
+    return await password_hasher.verify(plain_password, hashed_password)
+
+
+async def hash_passwords_async(plain_passwords: list[str]) -> list[str | None]:
+    """Hash many passwords in parallel without flooding the shared queue.
+
+    At most one job per worker process is in flight at a time, so a large
+    batch keeps every worker busy while leaving queue room for logins.
+
+    Args:
+        plain_passwords: The plain text passwords to hash.
+
+    Returns:
+        Hashed passwords in input order; None where hashing was rejected
+        because the queue was full.
+    """
+    semaphore = asyncio.Semaphore(password_hasher.max_workers)
+
+    async def hash_one(plain_password: str) -> str | None:
+        async with semaphore:
+            try:
+                return await password_hasher.hash(plain_password)
+            except HTTPException:
+                return None
+
+    return list(await asyncio.gather(*(hash_one(password) for password in plain_passwords)))
@@ -0,0 +1,199 @@
+"""Cross-worker invalidation of per-process caches.
+
+Caches such as the user identity cache live in each worker process, so
+dropping an entry only affects the worker that made the change. To
+reach the others, a write also records the changed row in the
+``cache_invalidations`` table, in the same transaction as the change
+(:func:`publish_invalidation`). Every worker polls that table for rows
+it has not seen yet and drops the matching entries from the caches
+registered for that kind of row (see :class:`CacheInvalidator`), so
+other workers stop serving a stale entry within one poll interval
+instead of when its TTL runs out.
+
+Readers pass the cache's ``generation`` from before their database read
+to ``TTLCache.set``, so a row read before a concurrent write committed
+is not cached after the invalidation has already been applied.
+"""
+
+import asyncio
+import logging
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Hashable
+
+from sqlalchemy import delete, func, or_, select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+
+from ..models.cache_invalidation import CacheInvalidation
+from ..utils.cache import TTLCache
+
+logger = logging.getLogger(__name__)
+
+# Invalidation rows are kept this long; a worker that could not poll for
+# half of it may have missed some and clears its caches instead
+INVALIDATION_RETENTION_SECONDS = 300.0
+
+# How long a skipped id is watched for (rolled back inserts never appear),
+# and how many are watched at most
+GAP_TIMEOUT_SECONDS = 60.0
+MAX_GAPS = 1000
+
+
+def _now() -> datetime:
+    """Return the current UTC time as a naive datetime."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def publish_invalidation(db: AsyncSession, kind: str, key: Hashable) -> None:
+    """Tell every worker to drop its cached copies of a changed row.
+
+    The row is added to the caller's transaction, so the invalidation is
+    published exactly when the change commits. The caller still drops
+    the entries from its own process's caches after committing.
+
+    Args:
+        db: Database session holding the change.
+        kind: Resource type caches are registered under, e.g. ``user``.
+        key: Id of the changed row, or its unique name where the cache
+            is keyed by name.
+    """
+    db.add(CacheInvalidation(kind=kind, key=str(key), created_at=_now()))
+
+
+async def prune_invalidations(
+    engine: AsyncEngine, retention: float = INVALIDATION_RETENTION_SECONDS
+) -> int:
+    """Delete invalidation rows older than ``retention`` seconds.
+
+    The newest row is always kept, so that ids keep increasing even
+    where the database reuses the ids of deleted rows.
+
+    Args:
+        engine: Engine of the primary database.
+        retention: Seconds to keep rows for.
+
+    Returns:
+        Number of rows deleted.
+    """
+    async with engine.begin() as conn:
+        newest = await conn.scalar(select(func.max(CacheInvalidation.id)))
+        if newest is None:
+            return 0
+        result = await conn.execute(delete(CacheInvalidation).where(
+            CacheInvalidation.id < newest,
+            CacheInvalidation.created_at < _now() - timedelta(seconds=retention)
+        ))
+    return result.rowcount
+
+
+class CacheInvalidator:
+    """Applies published invalidations to this process's caches.
+
+    Attributes:
+        last_seen_id: Id of the newest invalidation row already applied,
+            or None before the first poll.
+    """
+
+    def __init__(self) -> None:
+        """Initialize an invalidator with no caches registered."""
+        self.last_seen_id: int | None = None
+        self._caches: dict[str, list[tuple[TTLCache, Callable[[str], Hashable]]]] = (
+            defaultdict(list)
+        )
+        self._last_poll = time.monotonic()
+        # Skipped ids that a slower transaction may still commit, with the
+        # time they were noticed
+        self._gaps: dict[int, float] = {}
+
+    def register(
+        self, kind: str, cache: TTLCache, key_type: Callable[[str], Hashable] = int
+    ) -> None:
+        """Drop entries from ``cache`` when a row of ``kind`` changes.
+
+        Args:
+            kind: Resource type writers publish invalidations under.
+            cache: Cache keyed by the row's id.
+            key_type: Converts the stored key string back to a cache key.
+        """
+        self._caches[kind].append((cache, key_type))
+
+    def clear(self) -> None:
+        """Drop every entry of every registered cache."""
+        for caches in self._caches.values():
+            for cache, _ in caches:
+                cache.clear()
+
+    async def poll(self, engine: AsyncEngine) -> int:
+        """Apply the invalidations published since the previous poll.
+
+        The first poll only records where the log ends, and clears the
+        caches since earlier invalidations are unknown.
+
+        Args:
+            engine: Engine of the primary database.
+
+        Returns:
+            Number of invalidations applied.
+        """
+        first_poll = self.last_seen_id is None
+        async with engine.connect() as conn:
+            if first_poll:
+                rows = []
+                self.last_seen_id = await conn.scalar(
+                    select(func.coalesce(func.max(CacheInvalidation.id), 0))
+                )
+            else:
+                rows = (await conn.execute(
+                    select(CacheInvalidation.id, CacheInvalidation.kind, CacheInvalidation.key)
+                    .where(or_(
+                        CacheInvalidation.id > self.last_seen_id,
+                        CacheInvalidation.id.in_(self._gaps)
+                    ))
+                    .order_by(CacheInvalidation.id)
+                )).all()
+
+        now = time.monotonic()
+        if first_poll or now - self._last_poll > INVALIDATION_RETENTION_SECONDS / 2:
+            # Rows may have been pruned before this worker saw them
+            self.clear()
+        self._last_poll = now
+
+        for row in rows:
+            for cache, key_type in self._caches.get(row.kind, ()):
+                cache.delete(key_type(row.key))
+            if self._gaps.pop(row.id, None) is None:
+                # Ids are assigned on insert but become visible on commit, so
+                # a skipped id may still show up; watch it for a while
+                for missing in range(max(self.last_seen_id + 1, row.id - MAX_GAPS), row.id):
+                    self._gaps[missing] = now
+                self.last_seen_id = row.id
+
+        for gap, noticed_at in list(self._gaps.items()):
+            if now - noticed_at > GAP_TIMEOUT_SECONDS or len(self._gaps) > MAX_GAPS:
+                del self._gaps[gap]
+        return len(rows)
+
+    async def run(self, engine: AsyncEngine, interval: float) -> None:
+        """Poll every ``interval`` seconds until cancelled.
+
+        Old rows are pruned about once per retention period.
+
+        Args:
+            engine: Engine of the primary database.
+            interval: Seconds between polls.
+        """
+        last_pruned = time.monotonic()
+        while True:
+            try:
+                await self.poll(engine)
+                if time.monotonic() - last_pruned > INVALIDATION_RETENTION_SECONDS:
+                    await prune_invalidations(engine)
+                    last_pruned = time.monotonic()
+            except Exception:
+                logger.exception("Cache invalidation poll failed")
+            await asyncio.sleep(interval)
+
+
+# This process's invalidator; caches register with it where they are defined
+cache_invalidator = CacheInvalidator()
@@ -0,0 +1,138 @@
+"""ETags and server-side body caching for single-resource reads.
+
+``get_user`` and ``get_post`` keep the serialized body of each row they
+serve, keyed by id. Entries are dropped by the update and delete
+handlers in this process, and in other workers through the
+invalidations those handlers publish (see app.services.invalidation).
+"""
+
+import hashlib
+from datetime import datetime
+from typing import Any, NamedTuple
+
+import orjson
+from fastapi import Request, Response, status
+from pydantic import BaseModel
+
+from ..config import settings
+from ..utils.cache import TTLCache
+from ..utils.http_range import http_date, is_not_modified
+from ..utils.serialization import dump_rows
+from .invalidation import cache_invalidator
+
+
+class CachedResponse(NamedTuple):
+    """Serialized body of a resource and its validators.
+
+    Attributes:
+        body: Encoded JSON body.
+        etag: Strong entity tag for this version of the row.
+        last_modified: The row's updated_at.
+    """
+
+    body: bytes
+    etag: str
+    last_modified: datetime
+
+
+user_response_cache = TTLCache(
+    max_size=settings.RESPONSE_CACHE_SIZE,
+    default_ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    name="user_response"
+)
+post_response_cache = TTLCache(
+    max_size=settings.RESPONSE_CACHE_SIZE,
+    default_ttl=settings.RESPONSE_CACHE_TTL_SECONDS,
+    name="post_response"
+)
+cache_invalidator.register("user", user_response_cache)
+cache_invalidator.register("post", post_response_cache)
+
+
+def resource_etag(kind: str, resource_id: int, updated_at: datetime, body: bytes) -> str:
+    """Build the ETag for a version of a row.
+
+    ``updated_at`` only has one-second resolution in the database, so the
+    body digest is mixed in to tell apart two edits within one second.
+
+    Args:
+        kind: Resource type, e.g. ``user`` or ``post``.
+        resource_id: Row id.
+        updated_at: Row modification time.
+        body: Serialized body of this version.
+
+    Returns:
+        Quoted entity tag.
+    """
+    digest = hashlib.sha256(f"{kind}:{resource_id}:{updated_at.isoformat()}:".encode("utf-8"))
+    digest.update(body)
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def build_response(kind: str, row: Any, schema: type[BaseModel]) -> CachedResponse:
+    """Serialize a row for a response without caching it.
+
+    Args:
+        kind: Resource type used in the ETag.
+        row: ORM object with the schema's fields as attributes.
+        schema: Response schema describing the output fields.
+
+    Returns:
+        The body and validators.
+    """
+    body = orjson.dumps(dump_rows([row], schema)[0])
+    return CachedResponse(
+        body=body,
+        etag=resource_etag(kind, row.id, row.updated_at, body),
+        last_modified=row.updated_at
+    )
+
+
+def cache_response(
+    cache: TTLCache,
+    kind: str,
+    row: Any,
+    schema: type[BaseModel],
+    generation: int | None = None
+) -> CachedResponse:
+    """Serialize a row for a response and store it in ``cache``.
+
+    Only rows read from the primary may be cached: a lagging replica can
+    return the version an update just replaced, which would then be
+    served to every client, including the writer.
+
+    Args:
+        cache: Cache to store the body in, keyed by the row's id.
+        kind: Resource type used in the ETag.
+        row: ORM object with the schema's fields as attributes.
+        schema: Response schema describing the output fields.
+        generation: The cache's generation from before ``row`` was loaded;
+            the body is not stored if the row may have changed since.
+
+    Returns:
+        The cached body and validators.
+    """
+    cached = build_response(kind, row, schema)
+    cache.set(row.id, cached, generation=generation)
+    return cached
+
+
+def conditional_response(request: Request, cached: CachedResponse) -> Response:
+    """Answer a read with the cached body, or 304 if the client's copy is current.
+
+    Args:
+        request: Incoming request, checked for ``If-None-Match`` and
+            ``If-Modified-Since``.
+        cached: Cached body and validators.
+
+    Returns:
+        A 304 response without a body, or a 200 JSON response.
+    """
+    headers = {
+        "ETag": cached.etag,
+        "Last-Modified": http_date(cached.last_modified),
+        "Cache-Control": "no-cache",
+    }
+    if is_not_modified(request.headers, cached.etag, cached.last_modified):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(content=cached.body, media_type="application/json", headers=headers)
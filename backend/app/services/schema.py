@@ -0,0 +1,259 @@
+"""Versioned schema setup at startup.
+
+``Base.metadata.create_all`` reflects every table on each call, which
+is slow when many workers boot at once and puts load on the database.
+Instead, the DDL of the models is hashed into a fingerprint and stored
+in the ``schema_version`` table once the schema is in place. Booting
+then costs a single primary-key lookup while the fingerprint matches.
+
+When it does not match (first boot, or a deploy that changed the
+models), one process becomes the leader by inserting the ``lock`` row
+and runs the migration. The other processes wait until the new
+fingerprint appears. A lock left behind by a crashed leader expires
+after the lock timeout. Background jobs use the same lock rows (see
+:func:`try_lock`) to run in one worker only.
+"""
+
+import asyncio
+import hashlib
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Literal
+
+from sqlalchemy import (
+    Column,
+    Connection,
+    DateTime,
+    MetaData,
+    String,
+    Table,
+    delete,
+    insert,
+    inspect,
+    select,
+    update,
+)
+from sqlalchemy.engine import Dialect
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+from ..models.post import Post, PostStatus
+from .search import posts_fts
+
+# Bump when a schema change is not visible in the models' DDL (e.g. the
+# posts_fts table created by a DDL event), so that it still migrates
+SCHEMA_VERSION = 2
+
+FINGERPRINT_ROW = "fingerprint"
+LOCK_ROW = "lock"
+
+# Kept out of Base.metadata so that it is not part of the fingerprint
+schema_version = Table(
+    "schema_version",
+    MetaData(),
+    Column("name", String(32), primary_key=True),
+    Column("value", String(255), nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+SchemaBootResult = Literal["current", "migrated", "waited"]
+
+
+def schema_fingerprint(metadata: MetaData, dialect: Dialect) -> str:
+    """Hash the DDL of every table and index in ``metadata``.
+
+    Args:
+        metadata: Metadata of the application models.
+        dialect: Dialect to render the DDL for.
+
+    Returns:
+        Hex SHA-256 digest, including SCHEMA_VERSION.
+    """
+    digest = hashlib.sha256(f"version {SCHEMA_VERSION}\n".encode())
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        digest.update(str(CreateTable(table).compile(dialect=dialect)).encode())
+        for index in sorted(table.indexes, key=lambda i: i.name or ""):
+            digest.update(str(CreateIndex(index).compile(dialect=dialect)).encode())
+    return digest.hexdigest()
+
+
+def create_missing(conn: Connection, metadata: MetaData) -> None:
+    """Create missing tables, and missing indexes on existing tables.
+
+    ``create_all`` alone only creates indexes along with new tables. On
+    SQLite, the ``posts_fts`` search table is only created along with
+    ``posts``, so it is created here if ``posts`` predates it, and filled
+    from the existing posts.
+
+    Args:
+        conn: Sync connection to migrate through.
+        metadata: Metadata of the application models.
+    """
+    inspector = inspect(conn)
+    existing_tables = set(inspector.get_table_names())
+    metadata.create_all(conn)
+    for table in metadata.sorted_tables:
+        if table.name not in existing_tables:
+            continue
+        existing_indexes = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in table.indexes:
+            if index.name not in existing_indexes:
+                index.create(conn)
+
+    if (
+        conn.dialect.name == "sqlite"
+        and Post.__tablename__ in metadata.tables
+        and Post.__tablename__ in existing_tables
+        and posts_fts.name not in existing_tables
+    ):
+        conn.exec_driver_sql("CREATE VIRTUAL TABLE posts_fts USING fts5(title, content)")
+        conn.execute(insert(posts_fts).from_select(
+            ["rowid", "title", "content"],
+            select(Post.id, Post.title, Post.content).where(Post.status != PostStatus.DELETED)
+        ))
+
+
+def _now() -> datetime:
+    """Return the current UTC time as a naive datetime."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+async def stored_fingerprint(engine: AsyncEngine) -> str | None:
+    """Return the fingerprint of the deployed schema.
+
+    Args:
+        engine: Engine of the primary database.
+
+    Returns:
+        The stored fingerprint, or None before the first migration.
+    """
+    try:
+        async with engine.connect() as conn:
+            return (await conn.execute(
+                select(schema_version.c.value).where(schema_version.c.name == FINGERPRINT_ROW)
+            )).scalar_one_or_none()
+    except DBAPIError:
+        # No schema_version table yet
+        return None
+
+
+def _lock_owner() -> str:
+    """Identify this process in a lock row."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def try_lock(engine: AsyncEngine, name: str, lock_timeout: float) -> bool:
+    """Try to take the named lock row in ``schema_version``.
+
+    Besides the migration lock, this elects a single worker for
+    background jobs. A lock older than ``lock_timeout`` is considered
+    abandoned and taken over.
+
+    Args:
+        engine: Engine of the primary database.
+        name: Lock row name.
+        lock_timeout: Seconds after which a held lock expires.
+
+    Returns:
+        True if this process now holds the lock.
+    """
+    try:
+        async with engine.begin() as conn:
+            await conn.execute(delete(schema_version).where(
+                schema_version.c.name == name,
+                schema_version.c.updated_at < _now() - timedelta(seconds=lock_timeout)
+            ))
+        async with engine.begin() as conn:
+            await conn.execute(
+                insert(schema_version).values(name=name, value=_lock_owner(), updated_at=_now())
+            )
+    except IntegrityError:
+        return False
+    return True
+
+
+async def release_lock(engine: AsyncEngine, name: str) -> None:
+    """Give up a lock taken with :func:`try_lock`.
+
+    A lock that expired and was taken over by another process is left
+    alone.
+
+    Args:
+        engine: Engine of the primary database.
+        name: Lock row name.
+    """
+    async with engine.begin() as conn:
+        await conn.execute(delete(schema_version).where(
+            schema_version.c.name == name, schema_version.c.value == _lock_owner()
+        ))
+
+
+async def _store_fingerprint(conn: AsyncConnection, fingerprint: str) -> None:
+    """Record ``fingerprint`` as the deployed schema."""
+    result = await conn.execute(
+        update(schema_version)
+        .where(schema_version.c.name == FINGERPRINT_ROW)
+        .values(value=fingerprint, updated_at=_now())
+    )
+    if result.rowcount == 0:
+        await conn.execute(insert(schema_version).values(
+            name=FINGERPRINT_ROW, value=fingerprint, updated_at=_now()
+        ))
+
+
+async def ensure_schema(
+    engine: AsyncEngine,
+    metadata: MetaData,
+    lock_timeout: float = 60.0,
+    poll_interval: float = 0.2
+) -> SchemaBootResult:
+    """Bring the database schema up to date with the models.
+
+    Migrating creates missing tables and indexes (see
+    :func:`create_missing`) but does not alter existing columns.
+
+    Args:
+        engine: Engine of the primary database.
+        metadata: Metadata of the application models.
+        lock_timeout: Seconds after which another process's lock is
+            considered abandoned; migrations must finish within it.
+        poll_interval: Seconds between checks while waiting.
+
+    Returns:
+        ``current`` if the schema was already up to date, ``migrated`` if
+        this process migrated it, ``waited`` if another process did.
+
+    Raises:
+        TimeoutError: If the lock stayed taken for longer than
+            ``lock_timeout``.
+    """
+    fingerprint = schema_fingerprint(metadata, engine.dialect)
+    if await stored_fingerprint(engine) == fingerprint:
+        return "current"
+
+    async with engine.begin() as conn:
+        await conn.execute(CreateTable(schema_version, if_not_exists=True))
+
+    deadline = time.monotonic() + lock_timeout
+    while True:
+        if await try_lock(engine, LOCK_ROW, lock_timeout):
+            try:
+                if await stored_fingerprint(engine) == fingerprint:
+                    return "waited"
+                async with engine.begin() as conn:
+                    await conn.run_sync(create_missing, metadata)
+                    await _store_fingerprint(conn, fingerprint)
+                return "migrated"
+            finally:
+                await release_lock(engine, LOCK_ROW)
+
+        # A lock taken before the deadline has expired by now, so the
+        # attempt above only fails if it was taken again since
+        if time.monotonic() > deadline:
+            raise TimeoutError("Timed out waiting for another process to migrate the schema")
+        await asyncio.sleep(poll_interval)
+        if await stored_fingerprint(engine) == fingerprint:
+            return "waited"
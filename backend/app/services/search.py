@@ -0,0 +1,145 @@
+"""Full-text search over posts.
+
+MySQL uses the FULLTEXT index on ``posts(title, content)``, which the
+server maintains by itself. SQLite has no FULLTEXT indexes, so posts are
+mirrored into the ``posts_fts`` FTS5 table, and :func:`sync_post_index`
+must be called whenever a post is created, edited or deleted.
+
+On both backends a post must contain every search word to match. MySQL
+additionally ignores its stopwords and words shorter than
+``innodb_ft_min_token_size``.
+"""
+
+import re
+
+from sqlalchemy import Select, column, delete, insert, literal_column, select, table
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models.post import Post, PostStatus
+
+# Search terms beyond this are ignored
+SEARCH_MAX_TERMS = 32
+
+posts_fts = table("posts_fts", column("rowid"), column("title"), column("content"))
+
+
+def _dialect(db: AsyncSession) -> str:
+    """Return the name of the database dialect behind a session."""
+    return db.get_bind().dialect.name
+
+
+def _search_terms(q: str) -> list[str]:
+    """Split free text into search words, dropping punctuation and operators."""
+    return re.findall(r"\w+", q)[:SEARCH_MAX_TERMS]
+
+
+def _fts5_query(q: str) -> str | None:
+    """Turn free text into an FTS5 query matching all of its words.
+
+    Each word is quoted so that FTS5 operators in user input are treated
+    as plain text.
+    """
+    return " ".join(f'"{term}"' for term in _search_terms(q)) or None
+
+
+def _boolean_query(q: str) -> str | None:
+    """Turn free text into a MySQL boolean-mode query requiring all words.
+
+    Natural language mode would match posts containing any one word;
+    ``+`` makes each word mandatory, as in the FTS5 query. Words are
+    quoted so that boolean operators in user input are treated as text.
+    """
+    return " ".join(f'+"{term}"' for term in _search_terms(q)) or None
+
+
+def search_query(dialect: str, q: str) -> Select | None:
+    """Build the search query for a database backend.
+
+    Args:
+        dialect: Dialect name, ``sqlite`` or ``mysql``.
+        q: Free-text query.
+
+    Returns:
+        Select of ``(Post, score)`` ordered by relevance, excluding deleted
+        posts, or None when ``q`` has no searchable words.
+    """
+    if dialect == "sqlite":
+        fts_query = _fts5_query(q)
+        if fts_query is None:
+            return None
+        # bm25 rank: lower is better
+        rank = literal_column("posts_fts.rank")
+        query = (
+            select(Post, (-rank).label("score"))
+            .join(posts_fts, posts_fts.c.rowid == Post.id)
+            .where(literal_column("posts_fts").op("MATCH")(fts_query))
+            .order_by(rank, Post.id)
+        )
+    else:
+        boolean_query = _boolean_query(q)
+        if boolean_query is None:
+            return None
+        score = match(Post.title, Post.content, against=boolean_query).in_boolean_mode()
+        query = (
+            select(Post, score.label("score"))
+            .where(score > 0)
+            .order_by(score.desc(), Post.id)
+        )
+    return query.where(Post.status != PostStatus.DELETED)
+
+
+async def sync_post_index(db: AsyncSession, post: Post) -> None:
+    """Update the search index for a created, edited or deleted post.
+
+    A no-op on MySQL, whose FULLTEXT index follows the table. Deleted
+    posts are removed from the index. Runs in the caller's transaction.
+
+    Args:
+        db: Database session.
+        post: The post after the change (flushed, so it has an id).
+    """
+    if _dialect(db) != "sqlite":
+        return
+    await db.execute(delete(posts_fts).where(posts_fts.c.rowid == post.id))
+    if post.status != PostStatus.DELETED:
+        await db.execute(
+            insert(posts_fts).values(rowid=post.id, title=post.title, content=post.content)
+        )
+
+
+async def unindex_posts(db: AsyncSession, post_ids: list[int]) -> None:
+    """Remove posts that left the ``posts`` table from the search index.
+
+    A no-op on MySQL. Runs in the caller's transaction.
+
+    Args:
+        db: Database session.
+        post_ids: Ids of the removed posts.
+    """
+    if _dialect(db) == "sqlite" and post_ids:
+        await db.execute(delete(posts_fts).where(posts_fts.c.rowid.in_(post_ids)))
+
+
+async def search_posts(
+    db: AsyncSession, q: str, skip: int, limit: int
+) -> list[tuple[Post, float]]:
+    """Find posts matching ``q``, best matches first.
+
+    Deleted posts are never returned.
+
+    Args:
+        db: Database session.
+        q: Free-text query.
+        skip: Number of results to skip.
+        limit: Maximum number of results to return.
+
+    Returns:
+        ``(post, score)`` pairs ordered by descending relevance; scores
+        are only comparable within one database backend.
+    """
+    query = search_query(_dialect(db), q)
+    if query is None:
+        return []
+    query = query.offset(skip).limit(limit)
+    return [(post, float(score)) for post, score in (await db.execute(query)).all()]
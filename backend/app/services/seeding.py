@@ -0,0 +1,276 @@
+"""Synthetic data generation for load and performance testing.
+
+Rows are generated in memory and written with multi-row INSERTs
+(``executemany``) in chunks, one transaction per chunk, so millions of
+rows load in minutes rather than the hours one ``POST`` per row would
+take. Every seeded user shares one precomputed bcrypt hash, since
+hashing is by far the most expensive part of creating a user.
+"""
+
+import random
+import uuid
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Iterator
+
+from sqlalchemy import Connection, Engine, event, func, insert, select
+
+from ..models.post import Post, PostStatus
+from ..models.upload import Upload
+from ..models.user import User, UserRole
+from ..utils.security import hash_password
+from .search import posts_fts
+
+SEED_CHUNK_SIZE = 10_000
+
+# Share of seeded posts per status, roughly what a live site carries
+POST_STATUS_WEIGHTS = {
+    PostStatus.PUBLISHED: 0.6,
+    PostStatus.DRAFT: 0.2,
+    PostStatus.UNPUBLISHED: 0.15,
+    PostStatus.DELETED: 0.05,
+}
+ADMIN_SHARE = 0.01
+INACTIVE_SHARE = 0.03
+
+# Seeded rows are spread over this period, oldest first
+SEED_TIME_SPAN = timedelta(days=3 * 365)
+
+WORDS = (
+    "api async backend bug cache cloud code data database deploy design docker "
+    "error feature index latency log migration model mysql network python "
+    "query release replica request review schema search server service test "
+    "update user worker"
+).split()
+
+SAMPLE_FILE = (b"%PDF-1.4\n", "application/pdf", ".pdf")
+
+
+def skewed_choice(rng: random.Random, values: list[int], skew: float) -> int:
+    """Pick a value with a power-law bias towards the start of ``values``.
+
+    Args:
+        rng: Random number generator.
+        values: Candidates, most popular first.
+        skew: Exponent; 1.0 is uniform, higher values concentrate picks on
+            fewer values (at 3.0 about half the picks hit the first 12.5%).
+
+    Returns:
+        The chosen value.
+    """
+    return values[int(len(values) * rng.random() ** skew)]
+
+
+def _timestamps(total: int, now: datetime) -> Callable[[int], datetime]:
+    """Return evenly spaced creation times for ``total`` rows, oldest first."""
+    step = SEED_TIME_SPAN / max(total, 1)
+    start = now - SEED_TIME_SPAN
+    return lambda index: start + step * index
+
+
+def _insert_chunks(
+    engine: Engine,
+    table,
+    rows: Iterator[dict],
+    chunk_size: int = SEED_CHUNK_SIZE
+) -> int:
+    """Insert rows in chunks of ``chunk_size``, committing after each chunk.
+
+    Returns:
+        Number of rows inserted.
+    """
+    inserted = 0
+    chunk: list[dict] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == chunk_size:
+            with engine.begin() as conn:
+                conn.execute(insert(table), chunk)
+            inserted += len(chunk)
+            chunk = []
+    if chunk:
+        with engine.begin() as conn:
+            conn.execute(insert(table), chunk)
+        inserted += len(chunk)
+    return inserted
+
+
+def _max_id(conn: Connection, column) -> int:
+    """Return the largest value of an id column, or 0 for an empty table."""
+    return conn.execute(select(func.coalesce(func.max(column), 0))).scalar_one()
+
+
+def seed_users(
+    engine: Engine,
+    count: int,
+    password: str,
+    rng: random.Random,
+    now: datetime
+) -> list[int]:
+    """Insert ``count`` users sharing one password.
+
+    Usernames continue from the highest existing user id, so seeding can
+    be repeated against the same database.
+
+    Args:
+        engine: Sync engine to write with.
+        count: Number of users to create.
+        password: Plain text password of every seeded user.
+        rng: Random number generator.
+        now: Creation time of the newest user.
+
+    Returns:
+        Ids of the created users, oldest first.
+    """
+    with engine.connect() as conn:
+        first = _max_id(conn, User.id) + 1
+    password_hash = hash_password(password)
+    created_at = _timestamps(count, now)
+
+    def rows() -> Iterator[dict]:
+        for index in range(count):
+            number = first + index
+            timestamp = created_at(index)
+            yield {
+                "username": f"user{number}",
+                "email": f"user{number}@example.com",
+                "password_hash": password_hash,
+                "full_name": f"User {number}",
+                "role": UserRole.ADMIN if rng.random() < ADMIN_SHARE else UserRole.USER,
+                "is_active": rng.random() >= INACTIVE_SHARE,
+                "created_at": timestamp,
+                "updated_at": timestamp,
+            }
+
+    _insert_chunks(engine, User, rows())
+    with engine.connect() as conn:
+        return list(conn.execute(
+            select(User.id).where(User.id >= first).order_by(User.id)
+        ).scalars())
+
+
+def seed_posts(
+    engine: Engine,
+    count: int,
+    author_ids: list[int],
+    rng: random.Random,
+    now: datetime,
+    skew: float = 3.0
+) -> int:
+    """Insert ``count`` posts with mixed statuses and skewed authorship.
+
+    A few prolific authors write most posts, as on real sites. On SQLite
+    the posts are also added to the ``posts_fts`` search index.
+
+    Args:
+        engine: Sync engine to write with.
+        count: Number of posts to create.
+        author_ids: Candidate authors, most prolific first.
+        rng: Random number generator.
+        now: Creation time of the newest post.
+        skew: Authorship skew exponent (see :func:`skewed_choice`).
+
+    Returns:
+        Number of posts created.
+    """
+    if not author_ids:
+        raise ValueError("Posts need at least one author")
+
+    with engine.connect() as conn:
+        first = _max_id(conn, Post.id) + 1
+    statuses = list(POST_STATUS_WEIGHTS)
+    weights = list(POST_STATUS_WEIGHTS.values())
+    created_at = _timestamps(count, now)
+
+    def rows() -> Iterator[dict]:
+        for index in range(count):
+            timestamp = created_at(index)
+            yield {
+                "title": " ".join(rng.choices(WORDS, k=rng.randint(3, 8))).capitalize(),
+                "content": " ".join(rng.choices(WORDS, k=rng.randint(20, 120))),
+                "status": rng.choices(statuses, weights)[0],
+                "user_id": skewed_choice(rng, author_ids, skew),
+                "created_at": timestamp,
+                "updated_at": timestamp,
+            }
+
+    inserted = _insert_chunks(engine, Post, rows())
+
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(insert(posts_fts).from_select(
+                ["rowid", "title", "content"],
+                select(Post.id, Post.title, Post.content).where(
+                    Post.id >= first, Post.status != PostStatus.DELETED
+                )
+            ))
+    return inserted
+
+
+def seed_uploads(
+    engine: Engine,
+    count: int,
+    owner_ids: list[int],
+    directory: Path,
+    rng: random.Random,
+    now: datetime,
+    size: int = 16 * 1024,
+    skew: float = 3.0
+) -> int:
+    """Write ``count`` files to ``directory`` and index them as uploads.
+
+    Files are stored under the same ``<uuid>_<name>`` scheme as the upload
+    endpoint uses in plain storage mode.
+
+    Args:
+        engine: Sync engine to write with.
+        count: Number of files to create.
+        owner_ids: Candidate owners, most active first.
+        directory: Upload directory to write the files into.
+        rng: Random number generator.
+        now: Upload time of the newest file.
+        size: Size of each file in bytes.
+        skew: Ownership skew exponent (see :func:`skewed_choice`).
+
+    Returns:
+        Number of uploads created.
+    """
+    directory.mkdir(parents=True, exist_ok=True)
+    header, media_type, extension = SAMPLE_FILE
+    content = header + b"x" * max(size - len(header), 0)
+    created_at = _timestamps(count, now)
+
+    def rows() -> Iterator[dict]:
+        for index in range(count):
+            original_name = f"document{index}{extension}"
+            stored_name = f"{uuid.UUID(int=rng.getrandbits(128), version=4)}_{original_name}"
+            (directory / stored_name).write_bytes(content)
+            yield {
+                "stored_name": stored_name,
+                "original_name": original_name,
+                "size": len(content),
+                "media_type": media_type,
+                "owner_id": skewed_choice(rng, owner_ids, skew) if owner_ids else None,
+                "created_at": created_at(index),
+            }
+
+    return _insert_chunks(engine, Upload, rows())
+
+
+def tune_for_bulk_load(engine: Engine) -> None:
+    """Skip fsync on SQLite connections for a faster one-off load.
+
+    A power loss during seeding can then corrupt the database, which is
+    fine for throwaway data. Other databases are left alone.
+
+    Args:
+        engine: Sync engine used for seeding, before it opens connections.
+    """
+    if engine.dialect.name != "sqlite":
+        return
+
+    @event.listens_for(engine, "connect")
+    def disable_sync(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
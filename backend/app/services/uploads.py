@@ -0,0 +1,478 @@
+"""Upload metadata index and content-addressed blob storage.
+
+The ``uploads`` table records every stored file so that listing does
+not have to walk and ``stat()`` the upload directory. It is written on
+upload and delete; :func:`reindex_uploads` rebuilds it from disk.
+
+In content-addressed mode, file bodies live once per SHA-256 digest
+under ``.blobs/`` and ``upload_blobs.ref_count`` tracks how many
+uploads point at each one. A blob whose count drops to zero is
+deleted after the releasing transaction commits; :func:`purge_blobs`
+catches any that were missed.
+"""
+
+import asyncio
+import hashlib
+import logging
+import mimetypes
+import os
+import re
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import NamedTuple
+
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import delete, func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from ..config import settings
+from ..models.upload import Upload, UploadBlob
+from ..utils.cache import TTLCache
+from .counters import reconcile_counters
+from .invalidation import cache_invalidator
+
+logger = logging.getLogger(__name__)
+
+# Stored files are named "{uuid4}_{original filename}"
+STORED_NAME_PATTERN = re.compile(
+    r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}_(.+)$"
+)
+
+BLOB_DIRECTORY_NAME = ".blobs"
+
+# Minimum age of a blob file without a row before purge_blobs deletes it
+BLOB_PURGE_GRACE_SECONDS = 3600.0
+
+
+def blob_path(directory: Path, sha256: str) -> Path:
+    """Return where the blob with the given digest is stored.
+
+    Blobs are fanned out over two directory levels to keep directories small.
+
+    Args:
+        directory: Upload directory.
+        sha256: Hex SHA-256 digest of the content.
+
+    Returns:
+        Path of the blob file.
+    """
+    return directory / BLOB_DIRECTORY_NAME / sha256[:2] / sha256[2:4] / sha256
+
+
+def upload_path(directory: Path, upload: Upload) -> Path:
+    """Return where an upload's content is stored.
+
+    Args:
+        directory: Upload directory.
+        upload: Upload metadata row.
+
+    Returns:
+        The blob path in content-addressed mode, else the per-upload file.
+    """
+    if upload.blob_sha256:
+        return blob_path(directory, upload.blob_sha256)
+    return directory / upload.stored_name
+
+
+def _place_blob(temp_path: Path, path: Path) -> None:
+    """Move a received file into blob storage unless the blob already exists."""
+    if path.exists():
+        temp_path.unlink(missing_ok=True)
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    os.replace(temp_path, path)
+
+
+async def store_blob(
+    db: AsyncSession, directory: Path, temp_path: Path, size: int, sha256: str
+) -> Path:
+    """Add a reference to the blob for ``sha256``, storing it if new.
+
+    The temp file is moved into place when no copy exists yet, and
+    discarded otherwise. The reference count change is part of the
+    caller's transaction.
+
+    Args:
+        db: Database session.
+        directory: Upload directory.
+        temp_path: Fully written temp file holding the content.
+        size: Content size in bytes.
+        sha256: Hex SHA-256 digest of the content.
+
+    Returns:
+        Path of the blob file.
+    """
+    increment = (
+        update(UploadBlob)
+        .where(UploadBlob.sha256 == sha256)
+        .values(ref_count=UploadBlob.ref_count + 1)
+    )
+    if (await db.execute(increment)).rowcount == 0:
+        try:
+            async with db.begin_nested():
+                db.add(UploadBlob(sha256=sha256, size=size, ref_count=1))
+        except IntegrityError:
+            # Stored concurrently by another upload of the same content
+            await db.execute(increment)
+
+    path = blob_path(directory, sha256)
+    await run_in_threadpool(_place_blob, temp_path, path)
+    return path
+
+
+async def release_blob(db: AsyncSession, sha256: str) -> bool:
+    """Drop a reference to a blob.
+
+    Only the reference count changes, as part of the caller's
+    transaction; the blob file stays until :func:`discard_blob` runs
+    after the caller has committed, so a rolled back delete never loses
+    content.
+
+    Args:
+        db: Database session.
+        sha256: Hex SHA-256 digest of the blob.
+
+    Returns:
+        True if no references remain and the blob should be discarded.
+    """
+    await db.execute(
+        update(UploadBlob)
+        .where(UploadBlob.sha256 == sha256)
+        .values(ref_count=UploadBlob.ref_count - 1)
+    )
+    remaining = await db.scalar(select(UploadBlob.ref_count).where(UploadBlob.sha256 == sha256))
+    return remaining is not None and remaining <= 0
+
+
+async def discard_blob(db: AsyncSession, directory: Path, sha256: str) -> bool:
+    """Delete a blob that is no longer referenced, and commit.
+
+    Call after the transaction that released the last reference has
+    committed. The ``upload_blobs`` row is deleted only while its count
+    is still zero, and the file is unlinked before that delete commits:
+    a concurrent upload of the same content waits on the row lock and
+    then stores a fresh copy, or has already taken a new reference and
+    the blob is kept.
+
+    Args:
+        db: Database session.
+        directory: Upload directory.
+        sha256: Hex SHA-256 digest of the blob.
+
+    Returns:
+        True if the blob was deleted.
+    """
+    result = await db.execute(
+        delete(UploadBlob).where(UploadBlob.sha256 == sha256, UploadBlob.ref_count <= 0)
+    )
+    if result.rowcount == 0:
+        await db.rollback()
+        return False
+    await run_in_threadpool(blob_path(directory, sha256).unlink, True)
+    await db.commit()
+    return True
+
+
+def _blobs_modified_before(directory: Path, cutoff: float) -> set[str]:
+    """Return the digests of blob files last modified before ``cutoff``."""
+    root = directory / BLOB_DIRECTORY_NAME
+    if not root.is_dir():
+        return set()
+    return {
+        path.name for path in root.glob("*/*/*")
+        if path.is_file() and path.stat().st_mtime < cutoff
+    }
+
+
+async def purge_blobs(
+    db: AsyncSession, directory: Path, grace: float = BLOB_PURGE_GRACE_SECONDS
+) -> int:
+    """Delete blobs that nothing references any more.
+
+    Covers blobs whose last reference was released without a following
+    :func:`discard_blob` (e.g. the process died in between), and blob
+    files without an ``upload_blobs`` row at all. The latter are only
+    deleted once older than ``grace``, because an upload in progress
+    places its blob before its row commits.
+
+    Args:
+        db: Database session on the primary.
+        directory: Upload directory.
+        grace: Minimum age in seconds of a blob file without a row.
+
+    Returns:
+        Number of blobs deleted.
+    """
+    unreferenced = list(await db.scalars(
+        select(UploadBlob.sha256).where(UploadBlob.ref_count <= 0)
+    ))
+    await db.rollback()
+    purged = 0
+    for sha256 in unreferenced:
+        purged += await discard_blob(db, directory, sha256)
+
+    candidates = await run_in_threadpool(
+        _blobs_modified_before, directory, time.time() - grace
+    )
+    orphans = sorted(candidates)
+    known = set()
+    for start in range(0, len(orphans), 500):
+        known.update(await db.scalars(
+            select(UploadBlob.sha256).where(UploadBlob.sha256.in_(orphans[start:start + 500]))
+        ))
+    await db.rollback()
+    for sha256 in candidates - known:
+        await run_in_threadpool(blob_path(directory, sha256).unlink, True)
+        purged += 1
+    return purged
+
+
+async def purge_blobs_periodically(
+    session_factory: async_sessionmaker[AsyncSession],
+    directory: Path,
+    interval: float
+) -> None:
+    """Run :func:`purge_blobs` every ``interval`` seconds until cancelled.
+
+    Args:
+        session_factory: Factory for sessions on the primary.
+        directory: Upload directory.
+        interval: Seconds between runs.
+    """
+    while True:
+        try:
+            async with session_factory() as db:
+                purged = await purge_blobs(db, directory)
+            if purged:
+                logger.info("Purged %d unreferenced blobs", purged)
+        except Exception:
+            logger.exception("Blob purge failed")
+        await asyncio.sleep(interval)
+
+
+def original_name_from(stored_name: str) -> str:
+    """Recover the client filename from a stored filename.
+
+    Args:
+        stored_name: Name of the file on disk.
+
+    Returns:
+        The part after the UUID prefix, or the whole name if there is none.
+    """
+    match = STORED_NAME_PATTERN.match(stored_name)
+    return match.group(1) if match else stored_name
+
+
+class FileMeta(NamedTuple):
+    """Cached metadata needed to serve a stored file.
+
+    Attributes:
+        path: Location of the file on disk.
+        size: File size in bytes.
+        media_type: MIME type to serve the file with.
+        last_modified: Time the file was stored.
+        etag: Strong entity tag for the file's content.
+    """
+
+    path: Path
+    size: int
+    media_type: str
+    last_modified: datetime
+    etag: str
+
+
+# Stored files are immutable, so their metadata can be cached until the
+# file is deleted; other workers drop it on their next invalidation poll
+file_meta_cache = TTLCache(
+    max_size=settings.FILE_META_CACHE_SIZE,
+    default_ttl=settings.FILE_META_CACHE_TTL_SECONDS,
+    name="file_meta"
+)
+cache_invalidator.register("file", file_meta_cache, key_type=str)
+
+
+def make_etag(stored_name: str, size: int, stored_at: datetime) -> str:
+    """Build a strong ETag for an immutable stored file.
+
+    Args:
+        stored_name: Unique name of the file on disk.
+        size: File size in bytes.
+        stored_at: Time the file was stored.
+
+    Returns:
+        Quoted entity tag.
+    """
+    digest = hashlib.sha256(f"{stored_name}:{size}:{stored_at.isoformat()}".encode("utf-8"))
+    return f'"{digest.hexdigest()[:32]}"'
+
+
+def _stat_file_meta(file_path: Path) -> FileMeta | None:
+    """Build metadata for an unindexed file from the filesystem."""
+    if not file_path.is_file():
+        return None
+    stat = file_path.stat()
+    modified_at = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).replace(tzinfo=None)
+    media_type, _ = mimetypes.guess_type(file_path.name)
+    return FileMeta(
+        path=file_path,
+        size=stat.st_size,
+        media_type=media_type or "application/octet-stream",
+        last_modified=modified_at,
+        etag=make_etag(file_path.name, stat.st_size, modified_at)
+    )
+
+
+async def get_file_meta(db: AsyncSession, directory: Path, stored_name: str) -> FileMeta | None:
+    """Look up the metadata for serving a stored file.
+
+    Served from :data:`file_meta_cache` when possible, then from the
+    uploads table. Files missing from the index fall back to ``stat()``
+    so uploads from before the index existed keep working.
+
+    Args:
+        db: Database session.
+        directory: Upload directory.
+        stored_name: Name of the file on disk.
+
+    Returns:
+        The file's metadata, or None if it does not exist.
+    """
+    meta = file_meta_cache.get(stored_name)
+    if meta is not None:
+        return meta
+
+    upload = await db.scalar(select(Upload).where(Upload.stored_name == stored_name))
+    if upload is not None:
+        meta = FileMeta(
+            path=upload_path(directory, upload),
+            size=upload.size,
+            media_type=(
+                upload.media_type
+                or mimetypes.guess_type(stored_name)[0]
+                or "application/octet-stream"
+            ),
+            last_modified=upload.created_at,
+            etag=(
+                f'"{upload.blob_sha256}"' if upload.blob_sha256
+                else make_etag(stored_name, upload.size, upload.created_at)
+            )
+        )
+    else:
+        meta = await run_in_threadpool(_stat_file_meta, directory / stored_name)
+        if meta is None:
+            return None
+
+    file_meta_cache.set(stored_name, meta)
+    return meta
+
+
+def upload_to_dict(upload: Upload, directory: Path) -> dict:
+    """Build the API representation of an upload.
+
+    Args:
+        upload: Upload metadata row.
+        directory: Upload directory the file lives in.
+
+    Returns:
+        Dictionary with the file's details.
+    """
+    return {
+        "id": upload.id,
+        "filename": upload.stored_name,
+        "original_name": upload.original_name,
+        "size": upload.size,
+        "path": str(upload_path(directory, upload)),
+        "url": f"/api/v1/files/{upload.stored_name}",
+        "media_type": upload.media_type,
+        "owner_id": upload.owner_id,
+        "created_at": upload.created_at,
+    }
+
+
+def _scan_directory(directory: Path) -> dict[str, tuple[int, datetime]]:
+    """Return size and modification time (naive UTC) of every stored file."""
+    files = {}
+    for file_path in directory.iterdir():
+        if file_path.is_file() and not file_path.name.startswith("."):
+            stat = file_path.stat()
+            modified_at = datetime.fromtimestamp(stat.st_mtime, tz=timezone.utc).replace(tzinfo=None)
+            files[file_path.name] = (stat.st_size, modified_at)
+    return files
+
+
+def _scan_blobs(directory: Path) -> set[str]:
+    """Return the digests of every blob file on disk."""
+    root = directory / BLOB_DIRECTORY_NAME
+    if not root.is_dir():
+        return set()
+    return {path.name for path in root.glob("*/*/*") if path.is_file()}
+
+
+async def reindex_uploads(db: AsyncSession, directory: Path) -> dict[str, int]:
+    """Synchronize the uploads table with the files on disk.
+
+    Files missing from the table are added (with an unknown owner),
+    rows whose file or blob is gone are removed, and existing rows keep
+    their owner. Blob reference counts are recomputed, unreferenced
+    blobs are deleted, and the uploads counter is reconciled afterwards.
+
+    Args:
+        db: Database session.
+        directory: Upload directory to scan.
+
+    Returns:
+        Counts of ``added``, ``removed`` and ``total`` uploads.
+    """
+    on_disk = await run_in_threadpool(_scan_directory, directory)
+    blobs_on_disk = await run_in_threadpool(_scan_blobs, directory)
+    rows = (await db.execute(select(Upload.stored_name, Upload.blob_sha256))).all()
+    indexed = {stored_name for stored_name, _ in rows}
+
+    missing = sorted(
+        stored_name for stored_name, sha256 in rows
+        if (sha256 not in blobs_on_disk if sha256 else stored_name not in on_disk)
+    )
+    for start in range(0, len(missing), 500):
+        await db.execute(
+            delete(Upload).where(Upload.stored_name.in_(missing[start:start + 500]))
+        )
+
+    added = 0
+    for stored_name, (size, modified_at) in on_disk.items():
+        if stored_name in indexed:
+            continue
+        media_type, _ = mimetypes.guess_type(stored_name)
+        db.add(Upload(
+            stored_name=stored_name,
+            original_name=original_name_from(stored_name),
+            size=size,
+            media_type=media_type,
+            owner_id=None,
+            created_at=modified_at
+        ))
+        added += 1
+
+    # Recount blob references and drop blobs nothing points at
+    ref_counts = dict((await db.execute(
+        select(Upload.blob_sha256, func.count())
+        .where(Upload.blob_sha256.is_not(None))
+        .group_by(Upload.blob_sha256)
+    )).all())
+    for blob in list(await db.scalars(select(UploadBlob))):
+        if ref_counts.get(blob.sha256, 0) == 0:
+            await db.delete(blob)
+        else:
+            blob.ref_count = ref_counts[blob.sha256]
+    await db.commit()
+
+    for sha256 in blobs_on_disk - ref_counts.keys():
+        await run_in_threadpool(blob_path(directory, sha256).unlink, True)
+
+    await reconcile_counters(db)
+    return {
+        "added": added,
+        "removed": len(missing),
+        "total": len(indexed) - len(missing) + added
+    }
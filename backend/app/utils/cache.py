@@ -0,0 +1,133 @@
+"""In-process caching utilities."""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable
+
+from .prometheus import CACHE_LOOKUPS
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries expire after a per-entry TTL.
+
+    Safe to share between the event loop and threadpool workers. Each
+    worker process has its own instance, so entries are not shared
+    across processes.
+
+    Attributes:
+        max_size: Maximum number of entries; least recently used go first.
+        hits: Number of lookups answered from the cache.
+        misses: Number of lookups that found nothing usable.
+        generation: Incremented whenever entries are deleted or cleared.
+    """
+
+    def __init__(
+        self, max_size: int, default_ttl: float | None = None, name: str | None = None
+    ) -> None:
+        """Initialize an empty cache.
+
+        Args:
+            max_size: Maximum number of entries (0 disables caching).
+            default_ttl: TTL in seconds used when ``set`` is given none.
+            name: If given, hits and misses are also exported as the
+                ``cache_lookups_total`` Prometheus counter with this label.
+        """
+        self.max_size = max_size
+        self.default_ttl = default_ttl
+        self.hits = 0
+        self.misses = 0
+        self._hit_counter = CACHE_LOOKUPS.labels(name, "hit") if name else None
+        self._miss_counter = CACHE_LOOKUPS.labels(name, "miss") if name else None
+        self.generation = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for ``key`` or ``default``.
+
+        Args:
+            key: Cache key.
+            default: Value returned on a miss or expired entry.
+
+        Returns:
+            The cached value, or ``default``.
+        """
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING and entry[0] <= time.monotonic():
+                del self._data[key]
+                entry = _MISSING
+            if entry is _MISSING:
+                self.misses += 1
+                if self._miss_counter is not None:
+                    self._miss_counter.inc()
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            if self._hit_counter is not None:
+                self._hit_counter.inc()
+            return entry[1]
+
+    def set(
+        self, key: Hashable, value: Any, ttl: float | None = None, generation: int | None = None
+    ) -> None:
+        """Store ``value`` under ``key`` for ``ttl`` seconds.
+
+        Args:
+            key: Cache key.
+            value: Value to cache.
+            ttl: Lifetime in seconds; falls back to ``default_ttl``.
+            generation: :attr:`generation` read before ``value`` was loaded.
+                If entries were invalidated since, ``value`` may be stale
+                and is not stored.
+        """
+        ttl = self.default_ttl if ttl is None else ttl
+        if self.max_size <= 0 or ttl is None or ttl <= 0:
+            return
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_size:
+                self._data.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        """Remove ``key`` from the cache if present.
+
+        Args:
+            key: Cache key.
+        """
+        with self._lock:
+            self._data.pop(key, None)
+            self.generation += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset the hit/miss counters."""
+        with self._lock:
+            self._data.clear()
+            self.generation += 1
+            self.hits = 0
+            self.misses = 0
+
+    def __len__(self) -> int:
+        """Number of entries, including ones that have expired but not been evicted."""
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """Return cache statistics.
+
+        Returns:
+            Dictionary with size, max_size, hits, misses and hit_ratio.
+        """
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
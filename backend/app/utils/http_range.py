@@ -0,0 +1,161 @@
+"""HTTP Range (RFC 7233) and conditional request (RFC 7232) helpers."""
+
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+# More ranges than this in one request are served as a full 200 instead
+MAX_RANGES = 16
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when none of the requested ranges overlap the resource."""
+
+
+def parse_range_header(header: str, size: int) -> list[tuple[int, int]]:
+    """Parse a ``Range`` header into inclusive byte ranges.
+
+    Overlapping or adjacent ranges are coalesced. A header that cannot be
+    parsed, uses a unit other than ``bytes`` or asks for too many ranges
+    yields an empty list, meaning the range should be ignored and the
+    full body served.
+
+    Args:
+        header: Value of the ``Range`` request header.
+        size: Size of the resource in bytes.
+
+    Returns:
+        Sorted list of ``(start, end)`` tuples with ``end`` inclusive.
+
+    Raises:
+        RangeNotSatisfiable: If the header is valid but no range overlaps
+            the resource.
+    """
+    unit, _, spec = header.partition("=")
+    if unit.strip().lower() != "bytes" or not spec.strip():
+        return []
+
+    ranges = []
+    for part in spec.split(","):
+        start_text, sep, end_text = part.strip().partition("-")
+        if not sep:
+            return []
+        try:
+            if start_text == "":
+                # Suffix range: the last N bytes
+                suffix = int(end_text)
+                if suffix <= 0:
+                    continue
+                start, end = max(size - suffix, 0), size - 1
+            else:
+                start = int(start_text)
+                if end_text:
+                    end = int(end_text)
+                    if start > end:
+                        return []
+                    end = min(end, size - 1)
+                else:
+                    end = size - 1
+        except ValueError:
+            return []
+        if start < 0:
+            return []
+        if start < size:
+            ranges.append((start, end))
+
+    if not ranges:
+        raise RangeNotSatisfiable()
+    if len(ranges) > MAX_RANGES:
+        return []
+
+    ranges.sort()
+    merged = [ranges[0]]
+    for start, end in ranges[1:]:
+        last_start, last_end = merged[-1]
+        if start <= last_end + 1:
+            merged[-1] = (last_start, max(last_end, end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def http_date(value: datetime) -> str:
+    """Format a datetime as an HTTP-date; naive values are taken as UTC.
+
+    Args:
+        value: Datetime to format.
+
+    Returns:
+        HTTP-date string, e.g. ``Wed, 21 Oct 2015 07:28:00 GMT``.
+    """
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return format_datetime(value.astimezone(timezone.utc), usegmt=True)
+
+
+def _parse_http_date(value: str) -> datetime | None:
+    """Parse an HTTP-date, returning None if it is malformed."""
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _etag_in(header: str, etag: str) -> bool:
+    """Weak comparison of ``etag`` against an entity-tag list header."""
+    if header.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(
+        candidate.strip().removeprefix("W/") == opaque for candidate in header.split(",")
+    )
+
+
+def is_not_modified(headers, etag: str, last_modified: datetime) -> bool:
+    """Evaluate ``If-None-Match`` / ``If-Modified-Since`` for a GET.
+
+    ``If-None-Match`` takes precedence when present, as required by
+    RFC 7232 section 6.
+
+    Args:
+        headers: Request headers.
+        etag: Current entity tag of the resource.
+        last_modified: Last modification time of the resource.
+
+    Returns:
+        True if a 304 Not Modified response should be sent.
+    """
+    if_none_match = headers.get("if-none-match")
+    if if_none_match is not None:
+        return _etag_in(if_none_match, etag)
+
+    if_modified_since = headers.get("if-modified-since")
+    if if_modified_since is not None:
+        since = _parse_http_date(if_modified_since)
+        if since is not None:
+            return _parse_http_date(http_date(last_modified)) <= since
+    return False
+
+
+def if_range_allows(headers, etag: str, last_modified: datetime) -> bool:
+    """Check whether an ``If-Range`` precondition permits a partial response.
+
+    Args:
+        headers: Request headers.
+        etag: Current strong entity tag of the resource.
+        last_modified: Last modification time of the resource.
+
+    Returns:
+        True if there is no ``If-Range`` header or it still matches.
+    """
+    if_range = headers.get("if-range")
+    if if_range is None:
+        return True
+    if_range = if_range.strip()
+    if if_range.startswith('"') or if_range.startswith("W/"):
+        # Strong comparison: weak tags never match
+        return if_range == etag and not etag.startswith("W/")
+    since = _parse_http_date(if_range)
+    return since is not None and http_date(last_modified) == http_date(since)
@@ -0,0 +1,110 @@
+"""Keyset (cursor) pagination helpers."""
+
+import base64
+import binascii
+import json
+from datetime import datetime
+
+from fastapi import HTTPException, status
+
+
+def _encode(payload: dict) -> str:
+    """Serialize a cursor payload as URL-safe base64 without padding."""
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> dict:
+    """Parse a cursor payload.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except (binascii.Error, ValueError, UnicodeError):
+        payload = None
+    if not isinstance(payload, dict):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return payload
+
+
+def _valid_id(value: object) -> bool:
+    """Return whether a decoded value is a row id."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the position after a row as an opaque cursor string.
+
+    Args:
+        last_id: ID of the last row on the current page.
+
+    Returns:
+        URL-safe cursor string to pass back as ``cursor``.
+    """
+    return _encode({"id": last_id})
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by :func:`encode_cursor`.
+
+    Args:
+        cursor: Opaque cursor string from a previous page.
+
+    Returns:
+        ID of the last row seen by the client.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    last_id = _decode(cursor).get("id")
+    if not _valid_id(last_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return last_id
+
+
+def encode_time_cursor(created_at: datetime, last_id: int) -> str:
+    """Encode the position after a row in a list sorted by creation time.
+
+    Args:
+        created_at: Creation time of the last row on the current page.
+        last_id: ID of that row, which breaks ties between equal times.
+
+    Returns:
+        URL-safe cursor string to pass back as ``cursor``.
+    """
+    return _encode({"at": created_at.isoformat(), "id": last_id})
+
+
+def decode_time_cursor(cursor: str) -> tuple[datetime, int]:
+    """Decode a cursor produced by :func:`encode_time_cursor`.
+
+    Args:
+        cursor: Opaque cursor string from a previous page.
+
+    Returns:
+        Creation time and ID of the last row seen by the client.
+
+    Raises:
+        HTTPException: 400 if the cursor is malformed.
+    """
+    payload = _decode(cursor)
+    last_id = payload.get("id")
+    try:
+        created_at = datetime.fromisoformat(payload.get("at"))
+    except (TypeError, ValueError):
+        created_at = None
+    if created_at is None or not _valid_id(last_id):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid cursor"
+        )
+    return created_at, last_id
@@ -0,0 +1,199 @@
+"""Connection pool instrumentation.
+
+Each instrumented engine records how long requests wait to check out a
+connection, how long connections are held, overflow use and checkout
+timeouts. The figures are per worker process.
+"""
+
+import threading
+import time
+from typing import Any
+
+from sqlalchemy import Engine, event, exc
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+# Upper bounds (seconds) of the wait and hold time histogram buckets
+DURATION_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 30.0)
+
+
+class DurationStats:
+    """Count, sum, maximum and cumulative histogram of durations.
+
+    Attributes:
+        count: Number of recorded durations.
+        total: Sum of recorded durations in seconds.
+        max: Longest recorded duration in seconds.
+        buckets: Counts of durations at or below each DURATION_BUCKETS bound.
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(DURATION_BUCKETS)
+
+    def record(self, seconds: float) -> None:
+        """Add a duration.
+
+        Args:
+            seconds: Duration in seconds.
+        """
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        for index, bound in enumerate(DURATION_BUCKETS):
+            if seconds <= bound:
+                self.buckets[index] += 1
+
+    def snapshot(self) -> dict:
+        """Return the statistics as a dict.
+
+        Returns:
+            Dictionary with count, total, avg, max and buckets (keyed by bound).
+        """
+        return {
+            "count": self.count,
+            "total": self.total,
+            "avg": self.total / self.count if self.count else 0.0,
+            "max": self.max,
+            "buckets": dict(zip(DURATION_BUCKETS, self.buckets)),
+        }
+
+
+class PoolMetrics:
+    """Usage statistics for one engine's connection pool.
+
+    Attributes:
+        name: Engine label, e.g. ``primary`` or ``replica-0``.
+        checkout_wait: Time spent obtaining a connection from the pool.
+        held: Time connections stayed checked out.
+        timeouts: Checkouts that gave up after the pool timeout.
+        overflow_checkouts: Checkouts served by an overflow connection.
+        peak_overflow: Most overflow connections open at once.
+    """
+
+    def __init__(self, name: str) -> None:
+        """Initialize empty metrics.
+
+        Args:
+            name: Engine label.
+        """
+        self.name = name
+        self.checkout_wait = DurationStats()
+        self.held = DurationStats()
+        self.timeouts = 0
+        self.overflow_checkouts = 0
+        self.peak_overflow = 0
+        self.max_overflow = 0
+        self.engine: Engine | None = None
+        self._lock = threading.Lock()
+
+    def record_wait(self, seconds: float, timed_out: bool) -> None:
+        """Record one checkout attempt."""
+        with self._lock:
+            self.checkout_wait.record(seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def record_checkout(self, overflow: int) -> None:
+        """Record a successful checkout with ``overflow`` connections open."""
+        with self._lock:
+            if overflow > 0:
+                self.overflow_checkouts += 1
+                self.peak_overflow = max(self.peak_overflow, overflow)
+
+    def record_held(self, seconds: float) -> None:
+        """Record how long a connection was checked out."""
+        with self._lock:
+            self.held.record(seconds)
+
+    def snapshot(self) -> dict:
+        """Return the current metrics and pool state.
+
+        Returns:
+            Dictionary of pool sizing, live usage and recorded statistics.
+        """
+        # The engine swaps in a new pool on dispose(), so look it up each time
+        pool = self.engine.pool if self.engine is not None else None
+        with self._lock:
+            return {
+                "name": self.name,
+                "pool_size": pool.size() if pool else 0,
+                "max_overflow": self.max_overflow,
+                "checked_out": pool.checkedout() if pool else 0,
+                "idle": pool.checkedin() if pool else 0,
+                "overflow": max(pool.overflow(), 0) if pool else 0,
+                "peak_overflow": self.peak_overflow,
+                "overflow_checkouts": self.overflow_checkouts,
+                "timeouts": self.timeouts,
+                "checkout_wait_seconds": self.checkout_wait.snapshot(),
+                "held_seconds": self.held.snapshot(),
+            }
+
+
+# Metrics of every instrumented engine in this process, by name
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+class InstrumentedQueuePool(AsyncAdaptedQueuePool):
+    """Async queue pool that times connection checkouts.
+
+    The metrics object is a class attribute so that pools recreated by
+    ``engine.dispose()`` keep reporting to it; use
+    :func:`instrumented_pool_class` to get a subclass bound to one engine.
+    """
+
+    metrics: PoolMetrics
+
+    def connect(self) -> Any:
+        """Check out a connection, recording the wait and any timeout."""
+        start = time.perf_counter()
+        timed_out = False
+        try:
+            return super().connect()
+        except exc.TimeoutError:
+            timed_out = True
+            raise
+        finally:
+            self.metrics.record_wait(time.perf_counter() - start, timed_out)
+
+
+def instrumented_pool_class(name: str) -> type[InstrumentedQueuePool]:
+    """Create a pool class reporting to the metrics registered as ``name``.
+
+    Args:
+        name: Engine label.
+
+    Returns:
+        Pool class to pass as ``poolclass`` to ``create_async_engine``.
+    """
+    metrics = pool_metrics.setdefault(name, PoolMetrics(name))
+    return type("InstrumentedQueuePool", (InstrumentedQueuePool,), {"metrics": metrics})
+
+
+def instrument_engine(engine: AsyncEngine, max_overflow: int) -> None:
+    """Attach hold-time and overflow tracking to an engine's pool.
+
+    The engine must use a class from :func:`instrumented_pool_class`.
+
+    Args:
+        engine: Engine to instrument.
+        max_overflow: The engine's configured max_overflow, for reporting.
+    """
+    sync_engine = engine.sync_engine
+    metrics = sync_engine.pool.metrics
+    metrics.engine = sync_engine
+    metrics.max_overflow = max_overflow
+
+    @event.listens_for(sync_engine, "checkout")
+    def on_checkout(dbapi_connection, connection_record, connection_proxy) -> None:
+        metrics.record_checkout(sync_engine.pool.overflow())
+        connection_record.info["checked_out_at"] = time.perf_counter()
+
+    @event.listens_for(sync_engine, "checkin")
+    def on_checkin(dbapi_connection, connection_record) -> None:
+        checked_out_at = connection_record.info.pop("checked_out_at", None)
+        if checked_out_at is not None:
+            metrics.record_held(time.perf_counter() - checked_out_at)
@@ -0,0 +1,70 @@
+"""Prometheus request metrics.
+
+With several uvicorn workers, set ``PROMETHEUS_MULTIPROC_DIR`` to an
+empty, writable directory before the workers start. Each worker then
+writes its samples there and ``/metrics`` aggregates all of them, so a
+scrape that lands on any worker sees the totals for the whole server.
+Without it, metrics cover only the worker that serves the scrape.
+"""
+
+import os
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+MULTIPROC_DIR_ENV = "PROMETHEUS_MULTIPROC_DIR"
+
+REQUESTS_TOTAL = Counter(
+    "http_requests_total",
+    "HTTP requests handled, by method, route template and status.",
+    ["method", "route", "status"],
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "HTTP request latency in seconds, by method, route template and status.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress",
+    "HTTP requests currently being handled, by method.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+STARTUP_DURATION = Gauge(
+    "app_startup_duration_seconds",
+    "Time the worker took to start, by schema setup outcome.",
+    ["schema"],
+    multiprocess_mode="liveall",
+)
+
+CACHE_LOOKUPS = Counter(
+    "cache_lookups_total",
+    "Lookups in named per-process caches, by cache and result (hit or miss).",
+    ["cache", "result"],
+)
+
+
+def render_latest() -> tuple[bytes, str]:
+    """Render all metrics in the Prometheus text format.
+
+    Returns:
+        The encoded metrics and their content type.
+    """
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
+def mark_worker_dead() -> None:
+    """Drop this worker's live gauges from the aggregated metrics on exit."""
+    if os.environ.get(MULTIPROC_DIR_ENV):
+        multiprocess.mark_process_dead(os.getpid())
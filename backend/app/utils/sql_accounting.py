@@ -0,0 +1,93 @@
+"""Per-request SQL statement accounting.
+
+Cursor execution events on every engine add to the :class:`QueryStats`
+of the current request, found through a context variable (SQLAlchemy's
+async layer and Starlette's thread pool both carry the context along).
+Statements run outside a tracked request are not recorded.
+"""
+
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+
+from sqlalchemy import Engine, event
+
+
+class QueryStats:
+    """SQL statements run while handling one request.
+
+    Attributes:
+        count: Number of statements executed.
+        duration: Total time spent executing them, in seconds.
+        shapes: Executions per statement text (parameters are not part of
+            the text, so the same query with different values counts as
+            one shape).
+    """
+
+    def __init__(self) -> None:
+        """Initialize empty statistics."""
+        self.count = 0
+        self.duration = 0.0
+        self.shapes: Counter[str] = Counter()
+
+    def repeated(self, threshold: int) -> dict[str, int]:
+        """Return statement shapes executed at least ``threshold`` times.
+
+        Args:
+            threshold: Minimum number of executions to report.
+
+        Returns:
+            Execution counts of the repeated shapes, most frequent first.
+        """
+        return {
+            statement: count
+            for statement, count in self.shapes.most_common()
+            if count >= threshold
+        }
+
+
+_current_stats: ContextVar[QueryStats | None] = ContextVar("sql_query_stats", default=None)
+
+
+@contextmanager
+def track_queries() -> Iterator[QueryStats]:
+    """Record the SQL statements run in the current context.
+
+    Yields:
+        Statistics that fill up as statements execute.
+    """
+    stats = QueryStats()
+    token = _current_stats.set(stats)
+    try:
+        yield stats
+    finally:
+        _current_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    """Note the start time of a statement in a tracked context."""
+    if _current_stats.get() is not None:
+        conn.info.setdefault("sql_accounting_start", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    """Add a finished statement to the current request's statistics."""
+    stats = _current_stats.get()
+    starts = conn.info.get("sql_accounting_start")
+    if stats is None or not starts:
+        return
+    stats.duration += time.perf_counter() - starts.pop()
+    stats.count += 1
+    stats.shapes[" ".join(statement.split())] += 1
+
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context) -> None:
+    """Forget the start time of a statement that failed."""
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("sql_accounting_start"):
+        connection.info["sql_accounting_start"].pop()
@@ -0,0 +1,86 @@
+"""Benchmark list response serialization for a 100-item page of users.
+
+Compares the validated path (``UserListResponse`` built with
+``from_attributes``, then encoded by FastAPI's default JSON encoder)
+with the trusted fast path used by ``list_users`` (``dump_rows`` plus
+orjson).
+
+Run from the backend directory::
+
+    uv run python -m benchmarks.list_serialization
+"""
+
+import json
+import timeit
+from datetime import datetime
+
+from fastapi.encoders import jsonable_encoder
+
+from app.models.user import User, UserRole
+from app.schemas.user import UserListResponse, UserResponse
+from app.utils.serialization import FastJSONResponse, dump_rows
+
+PAGE_SIZE = 100
+REPEAT = 5
+NUMBER = 200
+
+
+def make_page() -> list[User]:
+    """Build a page of transient users, as a list query would return them."""
+    now = datetime(2024, 1, 1, 12, 0, 0)
+    return [
+        User(
+            id=i,
+            username=f"user{i}",
+            email=f"user{i}@example.com",
+            password_hash="x" * 60,
+            full_name=f"User {i}",
+            role=UserRole.USER,
+            is_active=True,
+            created_at=now,
+            updated_at=now,
+        )
+        for i in range(1, PAGE_SIZE + 1)
+    ]
+
+
+def validated(users: list[User]) -> bytes:
+    """Serialize a page the way a ``response_model`` route does by default."""
+    response = UserListResponse.model_validate({
+        "users": users, "total": 1000, "page": 1, "page_size": PAGE_SIZE, "next_cursor": None
+    })
+    return json.dumps(jsonable_encoder(response)).encode("utf-8")
+
+
+def fast(users: list[User]) -> bytes:
+    """Serialize a page through the trusted fast path."""
+    return FastJSONResponse({
+        "users": dump_rows(users, UserResponse),
+        "total": 1000,
+        "page": 1,
+        "page_size": PAGE_SIZE,
+        "next_cursor": None
+    }).body
+
+
+def per_row_microseconds(fn, users: list[User]) -> float:
+    """Return the best per-row cost of ``fn`` in microseconds."""
+    best = min(timeit.repeat(lambda: fn(users), repeat=REPEAT, number=NUMBER))
+    return best / NUMBER / PAGE_SIZE * 1e6
+
+
+def main() -> None:
+    """Run the benchmark and print the per-row cost of each path."""
+    users = make_page()
+    assert json.loads(validated(users)) == json.loads(fast(users))
+
+    before = per_row_microseconds(validated, users)
+    after = per_row_microseconds(fast, users)
+    print(f"{PAGE_SIZE}-item page, best of {REPEAT} x {NUMBER} runs")
+    print(f"  validated + json: {before:6.2f} us/row")
+    print(f"  fast + orjson:    {after:6.2f} us/row")
+    print(f"  speedup:          {before / after:6.1f}x")
+
+
+if __name__ == "__main__":
+    main()
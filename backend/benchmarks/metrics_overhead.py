@@ -0,0 +1,62 @@
+"""Benchmark the per-request overhead of RequestMetricsMiddleware.
+
+Drives a minimal ASGI app directly (no server or network) with and
+without the middleware, so the difference is the cost of recording the
+request count, in-flight gauge and latency histogram.
+
+Run from the backend directory::
+
+    uv run python -m benchmarks.metrics_overhead
+"""
+
+import asyncio
+import time
+from types import SimpleNamespace
+
+from app.middleware import RequestMetricsMiddleware
+
+REQUESTS = 50_000
+REPEAT = 5
+
+ROUTE = SimpleNamespace(path="/api/v1/posts/{post_id}")
+
+
+async def endpoint(scope, receive, send) -> None:
+    """Minimal ASGI app that matches a route and returns an empty 200."""
+    scope["route"] = ROUTE
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def receive() -> dict:
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def send(message: dict) -> None:
+    pass
+
+
+async def run(app) -> float:
+    """Return the best per-request time of ``app`` in microseconds."""
+    best = float("inf")
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        for _ in range(REQUESTS):
+            scope = {"type": "http", "method": "GET", "path": "/api/v1/posts/1"}
+            await app(scope, receive, send)
+        best = min(best, time.perf_counter() - start)
+    return best / REQUESTS * 1e6
+
+
+async def main() -> None:
+    """Run the benchmark and print the middleware's per-request overhead."""
+    bare = await run(endpoint)
+    instrumented = await run(RequestMetricsMiddleware(endpoint))
+    print(f"best of {REPEAT} x {REQUESTS} requests")
+    print(f"  without metrics: {bare:6.2f} us/request")
+    print(f"  with metrics:    {instrumented:6.2f} us/request")
+    print(f"  overhead:        {instrumented - bare:6.2f} us/request")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,24 +1,39 @@
 """Pytest configuration and fixtures."""
 
+import tempfile
+from pathlib import Path
+
 import pytest
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
 from app.main import app
-from app.database import Base, get_db
+from app.database import Base, get_session_factory, make_session_factory
+from app.dependencies.auth import token_cache, user_cache
+from app.services.response_cache import post_response_cache, user_response_cache
+from app.services.uploads import file_meta_cache
+
+# Per-process caches keyed by row id; ids repeat across per-test databases
+CACHES = [token_cache, user_cache, file_meta_cache, user_response_cache, post_response_cache]
 
-# Create in-memory SQLite database for testing
-SQLALCHEMY_DATABASE_URL = "sqlite:///:memory:"
+# File-backed SQLite database shared by the sync fixtures (schema setup,
+# direct assertions) and the async engine used by the application
+SQLITE_PATH = Path(tempfile.mkdtemp()) / "test.db"
+SQLALCHEMY_DATABASE_URL = f"sqlite:///{SQLITE_PATH}"
+ASYNC_SQLALCHEMY_DATABASE_URL = f"sqlite+aiosqlite:///{SQLITE_PATH}"
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
+    poolclass=NullPool,
 )
+async_engine = create_async_engine(ASYNC_SQLALCHEMY_DATABASE_URL, poolclass=NullPool)
 
 TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+TestingAsyncSessionLocal = make_session_factory(async_engine)
 
 
 @pytest.fixture(scope="function")
@@ -26,7 +41,7 @@ def test_db():
     """Create a fresh database for each test.
 
     Yields:
-        Database session for testing.
+        Sync database session for direct assertions in tests.
     """
     # Create tables
     Base.metadata.create_all(bind=engine)
@@ -50,18 +65,51 @@ def client(test_db):
     Yields:
         FastAPI test client.
     """
-    def override_get_db():
-        try:
-            yield test_db
-        finally:
-            test_db.close()
-
-    app.dependency_overrides[get_db] = override_get_db
+    # get_db and get_read_db open their sessions from this factory
+    app.dependency_overrides[get_session_factory] = lambda: TestingAsyncSessionLocal
 
     # Disable startup event that creates tables in MySQL
     app.router.on_startup = []
 
+    for cache in CACHES:
+        cache.clear()
+
     with TestClient(app) as test_client:
         yield test_client
 
     app.dependency_overrides.clear()
+
+
+@pytest.fixture(scope="function")
+def upload_dir(tmp_path, monkeypatch):
+    """Point the files router at a temporary upload directory.
+
+    Yields:
+        Path of the temporary upload directory.
+    """
+    directory = tmp_path / "uploads"
+    directory.mkdir()
+    monkeypatch.setattr("app.routers.files.UPLOAD_DIRECTORY", directory)
+    yield directory
+
+
+@pytest.fixture(scope="function")
+def auth_headers(client):
+    """Create a user and log in.
+
+    Args:
+        client: Test client.
+
+    Returns:
+        Authorization headers carrying the user's bearer token.
+    """
+    client.post("/api/v1/users/", json={
+        "username": "fileowner",
+        "email": "fileowner@example.com",
+        "password": "password123"
+    })
+    token = client.post("/api/v1/auth/login", json={
+        "username": "fileowner",
+        "password": "password123"
+    }).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,199 @@
+"""Tests for authentication endpoints and password hashing."""
+
+import asyncio
+
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app.dependencies.auth import token_cache, user_cache
+from app.models.user import User
+from app.services.hashing import PasswordHasher
+from app.services.invalidation import CacheInvalidator, publish_invalidation
+from app.utils.cache import TTLCache
+
+from .conftest import TestingAsyncSessionLocal, async_engine
+
+
+def _create_user(client: TestClient, username: str = "authuser") -> dict:
+    response = client.post("/api/v1/users/", json={
+        "username": username,
+        "email": f"{username}@example.com",
+        "password": "password123"
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_login_success(client: TestClient):
+    """Test logging in with valid credentials returns a token."""
+    _create_user(client)
+
+    response = client.post("/api/v1/auth/login", json={
+        "username": "authuser",
+        "password": "password123"
+    })
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["token_type"] == "bearer"
+    assert data["access_token"]
+
+
+def test_login_wrong_password(client: TestClient):
+    """Test logging in with a wrong password returns 401."""
+    _create_user(client)
+
+    response = client.post("/api/v1/auth/login", json={
+        "username": "authuser",
+        "password": "wrongpassword"
+    })
+
+    assert response.status_code == 401
+
+
+def test_verified_token_cache_hits(client: TestClient, upload_dir):
+    """Test that repeated requests with one token verify it only once."""
+    _create_user(client)
+    token = client.post("/api/v1/auth/login", json={
+        "username": "authuser",
+        "password": "password123"
+    }).json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    token_cache.clear()
+
+    for _ in range(3):
+        assert client.get("/api/v1/files/", headers=headers).status_code == 200
+
+    assert token_cache.misses == 1
+    assert token_cache.hits == 2
+
+
+def _login(client: TestClient, username: str = "authuser") -> dict:
+    token = client.post("/api/v1/auth/login", json={
+        "username": username,
+        "password": "password123"
+    }).json()["access_token"]
+    return {"Authorization": f"Bearer {token}"}
+
+
+def test_user_identity_cached(client: TestClient, upload_dir):
+    """Test that the user identity is loaded once and then cached."""
+    _create_user(client)
+    headers = _login(client)
+    user_cache.clear()
+
+    for _ in range(3):
+        assert client.get("/api/v1/files/", headers=headers).status_code == 200
+
+    assert user_cache.misses == 1
+    assert user_cache.hits == 2
+
+
+def test_deactivated_user_loses_access(client: TestClient, upload_dir):
+    """Test that deactivating a user takes effect despite the cache."""
+    user = _create_user(client)
+    headers = _login(client)
+    assert client.get("/api/v1/files/", headers=headers).status_code == 200
+
+    client.put(f"/api/v1/users/{user['id']}", json={"is_active": False})
+    assert client.get("/api/v1/files/", headers=headers).status_code == 403
+
+    client.delete(f"/api/v1/users/{user['id']}")
+    assert client.get("/api/v1/files/", headers=headers).status_code == 401
+
+
+def test_user_deactivated_by_another_worker_loses_access(client: TestClient, upload_dir):
+    """Test that a deactivation made in another worker reaches this one's cache."""
+    user = _create_user(client)
+    headers = _login(client)
+    invalidator = CacheInvalidator()
+    invalidator.register("user", user_cache)
+    asyncio.run(invalidator.poll(async_engine))
+    assert client.get("/api/v1/files/", headers=headers).status_code == 200
+
+    # Another worker deactivates the user; only the published row reaches this one
+    async def deactivate():
+        async with TestingAsyncSessionLocal() as db:
+            (await db.get(User, user["id"])).is_active = False
+            publish_invalidation(db, "user", user["id"])
+            await db.commit()
+
+    asyncio.run(deactivate())
+    assert asyncio.run(invalidator.poll(async_engine)) == 1
+    assert client.get("/api/v1/files/", headers=headers).status_code == 403
+
+
+def test_invalid_token_rejected(client: TestClient):
+    """Test that an invalid token is rejected and not cached."""
+    token_cache.clear()
+    headers = {"Authorization": "Bearer not-a-token"}
+
+    assert client.get("/api/v1/files/", headers=headers).status_code == 401
+    assert len(token_cache) == 0
+
+
+def test_ttl_cache_expiry_and_eviction(monkeypatch):
+    """Test TTL expiry and LRU eviction in TTLCache."""
+    now = [1000.0]
+    monkeypatch.setattr("app.utils.cache.time.monotonic", lambda: now[0])
+    cache = TTLCache(max_size=2)
+
+    cache.set("a", 1, ttl=10)
+    cache.set("b", 2, ttl=10)
+    assert cache.get("a") == 1
+    cache.set("c", 3, ttl=10)  # evicts "b", the least recently used
+    assert cache.get("b") is None
+
+    now[0] += 11
+    assert cache.get("a") is None
+    assert cache.stats()["hits"] == 1
+
+
+def test_ttl_cache_skips_values_loaded_before_an_invalidation():
+    """Test that a value read before a concurrent delete is not cached."""
+    cache = TTLCache(max_size=2, default_ttl=10)
+    generation = cache.generation
+    cache.delete("a")  # the row changed while it was being loaded
+    cache.set("a", "stale", generation=generation)
+    assert cache.get("a") is None
+
+    cache.set("a", "fresh", generation=cache.generation)
+    assert cache.get("a") == "fresh"
+
+
+def test_password_hasher_rejects_when_queue_full():
+    """Test that the hasher fails fast with 503 once the queue is full."""
+    hasher = PasswordHasher(max_workers=1, queue_limit=1)
+
+    async def hash_two():
+        return await asyncio.gather(
+            hasher.hash("password123"),
+            hasher.hash("password456"),
+            return_exceptions=True
+        )
+
+    try:
+        results = asyncio.run(hash_two())
+    finally:
+        hasher.shutdown()
+
+    assert isinstance(results[0], str)
+    assert isinstance(results[1], HTTPException)
+    assert results[1].status_code == 503
+
+
+def test_password_hasher_roundtrip():
+    """Test hashing and verifying on the process pool."""
+    hasher = PasswordHasher(max_workers=1)
+
+    async def roundtrip():
+        hashed = await hasher.hash("password123")
+        return (
+            await hasher.verify("password123", hashed),
+            await hasher.verify("password124", hashed)
+        )
+
+    try:
+        assert asyncio.run(roundtrip()) == (True, False)
+    finally:
+        hasher.shutdown()
@@ -0,0 +1,127 @@
+"""Tests for read-replica routing and pool instrumentation in the database layer."""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert, text
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.config import settings
+from app.database import (
+    PRIMARY_STICKY_COOKIE,
+    Base,
+    get_session_factory,
+    make_async_engine,
+    make_session_factory,
+)
+from app.main import app
+from app.models.user import User
+from app.utils.pool_metrics import pool_metrics
+
+from .conftest import SQLITE_PATH, async_engine
+
+# Second SQLite file standing in for a replica that has not caught up
+REPLICA_PATH = SQLITE_PATH.with_name("replica.db")
+
+
+@pytest.fixture(scope="function")
+def replica_client(client: TestClient):
+    """Route the client's sessions between the test database and a replica.
+
+    Yields:
+        FastAPI test client whose GET handlers read from the replica.
+    """
+    replica_engine = create_engine(f"sqlite:///{REPLICA_PATH}", poolclass=NullPool)
+    Base.metadata.create_all(bind=replica_engine)
+    replica_async_engine = create_async_engine(
+        f"sqlite+aiosqlite:///{REPLICA_PATH}", poolclass=NullPool
+    )
+    session_factory = make_session_factory(async_engine, [replica_async_engine])
+    app.dependency_overrides[get_session_factory] = lambda: session_factory
+
+    yield client
+
+    Base.metadata.drop_all(bind=replica_engine)
+
+
+def _create_user(client: TestClient) -> dict:
+    response = client.post("/api/v1/users/", json={
+        "username": "replicated",
+        "email": "replicated@example.com",
+        "password": "password123"
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_reads_go_to_replica_and_writes_to_primary(replica_client: TestClient):
+    """Test that GET handlers read the replica while writes land on the primary."""
+    user = _create_user(replica_client)
+    replica_client.cookies.clear()
+
+    # The replica has not seen the new user
+    assert replica_client.get(f"/api/v1/users/{user['id']}").status_code == 404
+    assert replica_client.get("/api/v1/users/?include_total=false").json()["users"] == []
+    # A counter missing on the replica is seeded from the primary
+    assert replica_client.get("/api/v1/users/").json()["total"] == 1
+
+
+def test_client_reads_own_writes(replica_client: TestClient):
+    """Test that a client that just wrote keeps reading from the primary."""
+    user = _create_user(replica_client)
+
+    assert PRIMARY_STICKY_COOKIE in replica_client.cookies
+    assert replica_client.get(f"/api/v1/users/{user['id']}").status_code == 200
+    assert len(replica_client.get("/api/v1/users/").json()["users"]) == 1
+
+
+def test_replica_read_does_not_cache_a_stale_body(replica_client: TestClient):
+    """Test that a lagging replica's row is not served to a client that just wrote."""
+    user = _create_user(replica_client)
+    # The replica has the user, but not the update below
+    with create_engine(f"sqlite:///{REPLICA_PATH}", poolclass=NullPool).begin() as conn:
+        conn.execute(insert(User).values(
+            id=user["id"], username="replicated", email="replicated@example.com",
+            password_hash="x"
+        ))
+
+    replica_client.put(f"/api/v1/users/{user['id']}", json={"username": "renamed"})
+    sticky = dict(replica_client.cookies)
+    replica_client.cookies.clear()
+    assert replica_client.get(f"/api/v1/users/{user['id']}").json()["username"] == "replicated"
+
+    replica_client.cookies.update(sticky)
+    assert replica_client.get(f"/api/v1/users/{user['id']}").json()["username"] == "renamed"
+
+
+def test_pool_metrics_record_waits_holds_and_timeouts(client: TestClient, monkeypatch):
+    """Test that an instrumented pool reports saturation on the metrics endpoint."""
+    monkeypatch.setattr(settings, "DB_POOL_SIZE", 1)
+    monkeypatch.setattr(settings, "DB_MAX_OVERFLOW", 0)
+    monkeypatch.setattr(settings, "DB_POOL_TIMEOUT", 0.05)
+    engine = make_async_engine(f"sqlite:///{SQLITE_PATH}", "test-pool")
+
+    async def saturate() -> None:
+        async with engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+            with pytest.raises(TimeoutError):
+                async with engine.connect():
+                    pass
+        await engine.dispose()
+
+    try:
+        asyncio.run(saturate())
+        metrics = client.get("/metrics/pool").json()["pools"]["test-pool"]
+    finally:
+        pool_metrics.pop("test-pool")
+
+    assert metrics["pool_size"] == 1
+    assert metrics["max_overflow"] == 0
+    assert metrics["timeouts"] == 1
+    assert metrics["checkout_wait_seconds"]["count"] == 2
+    assert metrics["checkout_wait_seconds"]["max"] >= 0.05
+    assert metrics["held_seconds"]["count"] == 1
+    assert metrics["checked_out"] == 0
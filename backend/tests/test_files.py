@@ -0,0 +1,344 @@
+"""Tests for file upload endpoints."""
+
+import asyncio
+import hashlib
+import os
+import time
+from datetime import datetime, timezone
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from sqlalchemy import select
+
+from app.config import settings
+from app.models.upload import UploadBlob
+from app.services.invalidation import CacheInvalidator
+from app.services.uploads import (
+    blob_path,
+    file_meta_cache,
+    purge_blobs,
+    reindex_uploads,
+    release_blob,
+)
+
+from .conftest import TestingAsyncSessionLocal, async_engine
+
+PDF_BYTES = b"%PDF-1.4\n" + b"x" * 4096
+
+
+def _upload(client: TestClient, headers: dict, name: str = "doc.pdf", data: bytes = PDF_BYTES):
+    return client.post(
+        "/api/v1/files/upload",
+        files={"file": (name, data, "application/pdf")},
+        headers=headers
+    )
+
+
+def test_upload_file_success(client: TestClient, auth_headers, upload_dir):
+    """Test uploading a file stores it and reports its size."""
+    response = _upload(client, auth_headers)
+
+    assert response.status_code == 201
+    data = response.json()
+    assert data["size"] == len(PDF_BYTES)
+    assert (upload_dir / data["saved_as"]).read_bytes() == PDF_BYTES
+    assert list((upload_dir / ".tmp").iterdir()) == []
+
+
+def test_upload_file_too_large_while_streaming(
+    client: TestClient, auth_headers, upload_dir, monkeypatch
+):
+    """Test that the running byte count rejects a file and leaves nothing behind."""
+    monkeypatch.setattr("app.routers.files.MAX_FILE_SIZE", 1024)
+    monkeypatch.setattr("app.routers.files.UPLOAD_CHUNK_SIZE", 512)
+
+    response = _upload(client, auth_headers)
+
+    assert response.status_code == 400
+    assert [p for p in upload_dir.rglob("*") if p.is_file()] == []
+
+
+def test_upload_rejected_by_content_length(client: TestClient, auth_headers, upload_dir):
+    """Test that an oversized Content-Length is refused with 413."""
+    response = _upload(client, auth_headers, data=b"x" * (11 * 1024 * 1024))
+
+    assert response.status_code == 413
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_chunked_upload_rejected_while_streaming(client: TestClient, auth_headers, upload_dir):
+    """Test that a body without Content-Length is refused once it grows too large."""
+    boundary = "limit-boundary"
+
+    def chunks():
+        yield (
+            f"--{boundary}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="big.pdf"\r\n'
+            "Content-Type: application/pdf\r\n\r\n"
+        ).encode()
+        for _ in range(11):
+            yield b"x" * (1024 * 1024)
+        yield f"\r\n--{boundary}--\r\n".encode()
+
+    response = client.post(
+        "/api/v1/files/upload",
+        content=chunks(),
+        headers={**auth_headers, "Content-Type": f"multipart/form-data; boundary={boundary}"}
+    )
+
+    assert response.status_code == 413
+    assert list(upload_dir.iterdir()) == []
+
+
+def test_upload_disallowed_type(client: TestClient, auth_headers, upload_dir):
+    """Test that a disallowed content type returns 400."""
+    response = client.post(
+        "/api/v1/files/upload",
+        files={"file": ("notes.txt", b"hello", "text/plain")},
+        headers=auth_headers
+    )
+
+    assert response.status_code == 400
+
+
+def test_list_files_from_index(client: TestClient, auth_headers, upload_dir):
+    """Test listing files from the metadata index with pagination."""
+    names = [
+        _upload(client, auth_headers, name=f"doc{i}.pdf").json()["saved_as"] for i in range(3)
+    ]
+
+    response = client.get("/api/v1/files/?limit=2&mine=true", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 3
+    assert [f["filename"] for f in data["files"]] == names[:2]
+    assert data["files"][0]["original_name"] == "doc0.pdf"
+    assert data["files"][0]["size"] == len(PDF_BYTES)
+
+    response = client.get(
+        f"/api/v1/files/?limit=2&cursor={data['next_cursor']}", headers=auth_headers
+    )
+    data = response.json()
+    assert [f["filename"] for f in data["files"]] == names[2:]
+    assert data["next_cursor"] is None
+
+    response = client.get("/api/v1/files/?owner_id=999", headers=auth_headers)
+    assert response.json() == {"files": [], "total": 0, "next_cursor": None}
+
+
+def test_delete_file_removes_index_row(client: TestClient, auth_headers, upload_dir):
+    """Test that deleting a file removes it from disk and from the index."""
+    saved_as = _upload(client, auth_headers).json()["saved_as"]
+
+    response = client.delete(f"/api/v1/files/{saved_as}", headers=auth_headers)
+
+    assert response.status_code == 200
+    assert not (upload_dir / saved_as).exists()
+    assert client.get("/api/v1/files/", headers=auth_headers).json()["total"] == 0
+    assert client.delete(f"/api/v1/files/{saved_as}", headers=auth_headers).status_code == 404
+
+
+def test_delete_file_invalidates_other_workers(client: TestClient, auth_headers, upload_dir):
+    """Test that a deleted file's metadata is dropped by other workers' caches."""
+    invalidator = CacheInvalidator()
+    invalidator.register("file", file_meta_cache, key_type=str)
+    asyncio.run(invalidator.poll(async_engine))
+    saved_as = _upload(client, auth_headers).json()["saved_as"]
+    assert client.get(f"/api/v1/files/{saved_as}").status_code == 200
+    meta = file_meta_cache.get(saved_as)
+    assert meta is not None
+
+    client.delete(f"/api/v1/files/{saved_as}", headers=auth_headers)
+    # Stands in for the copy another worker still holds
+    file_meta_cache.set(saved_as, meta)
+
+    assert asyncio.run(invalidator.poll(async_engine)) == 1
+    assert file_meta_cache.get(saved_as) is None
+
+
+def _blobs() -> list[UploadBlob]:
+    async def fetch():
+        async with TestingAsyncSessionLocal() as db:
+            return list(await db.scalars(select(UploadBlob)))
+    return asyncio.run(fetch())
+
+
+def test_content_addressed_uploads_are_deduplicated(
+    client: TestClient, auth_headers, upload_dir, monkeypatch
+):
+    """Test that identical uploads share one blob until the last one is deleted."""
+    monkeypatch.setattr(settings, "UPLOAD_STORAGE_MODE", "cas")
+    sha256 = hashlib.sha256(PDF_BYTES).hexdigest()
+
+    first = _upload(client, auth_headers).json()["saved_as"]
+    second = _upload(client, auth_headers).json()["saved_as"]
+
+    assert first != second
+    assert not (upload_dir / first).exists()
+    assert blob_path(upload_dir, sha256).read_bytes() == PDF_BYTES
+    assert [(blob.sha256, blob.ref_count) for blob in _blobs()] == [(sha256, 2)]
+
+    response = client.get(f"/api/v1/files/{second}")
+    assert response.content == PDF_BYTES
+    assert response.headers["etag"] == f'"{sha256}"'
+
+    client.delete(f"/api/v1/files/{first}", headers=auth_headers)
+    assert blob_path(upload_dir, sha256).exists()
+    assert [blob.ref_count for blob in _blobs()] == [1]
+
+    client.delete(f"/api/v1/files/{second}", headers=auth_headers)
+    assert not blob_path(upload_dir, sha256).exists()
+    assert _blobs() == []
+
+
+def test_blob_survives_rolled_back_release_and_orphans_are_purged(
+    client: TestClient, auth_headers, upload_dir, monkeypatch
+):
+    """Test that blobs are only deleted once the release has committed."""
+    monkeypatch.setattr(settings, "UPLOAD_STORAGE_MODE", "cas")
+    sha256 = hashlib.sha256(PDF_BYTES).hexdigest()
+    _upload(client, auth_headers)
+    path = blob_path(upload_dir, sha256)
+
+    async def release_then_roll_back():
+        async with TestingAsyncSessionLocal() as db:
+            assert await release_blob(db, sha256)
+            assert path.exists()
+            await db.rollback()
+
+    asyncio.run(release_then_roll_back())
+    assert path.exists()
+    assert [blob.ref_count for blob in _blobs()] == [1]
+
+    async def release_then_purge():
+        async with TestingAsyncSessionLocal() as db:
+            # The process dies between committing the release and discarding
+            await release_blob(db, sha256)
+            await db.commit()
+            return await purge_blobs(db, upload_dir)
+
+    orphan = blob_path(upload_dir, "ab" * 32)
+    orphan.parent.mkdir(parents=True)
+    orphan.write_bytes(b"left by a failed upload")
+    recent = blob_path(upload_dir, "cd" * 32)
+    recent.parent.mkdir(parents=True)
+    recent.write_bytes(b"upload in progress")
+    os.utime(orphan, (0, 0))
+
+    assert asyncio.run(release_then_purge()) == 2
+    assert not path.exists()
+    assert not orphan.exists()
+    assert recent.exists()
+    assert _blobs() == []
+
+
+def test_reindex_uploads_from_disk(client: TestClient, auth_headers, upload_dir):
+    """Test rebuilding the index picks up new files and drops missing ones."""
+    kept = _upload(client, auth_headers).json()["saved_as"]
+    gone = _upload(client, auth_headers).json()["saved_as"]
+    (upload_dir / gone).unlink()
+    orphan = "0b6f2a4e-8f3c-4d0e-9a51-2f7d3c1e9b10_legacy.png"
+    (upload_dir / orphan).write_bytes(b"\x89PNG")
+    modified_at = datetime(2000, 1, 1, tzinfo=timezone.utc).timestamp()
+    os.utime(upload_dir / orphan, (modified_at, modified_at))
+
+    async def reindex():
+        async with TestingAsyncSessionLocal() as db:
+            return await reindex_uploads(db, upload_dir)
+
+    # Stored timestamps are UTC whatever the server's local time zone is
+    try:
+        with mock.patch.dict(os.environ, {"TZ": "America/New_York"}):
+            time.tzset()
+            assert asyncio.run(reindex()) == {"added": 1, "removed": 1, "total": 2}
+    finally:
+        time.tzset()
+
+    files = client.get("/api/v1/files/", headers=auth_headers).json()["files"]
+    by_name = {f["filename"]: f for f in files}
+    assert set(by_name) == {kept, orphan}
+    assert by_name[orphan]["original_name"] == "legacy.png"
+    assert by_name[orphan]["media_type"] == "image/png"
+    assert by_name[orphan]["owner_id"] is None
+    assert by_name[orphan]["created_at"] == "2000-01-01T00:00:00"
+    assert by_name[kept]["owner_id"] is not None
+
+
+def test_get_file_conditional_requests(client: TestClient, auth_headers, upload_dir):
+    """Test ETag/Last-Modified validators and 304 responses."""
+    saved_as = _upload(client, auth_headers).json()["saved_as"]
+
+    response = client.get(f"/api/v1/files/{saved_as}")
+    assert response.status_code == 200
+    assert response.content == PDF_BYTES
+    assert response.headers["accept-ranges"] == "bytes"
+    etag = response.headers["etag"]
+    last_modified = response.headers["last-modified"]
+
+    response = client.get(f"/api/v1/files/{saved_as}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    response = client.get(
+        f"/api/v1/files/{saved_as}", headers={"If-Modified-Since": last_modified}
+    )
+    assert response.status_code == 304
+
+    response = client.get(f"/api/v1/files/{saved_as}", headers={"If-None-Match": '"other"'})
+    assert response.status_code == 200
+
+
+def test_get_file_single_range(client: TestClient, auth_headers, upload_dir):
+    """Test serving a single byte range and a suffix range."""
+    saved_as = _upload(client, auth_headers).json()["saved_as"]
+    size = len(PDF_BYTES)
+
+    response = client.get(f"/api/v1/files/{saved_as}", headers={"Range": "bytes=0-7"})
+    assert response.status_code == 206
+    assert response.content == PDF_BYTES[:8]
+    assert response.headers["content-range"] == f"bytes 0-7/{size}"
+
+    response = client.get(f"/api/v1/files/{saved_as}", headers={"Range": "bytes=-10"})
+    assert response.status_code == 206
+    assert response.content == PDF_BYTES[-10:]
+
+    response = client.get(f"/api/v1/files/{saved_as}", headers={"Range": f"bytes={size}-"})
+    assert response.status_code == 416
+    assert response.headers["content-range"] == f"bytes */{size}"
+
+
+def test_get_file_multiple_ranges(client: TestClient, auth_headers, upload_dir):
+    """Test serving several ranges as multipart/byteranges."""
+    saved_as = _upload(client, auth_headers).json()["saved_as"]
+
+    response = client.get(
+        f"/api/v1/files/{saved_as}", headers={"Range": "bytes=0-3, 100-109"}
+    )
+
+    assert response.status_code == 206
+    content_type = response.headers["content-type"]
+    assert content_type.startswith("multipart/byteranges; boundary=")
+    boundary = content_type.split("boundary=")[1]
+    assert int(response.headers["content-length"]) == len(response.content)
+    parts = response.content.split(f"--{boundary}".encode())
+    assert parts[1].endswith(b"\r\n\r\n" + PDF_BYTES[0:4] + b"\r\n")
+    assert parts[2].endswith(b"\r\n\r\n" + PDF_BYTES[100:110] + b"\r\n")
+    assert parts[3] == b"--\r\n"
+
+
+def test_get_file_if_range_mismatch_serves_full(client: TestClient, auth_headers, upload_dir):
+    """Test that a stale If-Range turns a range request into a full 200."""
+    saved_as = _upload(client, auth_headers).json()["saved_as"]
+
+    response = client.get(
+        f"/api/v1/files/{saved_as}",
+        headers={"Range": "bytes=0-7", "If-Range": '"stale"'}
+    )
+
+    assert response.status_code == 200
+    assert response.content == PDF_BYTES
+
+
+def test_get_file_not_found(client: TestClient, upload_dir):
+    """Test requesting a missing file returns 404."""
+    assert client.get("/api/v1/files/missing.pdf").status_code == 404
@@ -0,0 +1,52 @@
+"""Tests for cross-worker cache invalidation."""
+
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+from app.models.cache_invalidation import CacheInvalidation
+from app.services.invalidation import CacheInvalidator, prune_invalidations
+from app.utils.cache import TTLCache
+
+from .conftest import async_engine
+
+
+def _utcnow() -> datetime:
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def _publish(test_db, invalidation_id: int, key: int, created_at: datetime | None = None) -> None:
+    test_db.add(CacheInvalidation(
+        id=invalidation_id, kind="post", key=str(key), created_at=created_at or _utcnow()
+    ))
+    test_db.commit()
+
+
+def test_invalidation_committed_out_of_order_is_applied(test_db):
+    """Test that an id skipped by a later commit is still picked up."""
+    cache = TTLCache(max_size=10, default_ttl=60)
+    invalidator = CacheInvalidator()
+    invalidator.register("post", cache)
+    asyncio.run(invalidator.poll(async_engine))
+    cache.set(1, "first")
+    cache.set(2, "second")
+
+    # Row 2 commits before row 1, which was inserted first
+    _publish(test_db, 2, key=2)
+    assert asyncio.run(invalidator.poll(async_engine)) == 1
+    assert cache.get(2) is None
+    assert cache.get(1) == "first"
+
+    _publish(test_db, 1, key=1)
+    assert asyncio.run(invalidator.poll(async_engine)) == 1
+    assert cache.get(1) is None
+    assert invalidator.last_seen_id == 2
+
+
+def test_prune_keeps_newest_invalidation(test_db):
+    """Test that pruning drops old rows but never the newest one."""
+    old = _utcnow() - timedelta(hours=1)
+    for invalidation_id in (1, 2):
+        _publish(test_db, invalidation_id, key=invalidation_id, created_at=old)
+
+    assert asyncio.run(prune_invalidations(async_engine)) == 1
+    assert [row.id for row in test_db.query(CacheInvalidation)] == [2]
@@ -0,0 +1,112 @@
+"""Tests for the Prometheus request metrics and per-request SQL accounting."""
+
+import logging
+import re
+
+from fastapi.testclient import TestClient
+from prometheus_client.parser import text_string_to_metric_families
+from sqlalchemy import text
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
+from app.config import settings
+from app.dependencies.auth import user_cache
+from app.middleware import SQLAccountingMiddleware
+
+from .conftest import TestingAsyncSessionLocal
+
+
+def _samples(client: TestClient) -> dict:
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    return {
+        (sample.name, tuple(sorted(sample.labels.items()))): sample.value
+        for family in text_string_to_metric_families(response.text)
+        for sample in family.samples
+    }
+
+
+def test_requests_are_labelled_by_route_template(client: TestClient):
+    """Test that requests are counted per route template and status."""
+    labels = (("method", "GET"), ("route", "/api/v1/posts/{post_id}"), ("status", "404"))
+    before = _samples(client).get(("http_requests_total", labels), 0)
+
+    client.get("/api/v1/posts/12345")
+    client.get("/api/v1/posts/67890")
+
+    samples = _samples(client)
+    assert samples[("http_requests_total", labels)] == before + 2
+    histogram_count = samples[("http_request_duration_seconds_count", labels)]
+    assert histogram_count >= 2
+    assert samples[("http_requests_in_progress", (("method", "GET"),))] >= 1
+
+
+def test_unmatched_paths_share_one_label(client: TestClient):
+    """Test that unknown paths do not create a label per path."""
+    client.get("/no/such/path/1")
+    client.get("/no/such/path/2")
+
+    routes = {dict(labels).get("route") for _, labels in _samples(client)}
+    assert "unmatched" in routes
+    assert not any(route and route.startswith("/no/such") for route in routes)
+
+
+def _server_timing(response) -> tuple[int, int]:
+    """Return the (queries, repeated) counts from a Server-Timing header."""
+    header = response.headers["server-timing"]
+    match = re.search(r'db;dur=[\d.]+;desc="(\d+) queries, (\d+) repeated"', header)
+    return int(match.group(1)), int(match.group(2))
+
+
+def test_server_timing_reports_queries(client: TestClient):
+    """Test that responses report their SQL statement count."""
+    post = client.post("/api/v1/posts/", json={"title": "Timed", "content": "Body"}).json()
+
+    assert _server_timing(client.get(f"/api/v1/posts/{post['id']}")) == (1, 0)
+    # Served from the response cache without touching the database
+    assert "server-timing" not in client.get(f"/api/v1/posts/{post['id']}").headers
+
+
+def test_authenticated_listing_has_no_repeated_lookups(
+    client: TestClient, auth_headers, upload_dir, monkeypatch
+):
+    """Test that auth and the handler do not run the same statement twice."""
+    monkeypatch.setattr(settings, "SQL_REPEAT_THRESHOLD", 2)
+    user_cache.clear()
+
+    response = client.get("/api/v1/files/", headers=auth_headers)
+
+    queries, repeated = _server_timing(response)
+    assert queries >= 2
+    assert repeated == 0
+
+
+def test_token_cache_hits_are_exported(client: TestClient, auth_headers, upload_dir):
+    """Test that repeated authenticated requests count as token cache hits."""
+    hits = ("cache_lookups_total", (("cache", "token"), ("result", "hit")))
+    client.get("/api/v1/files/", headers=auth_headers)
+    before = _samples(client).get(hits, 0)
+
+    client.get("/api/v1/files/", headers=auth_headers)
+    client.get("/api/v1/files/", headers=auth_headers)
+
+    assert _samples(client)[hits] == before + 2
+
+
+def test_repeated_statements_are_flagged(caplog):
+    """Test that running one statement shape repeatedly is reported."""
+    async def endpoint(request):
+        async with TestingAsyncSessionLocal() as db:
+            for post_id in range(3):
+                await db.execute(text("SELECT :id"), {"id": post_id})
+        return PlainTextResponse("ok")
+
+    app = SQLAccountingMiddleware(Starlette(routes=[Route("/", endpoint)]), repeat_threshold=3)
+
+    with caplog.at_level(logging.WARNING), TestClient(app) as test_client:
+        response = test_client.get("/")
+
+    assert _server_timing(response) == (3, 1)
+    assert "Possible N+1" in caplog.text
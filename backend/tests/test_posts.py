@@ -0,0 +1,460 @@
+"""Tests for post CRUD endpoints."""
+
+import asyncio
+import csv
+import io
+import json
+from datetime import datetime, timedelta
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects import mysql
+
+from app.models.counter import RowCounter
+from app.models.post import Post, PostArchive, PostStatus
+from app.models.user import User
+from app.routers.post import post_list_query
+from app.services.archive import archive_periodically, run_archiver
+from app.services.counters import POSTS, adjust_counter, reconcile_counters
+from app.services.invalidation import CacheInvalidator, publish_invalidation
+from app.services.response_cache import post_response_cache
+from app.services.schema import schema_version
+from app.services.search import search_query
+from app.utils.pagination import encode_time_cursor
+
+from .conftest import TestingAsyncSessionLocal, async_engine, engine
+
+
+def _create_post(client: TestClient, i: int, status: str = "draft") -> dict:
+    response = client.post("/api/v1/posts/", json={
+        "title": f"Post {i}",
+        "content": f"Content of post {i}",
+        "status": status
+    })
+    assert response.status_code == 201
+    return response.json()
+
+
+def _create_author(client: TestClient) -> dict:
+    # Posts are created on behalf of user 1
+    response = client.post("/api/v1/users/", json={
+        "username": "author", "email": "author@example.com", "password": "password123"
+    })
+    assert response.json()["id"] == 1
+    return response.json()
+
+
+def test_list_posts_offset_pagination(client: TestClient):
+    """Test offset pagination metadata for posts."""
+    for i in range(12):
+        _create_post(client, i)
+
+    response = client.get("/api/v1/posts/?skip=10&limit=5")
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["posts"]) == 2
+    assert data["total"] == 12
+    assert data["page"] == 3
+    assert data["next_cursor"] is None
+
+
+def test_list_posts_cursor_pagination(client: TestClient):
+    """Test walking the post list with keyset cursors."""
+    created = [_create_post(client, i)["id"] for i in range(7)]
+
+    ids = []
+    url = "/api/v1/posts/?limit=3"
+    while url:
+        data = client.get(url).json()
+        ids.extend(p["id"] for p in data["posts"])
+        url = f"/api/v1/posts/?limit=3&cursor={data['next_cursor']}" if data["next_cursor"] else None
+
+    assert ids == created
+
+
+def test_list_posts_filters_and_sort(client: TestClient, test_db):
+    """Test author, status and date filters with newest-first cursor paging."""
+    posts = [_create_post(client, i, status="published" if i % 2 else "draft") for i in range(6)]
+    for i, post in enumerate(posts):
+        test_db.execute(update(Post).where(Post.id == post["id"]).values(
+            user_id=1 + i % 3, created_at=datetime(2024, 1, 1 + i)
+        ))
+    test_db.commit()
+
+    data = client.get("/api/v1/posts/?status=published&sort=newest").json()
+    assert [p["title"] for p in data["posts"]] == ["Post 5", "Post 3", "Post 1"]
+    assert data["total"] == 3
+
+    data = client.get("/api/v1/posts/?author_id=2&sort=oldest").json()
+    assert [p["title"] for p in data["posts"]] == ["Post 1", "Post 4"]
+    assert data["total"] == 2
+
+    data = client.get(
+        "/api/v1/posts/?created_from=2024-01-02T00:00:00&created_to=2024-01-05T00:00:00"
+    ).json()
+    assert [p["title"] for p in data["posts"]] == ["Post 1", "Post 2", "Post 3"]
+
+    titles = []
+    url = "/api/v1/posts/?sort=newest&limit=4"
+    while url:
+        data = client.get(url).json()
+        titles.extend(p["title"] for p in data["posts"])
+        url = data["next_cursor"] and f"/api/v1/posts/?sort=newest&limit=4&cursor={data['next_cursor']}"
+    assert titles == [f"Post {i}" for i in reversed(range(6))]
+
+    assert client.get("/api/v1/posts/?sort=newest&cursor=eyJpZCI6MX0").status_code == 400
+
+
+def _query_plan(query) -> str:
+    """Run a query and return SQLite's plan for it."""
+    plans = []
+
+    def explain(conn, cursor, statement, parameters, context, executemany):
+        rows = cursor.connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)
+        plans.extend(row[-1] for row in rows)
+
+    event.listen(engine, "before_cursor_execute", explain)
+    try:
+        with engine.connect() as conn:
+            conn.execute(query.limit(10)).all()
+    finally:
+        event.remove(engine, "before_cursor_execute", explain)
+    return "\n".join(plans)
+
+
+def test_list_posts_plans_use_composite_indexes(test_db):
+    """Test that filtered, sorted listings read an index in order."""
+    cursor = encode_time_cursor(datetime(2024, 6, 1), 100)
+    cases = [
+        (post_list_query(post_status=PostStatus.PUBLISHED, sort="newest"),
+         "ix_posts_status_created_at_id"),
+        (post_list_query(author_id=7, sort="newest", cursor=cursor),
+         "ix_posts_user_id_created_at_id"),
+        (post_list_query(post_status=PostStatus.DRAFT, created_from=datetime(2024, 1, 1), sort="oldest"),
+         "ix_posts_status_created_at_id"),
+        (post_list_query(created_from=datetime(2024, 1, 1), sort="oldest"),
+         "ix_posts_created_at_id"),
+    ]
+    for query, index in cases:
+        plan = _query_plan(query)
+        assert f"USING INDEX {index}" in plan, plan
+        assert "TEMP B-TREE" not in plan, plan
+
+
+def test_post_status_counters(client: TestClient, test_db):
+    """Test per-status counters across update, delete and reconciliation."""
+    first = _create_post(client, 1)
+    second = _create_post(client, 2, status="published")
+    client.put(f"/api/v1/posts/{first['id']}", json={"status": "published"})
+    client.delete(f"/api/v1/posts/{second['id']}")
+
+    counters = {c.name: c.value for c in test_db.query(RowCounter).all()}
+    assert counters["posts"] == 2
+    assert counters["posts:draft"] == 0
+    assert counters["posts:published"] == 1
+    assert counters["posts:deleted"] == 1
+
+    # Simulate drift, then repair it
+    test_db.query(RowCounter).filter(RowCounter.name == "posts").update({"value": 99})
+    test_db.commit()
+    # The default listing leaves out the deleted post
+    assert client.get("/api/v1/posts/").json()["total"] == 98
+
+    async def reconcile():
+        async with TestingAsyncSessionLocal() as db:
+            return await reconcile_counters(db)
+
+    values = asyncio.run(reconcile())
+    assert values["posts"] == 2
+    assert values["posts:published"] == 1
+    assert client.get("/api/v1/posts/").json()["total"] == 1
+    assert client.get("/api/v1/posts/?status=deleted").json()["total"] == 1
+
+
+def test_adjust_counter_when_seeded_concurrently(client: TestClient, test_db):
+    """Test that losing the race to seed a counter still applies the change."""
+    _create_post(client, 1)
+    test_db.query(RowCounter).delete()
+    test_db.commit()
+
+    seeded = []
+
+    def seed_first(conn, cursor, statement, parameters, context, executemany):
+        # Another transaction seeds the counter while this one counts rows
+        if not seeded and statement.lstrip().upper().startswith("SELECT COUNT(*)"):
+            seeded.append(True)
+            cursor.execute("INSERT INTO row_counters (name, value) VALUES ('posts', 10)")
+
+    async def adjust():
+        async with TestingAsyncSessionLocal() as db:
+            await adjust_counter(db, POSTS, 1)
+            await db.commit()
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", seed_first)
+    try:
+        asyncio.run(adjust())
+    finally:
+        event.remove(async_engine.sync_engine, "before_cursor_execute", seed_first)
+    assert seeded
+    assert test_db.get(RowCounter, "posts").value == 11
+
+
+def test_export_posts_csv(client: TestClient, monkeypatch):
+    """Test that the CSV export streams a header and every post in id order."""
+    monkeypatch.setattr("app.services.export.EXPORT_BATCH_SIZE", 2)
+    for i in range(5):
+        _create_post(client, i, status="published")
+
+    response = client.get("/api/v1/posts/export?format=csv")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["title"] for row in rows] == [f"Post {i}" for i in range(5)]
+    assert rows[0]["status"] == "published"
+
+
+def test_export_posts_leaves_out_deleted(client: TestClient):
+    """Test that deleted posts are only exported when asked for."""
+    kept = _create_post(client, 1, status="published")
+    deleted = _create_post(client, 2, status="published")
+    client.delete(f"/api/v1/posts/{deleted['id']}")
+
+    lines = client.get("/api/v1/posts/export").text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [kept["id"]]
+
+    lines = client.get("/api/v1/posts/export?include_deleted=true").text.splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [kept["id"], deleted["id"]]
+
+
+def _create_text_post(client: TestClient, title: str, content: str) -> dict:
+    response = client.post("/api/v1/posts/", json={"title": title, "content": content})
+    assert response.status_code == 201
+    return response.json()
+
+
+def test_search_posts_ranked(client: TestClient):
+    """Test that search returns matching posts with the best match first."""
+    weak = _create_text_post(client, "Cooking notes", "A short aside about async python.")
+    strong = _create_text_post(client, "Async python", "Async python patterns in async code.")
+    _create_text_post(client, "Gardening", "Tomatoes and basil.")
+
+    response = client.get("/api/v1/posts/search?q=async python")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert [post["id"] for post in data["posts"]] == [strong["id"], weak["id"]]
+    assert data["posts"][0]["score"] >= data["posts"][1]["score"]
+    assert data["has_more"] is False
+
+    page = client.get("/api/v1/posts/search?q=python&limit=1").json()
+    assert len(page["posts"]) == 1
+    assert page["has_more"] is True
+
+
+def test_search_index_follows_updates_and_deletes(client: TestClient):
+    """Test that edits and deletes are reflected in search results."""
+    post = _create_text_post(client, "Original title", "Some content")
+
+    client.put(f"/api/v1/posts/{post['id']}", json={"title": "Renamed headline"})
+    assert client.get("/api/v1/posts/search?q=original").json()["posts"] == []
+    assert len(client.get("/api/v1/posts/search?q=headline").json()["posts"]) == 1
+
+    client.delete(f"/api/v1/posts/{post['id']}")
+    assert client.get("/api/v1/posts/search?q=headline").json()["posts"] == []
+
+
+def test_search_ignores_query_syntax(client: TestClient):
+    """Test that FTS operators in the query are treated as plain text."""
+    _create_text_post(client, "Quoted", "Text with NEAR and OR words")
+
+    response = client.get('/api/v1/posts/search?q="NEAR(*) OR')
+
+    assert response.status_code == 200
+    assert len(response.json()["posts"]) == 1
+
+
+def test_search_requires_every_word_on_both_backends(client: TestClient):
+    """Test that SQLite and MySQL queries both require all search words."""
+    both = _create_text_post(client, "Cache index", "Tuning a cache index")
+    _create_text_post(client, "Cache only", "Tuning a cache")
+
+    data = client.get("/api/v1/posts/search?q=cache index").json()
+    assert [post["id"] for post in data["posts"]] == [both["id"]]
+
+    compiled = search_query("mysql", 'cache +index -"x').compile(dialect=mysql.dialect())
+    assert "IN BOOLEAN MODE" in str(compiled)
+    assert '+"cache" +"index" +"x"' in compiled.params.values()
+    assert search_query("mysql", "+-*") is None
+
+
+def test_get_post_etag_and_cache_invalidation(client: TestClient, test_db):
+    """Test ETag revalidation and that updates invalidate the cached body."""
+    post = _create_post(client, 1)
+
+    first = client.get(f"/api/v1/posts/{post['id']}")
+    etag = first.headers["etag"]
+    assert first.json()["title"] == "Post 1"
+
+    not_modified = client.get(f"/api/v1/posts/{post['id']}", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+
+    # Changes made behind the API's back are not seen while the body is cached
+    test_db.execute(update(Post).where(Post.id == post["id"]).values(title="Sneaky"))
+    test_db.commit()
+    assert client.get(f"/api/v1/posts/{post['id']}").json()["title"] == "Post 1"
+
+    client.put(f"/api/v1/posts/{post['id']}", json={"title": "Edited"})
+    edited = client.get(f"/api/v1/posts/{post['id']}", headers={"If-None-Match": etag})
+    assert edited.status_code == 200
+    assert edited.json()["title"] == "Edited"
+
+
+def test_post_edited_by_another_worker_is_not_served_from_cache(client: TestClient):
+    """Test that an edit published by another worker drops the cached body."""
+    post = _create_post(client, 1)
+    invalidator = CacheInvalidator()
+    invalidator.register("post", post_response_cache)
+    asyncio.run(invalidator.poll(async_engine))
+    assert client.get(f"/api/v1/posts/{post['id']}").json()["title"] == "Post 1"
+
+    async def edit_elsewhere():
+        async with TestingAsyncSessionLocal() as db:
+            (await db.get(Post, post["id"])).title = "Edited elsewhere"
+            publish_invalidation(db, "post", post["id"])
+            await db.commit()
+
+    asyncio.run(edit_elsewhere())
+    assert asyncio.run(invalidator.poll(async_engine)) == 1
+    assert client.get(f"/api/v1/posts/{post['id']}").json()["title"] == "Edited elsewhere"
+
+
+def test_archiver_moves_deleted_and_stale_unpublished_posts(client: TestClient, test_db):
+    """Test batched archiving, counters and the restore endpoint."""
+    _create_author(client)
+    kept = _create_post(client, 0, status="published")
+    recent = _create_post(client, 1, status="unpublished")
+    stale = _create_post(client, 2, status="unpublished")
+    deleted = [_create_post(client, i, status="published") for i in range(3, 6)]
+    for post in deleted:
+        client.delete(f"/api/v1/posts/{post['id']}")
+    test_db.execute(update(Post).where(Post.id == stale["id"]).values(updated_at=datetime(2000, 1, 1)))
+    test_db.commit()
+
+    archived = asyncio.run(run_archiver(
+        TestingAsyncSessionLocal, unpublished_after=timedelta(days=30), batch_size=2, pause=0
+    ))
+    assert archived == 4
+    assert {p.id for p in test_db.query(Post)} == {kept["id"], recent["id"]}
+    assert test_db.query(PostArchive).count() == 4
+
+    # The counters followed the moved rows
+    counters = {c.name: c.value for c in test_db.query(RowCounter)}
+
+    async def reconcile():
+        async with TestingAsyncSessionLocal() as db:
+            return await reconcile_counters(db)
+
+    actual = asyncio.run(reconcile())
+    assert counters == {name: actual[name] for name in counters}
+    assert counters["posts"] == 2
+    assert client.get(f"/api/v1/posts/{deleted[0]['id']}").status_code == 404
+
+    restored = client.post(f"/api/v1/posts/{deleted[0]['id']}/restore")
+    assert restored.status_code == 200
+    assert restored.json()["id"] == deleted[0]["id"]
+    assert restored.json()["status"] == "draft"
+    restored = client.post(f"/api/v1/posts/{stale['id']}/restore").json()
+    assert restored["status"] == "unpublished"
+    assert test_db.query(PostArchive).count() == 2
+    assert client.get("/api/v1/posts/").json()["total"] == 4
+    assert client.get("/api/v1/posts/search?q=Content").json()["posts"]
+
+
+def test_archiver_skips_reused_post_ids(client: TestClient, test_db):
+    """Test that a post reusing an archived id neither blocks nor is restored."""
+    _create_author(client)
+    _create_post(client, 1)
+    second = _create_post(client, 2)
+    client.delete(f"/api/v1/posts/{second['id']}")
+    assert asyncio.run(run_archiver(TestingAsyncSessionLocal, pause=0)) == 1
+
+    # Ids of archived posts are not handed out again
+    third = _create_post(client, 3)
+    assert third["id"] > second["id"]
+
+    # InnoDB before MySQL 8.0 can still reuse them after a restart
+    test_db.add(Post(id=second["id"], title="Reused", content="Reused id", user_id=1))
+    test_db.commit()
+    client.delete(f"/api/v1/posts/{second['id']}")
+    client.delete(f"/api/v1/posts/{third['id']}")
+
+    assert asyncio.run(run_archiver(TestingAsyncSessionLocal, pause=0)) == 1
+    assert test_db.get(PostArchive, second["id"]).title == "Post 2"
+    assert test_db.get(Post, second["id"]).title == "Reused"
+
+    response = client.post(f"/api/v1/posts/{second['id']}/restore")
+    assert response.status_code == 409
+    assert test_db.get(Post, second["id"]).status == PostStatus.DELETED
+    assert client.post(f"/api/v1/posts/{third['id']}/restore").status_code == 200
+
+
+def test_restore_archived_post_of_deleted_author(client: TestClient, test_db):
+    """Test that restoring a post whose author is gone is refused as such."""
+    author = _create_author(client)
+    post = _create_post(client, 1)
+    client.delete(f"/api/v1/posts/{post['id']}")
+    assert asyncio.run(run_archiver(TestingAsyncSessionLocal, pause=0)) == 1
+    test_db.delete(test_db.get(User, author["id"]))
+    test_db.commit()
+
+    response = client.post(f"/api/v1/posts/{post['id']}/restore")
+
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Post author no longer exists"
+    assert test_db.get(PostArchive, post["id"]) is not None
+
+
+def test_only_one_worker_runs_the_archiver(monkeypatch):
+    """Test that concurrent archiver loops elect a single worker per round."""
+    schema_version.create(engine, checkfirst=True)
+    runs = []
+
+    async def fake_run_archiver(*args):
+        runs.append(args)
+        await asyncio.sleep(0.1)
+        return 0
+
+    monkeypatch.setattr("app.services.archive.run_archiver", fake_run_archiver)
+
+    async def scenario():
+        workers = [
+            asyncio.create_task(archive_periodically(async_engine, TestingAsyncSessionLocal, 60))
+            for _ in range(3)
+        ]
+        await asyncio.sleep(0.3)
+        for worker in workers:
+            worker.cancel()
+        await asyncio.gather(*workers, return_exceptions=True)
+
+    asyncio.run(scenario())
+    assert len(runs) == 1
+    # The lock was released after the run
+    with engine.connect() as conn:
+        assert conn.execute(select(schema_version)).all() == []
+
+
+def test_restore_post_not_yet_archived(client: TestClient):
+    """Test restoring a deleted post that is still in the posts table."""
+    post = _create_post(client, 1, status="published")
+    assert client.post(f"/api/v1/posts/{post['id']}/restore").status_code == 409
+
+    client.delete(f"/api/v1/posts/{post['id']}")
+    assert client.get("/api/v1/posts/").json()["posts"] == []
+
+    response = client.post(f"/api/v1/posts/{post['id']}/restore")
+    assert response.status_code == 200
+    assert response.json()["status"] == "draft"
+    assert [p["id"] for p in client.get("/api/v1/posts/").json()["posts"]] == [post["id"]]
+    assert client.post("/api/v1/posts/999/restore").status_code == 404
@@ -0,0 +1,127 @@
+"""Tests for fingerprint-based schema setup."""
+
+import asyncio
+from datetime import datetime
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, String, Table, delete, inspect, insert, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
+
+from app.database import Base
+from app.models import Post, PostStatus, User
+from app.services.schema import FINGERPRINT_ROW, LOCK_ROW, ensure_schema, schema_version
+
+
+@pytest.fixture
+def make_engine(tmp_path):
+    """Create engines on a fresh SQLite file, one per simulated worker."""
+    url = f"sqlite+aiosqlite:///{tmp_path / 'schema.db'}"
+    return lambda: create_async_engine(url, poolclass=NullPool)
+
+
+async def _table_names(engine) -> list[str]:
+    async with engine.connect() as conn:
+        return await conn.run_sync(lambda sync_conn: inspect(sync_conn).get_table_names())
+
+
+def test_migrates_once_then_only_checks_fingerprint(make_engine):
+    """The first boot creates the tables; later boots find them current."""
+    async def scenario():
+        engine = make_engine()
+        assert await ensure_schema(engine, Base.metadata) == "migrated"
+        assert {"users", "posts", "schema_version"} <= set(await _table_names(engine))
+        assert await ensure_schema(engine, Base.metadata) == "current"
+
+        # A changed model changes the fingerprint
+        metadata = MetaData()
+        for table in Base.metadata.tables.values():
+            table.to_metadata(metadata)
+        Table("audit_log", metadata, Column("id", Integer, primary_key=True), Column("event", String(50)))
+        assert await ensure_schema(engine, metadata) == "migrated"
+        assert "audit_log" in await _table_names(engine)
+
+    asyncio.run(scenario())
+
+
+def test_migration_adds_indexes_to_existing_tables(make_engine):
+    """Indexes added to a model are created on a table that already exists."""
+    async def scenario():
+        engine = make_engine()
+        await ensure_schema(engine, Base.metadata)
+        async with engine.begin() as conn:
+            await conn.execute(text("DROP INDEX ix_posts_status_created_at_id"))
+            await conn.execute(delete(schema_version).where(schema_version.c.name == FINGERPRINT_ROW))
+        assert await ensure_schema(engine, Base.metadata) == "migrated"
+        async with engine.connect() as conn:
+            return await conn.run_sync(
+                lambda sync_conn: {index["name"] for index in inspect(sync_conn).get_indexes("posts")}
+            )
+
+    assert "ix_posts_status_created_at_id" in asyncio.run(scenario())
+
+
+def test_migration_creates_and_fills_missing_search_table(make_engine):
+    """A posts table that predates posts_fts gets the table and its rows."""
+    async def scenario():
+        engine = make_engine()
+        await ensure_schema(engine, Base.metadata)
+        async with engine.begin() as conn:
+            await conn.execute(insert(User).values(
+                id=1, username="author", email="author@example.com", password_hash="x"
+            ))
+            await conn.execute(insert(Post).values([
+                {"id": 1, "title": "Kept", "content": "Indexed body", "user_id": 1},
+                {"id": 2, "title": "Gone", "content": "Deleted body", "user_id": 1,
+                 "status": PostStatus.DELETED},
+            ]))
+            await conn.execute(text("DROP TABLE posts_fts"))
+            await conn.execute(delete(schema_version).where(schema_version.c.name == FINGERPRINT_ROW))
+        assert await ensure_schema(engine, Base.metadata) == "migrated"
+        async with engine.connect() as conn:
+            return (await conn.execute(text(
+                "SELECT rowid FROM posts_fts WHERE posts_fts MATCH 'body'"
+            ))).scalars().all()
+
+    assert asyncio.run(scenario()) == [1]
+
+
+def test_only_one_worker_migrates(make_engine):
+    """Workers booting together elect a single leader."""
+    async def scenario():
+        return await asyncio.gather(*(
+            ensure_schema(make_engine(), Base.metadata, poll_interval=0.01) for _ in range(4)
+        ))
+
+    outcomes = asyncio.run(scenario())
+    assert outcomes.count("migrated") == 1
+    assert outcomes.count("waited") == 3
+
+
+def test_abandoned_lock_expires(make_engine):
+    """A lock left by a crashed leader is taken over after the timeout."""
+    async def scenario():
+        engine = make_engine()
+        async with engine.begin() as conn:
+            await conn.run_sync(schema_version.create)
+            await conn.execute(insert(schema_version).values(
+                name=LOCK_ROW, value="crashed:1", updated_at=datetime(2000, 1, 1)
+            ))
+        return await ensure_schema(engine, Base.metadata, lock_timeout=1.0)
+
+    assert asyncio.run(scenario()) == "migrated"
+
+
+def test_lock_held_too_long_times_out(make_engine):
+    """Waiting gives up when another worker keeps the lock."""
+    async def scenario():
+        engine = make_engine()
+        async with engine.begin() as conn:
+            await conn.run_sync(schema_version.create)
+            await conn.execute(insert(schema_version).values(
+                name=LOCK_ROW, value="busy:1", updated_at=datetime(3000, 1, 1)
+            ))
+        await ensure_schema(engine, Base.metadata, lock_timeout=0.2, poll_interval=0.05)
+
+    with pytest.raises(TimeoutError):
+        asyncio.run(scenario())
@@ -0,0 +1,53 @@
+"""Tests for synthetic data seeding."""
+
+import random
+from collections import Counter
+from datetime import datetime
+
+from fastapi.testclient import TestClient
+from sqlalchemy import func, select
+
+from app.models import Post, Upload, User
+from app.models.post import PostStatus
+from app.services.search import posts_fts
+from app.services.seeding import seed_posts, seed_uploads, seed_users
+
+from .conftest import engine
+
+NOW = datetime(2024, 1, 1)
+
+
+def test_seed_loads_users_posts_and_files(test_db, tmp_path):
+    """Seeded posts mix statuses, favour a few authors and are searchable."""
+    rng = random.Random(42)
+    user_ids = seed_users(engine, 100, "password123", rng, NOW)
+    assert seed_posts(engine, 2000, user_ids, rng, NOW) == 2000
+    assert seed_uploads(engine, 5, user_ids, tmp_path, rng, NOW, size=64) == 5
+
+    assert len(user_ids) == 100
+    assert len({user.password_hash for user in test_db.query(User)}) == 1
+
+    statuses = Counter(test_db.scalars(select(Post.status)))
+    assert set(statuses) == set(PostStatus)
+    authors = Counter(test_db.scalars(select(Post.user_id)))
+    top_tenth = sum(count for _, count in authors.most_common(10))
+    assert top_tenth > 2000 * 0.4
+
+    with engine.connect() as conn:
+        indexed = conn.execute(select(func.count()).select_from(posts_fts)).scalar_one()
+    assert indexed == 2000 - statuses[PostStatus.DELETED]
+
+    for upload in test_db.query(Upload):
+        assert (tmp_path / upload.stored_name).stat().st_size == 64
+
+
+def test_seeded_users_can_log_in_and_reseeding_continues(client: TestClient):
+    """All users share the given password; a second run adds new usernames."""
+    first = seed_users(engine, 3, "password123", random.Random(1), NOW)
+    second = seed_users(engine, 3, "password123", random.Random(1), NOW)
+    assert second[0] == first[-1] + 1
+
+    response = client.post(
+        "/api/v1/auth/login", json={"username": f"user{second[-1]}", "password": "password123"}
+    )
+    assert response.status_code == 200
@@ -0,0 +1,45 @@
+"""Tests for the production server launcher."""
+
+import os
+from unittest import mock
+
+from app.config import Settings
+from app.server import prepare_environment, server_options
+from app.utils.prometheus import MULTIPROC_DIR_ENV
+
+
+def test_server_options_follow_settings(monkeypatch):
+    """Test worker sizing, fast loop/parser and restart limits."""
+    monkeypatch.setattr("app.server.available_cpus", lambda: 6)
+    options = server_options(Settings(SERVER_BACKLOG=512, SERVER_KEEP_ALIVE_SECONDS=20))
+    assert options["workers"] == 6
+    assert options["loop"] == "uvloop"
+    assert options["http"] == "httptools"
+    assert options["backlog"] == 512
+    assert options["timeout_keep_alive"] == 20
+    assert options["limit_max_requests"] == 10000
+
+    options = server_options(Settings(SERVER_WORKERS=2, SERVER_MAX_REQUESTS=0))
+    assert options["workers"] == 2
+    assert options["limit_max_requests"] is None
+
+
+def test_prepare_environment_for_several_workers(monkeypatch, tmp_path):
+    """Test that workers share a metrics directory and split the hash pool."""
+    monkeypatch.setattr("app.server.available_cpus", lambda: 8)
+    environ = {key: value for key, value in os.environ.items()
+               if key not in (MULTIPROC_DIR_ENV, "PASSWORD_HASH_WORKERS")}
+
+    # The launcher's writes to the environment are rolled back afterwards
+    with mock.patch.dict(os.environ, environ, clear=True):
+        prepare_environment(Settings(), workers=4)
+        assert os.path.isdir(os.environ[MULTIPROC_DIR_ENV])
+        assert os.environ["PASSWORD_HASH_WORKERS"] == "2"
+
+        stale = tmp_path / "counter_123.db"
+        stale.write_bytes(b"")
+        os.environ[MULTIPROC_DIR_ENV] = str(tmp_path)
+        prepare_environment(Settings(PASSWORD_HASH_WORKERS=3), workers=4)
+        assert not stale.exists()
+        # An explicit pool size is left alone
+        assert os.environ["PASSWORD_HASH_WORKERS"] == "2"
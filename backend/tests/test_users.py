@@ -1,6 +1,14 @@
 """Tests for user CRUD endpoints."""
 
+import json
+
 from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.schemas.user import UserResponse
+from app.services import hashing
+
+from .conftest import async_engine
 
 
 def test_health_check(client: TestClient):
@@ -288,3 +296,209 @@ def test_pagination_metadata_accuracy(client: TestClient):
     data = response.json()
     assert data["page"] == 3
     assert len(data["users"]) == 5
+
+
+def test_list_users_cursor_pagination(client: TestClient):
+    """Test walking the user list with keyset cursors."""
+    for i in range(15):
+        client.post("/api/v1/users/", json={
+            "username": f"cursoruser{i}",
+            "email": f"cursor{i}@example.com",
+            "password": "password123"
+        })
+
+    response = client.get("/api/v1/users/?limit=10")
+    data = response.json()
+    assert len(data["users"]) == 10
+    assert data["next_cursor"] is not None
+
+    response = client.get(f"/api/v1/users/?limit=10&cursor={data['next_cursor']}")
+    assert response.status_code == 200
+    data2 = response.json()
+    assert len(data2["users"]) == 5
+    assert data2["page"] is None
+    assert data2["next_cursor"] is None
+
+    seen = [u["id"] for u in data["users"]] + [u["id"] for u in data2["users"]]
+    assert seen == sorted(set(seen))
+
+
+def test_list_users_invalid_cursor(client: TestClient):
+    """Test that a malformed cursor returns 400."""
+    response = client.get("/api/v1/users/?cursor=not-a-cursor")
+
+    assert response.status_code == 400
+
+
+def test_list_users_total_tracks_deletes(client: TestClient):
+    """Test that the maintained total follows creates and deletes."""
+    ids = []
+    for i in range(3):
+        response = client.post("/api/v1/users/", json={
+            "username": f"counted{i}",
+            "email": f"counted{i}@example.com",
+            "password": "password123"
+        })
+        ids.append(response.json()["id"])
+    client.delete(f"/api/v1/users/{ids[0]}")
+
+    assert client.get("/api/v1/users/").json()["total"] == 2
+
+
+def test_list_users_without_total(client: TestClient):
+    """Test that include_total=false skips the total."""
+    response = client.get("/api/v1/users/?include_total=false")
+
+    assert response.status_code == 200
+    assert response.json()["total"] is None
+
+
+def test_create_users_bulk_partial_success(client: TestClient):
+    """Test bulk creation reports a result per item and skips duplicates."""
+    client.post("/api/v1/users/", json={
+        "username": "existing",
+        "email": "existing@example.com",
+        "password": "password123"
+    })
+
+    users = [
+        {"username": "bulk1", "email": "bulk1@example.com", "password": "password123"},
+        {"username": "existing", "email": "new@example.com", "password": "password123"},
+        {"username": "bulk2", "email": "existing@example.com", "password": "password123"},
+        {"username": "bulk1", "email": "again@example.com", "password": "password123"},
+        {"username": "bulk3", "email": "bulk3@example.com", "password": "password123"},
+    ]
+    response = client.post("/api/v1/users/bulk", json={"users": users})
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["created"] == 2
+    assert data["failed"] == 3
+    assert [result["success"] for result in data["results"]] == [True, False, False, False, True]
+    assert data["results"][1]["error"] == "Username already exists"
+    assert data["results"][2]["error"] == "Email already exists"
+    assert data["results"][3]["error"] == "Username already exists"
+    assert data["results"][4]["user"]["username"] == "bulk3"
+    assert "password_hash" not in data["results"][0]["user"]
+
+    assert client.get("/api/v1/users/").json()["total"] == 3
+    login = client.post(
+        "/api/v1/auth/login",
+        json={"username": "bulk3", "password": "password123"}
+    )
+    assert login.status_code == 200
+
+
+def test_create_users_bulk_batches(client: TestClient, monkeypatch):
+    """Test that bulk creation spans several insert batches."""
+    monkeypatch.setattr("app.routers.users.BULK_INSERT_BATCH_SIZE", 2)
+    users = [
+        {"username": f"batch{i}", "email": f"batch{i}@example.com", "password": "password123"}
+        for i in range(5)
+    ]
+
+    data = client.post("/api/v1/users/bulk", json={"users": users}).json()
+
+    assert data["created"] == 5
+    assert [result["user"]["username"] for result in data["results"]] == [
+        f"batch{i}" for i in range(5)
+    ]
+    assert client.get("/api/v1/users/").json()["total"] == 5
+
+
+def test_create_users_bulk_hashes_without_a_connection(client: TestClient, monkeypatch):
+    """Test that no database connection is held while passwords are hashed."""
+    checked_out = 0
+    held_while_hashing = []
+
+    def on_checkout(*args):
+        nonlocal checked_out
+        checked_out += 1
+
+    def on_checkin(*args):
+        nonlocal checked_out
+        checked_out -= 1
+
+    async def hash_passwords(plain_passwords):
+        held_while_hashing.append(checked_out)
+        return await hashing.hash_passwords_async(plain_passwords)
+
+    monkeypatch.setattr("app.routers.users.hash_passwords_async", hash_passwords)
+    pool = async_engine.sync_engine.pool
+    event.listen(pool, "checkout", on_checkout)
+    event.listen(pool, "checkin", on_checkin)
+    try:
+        data = client.post("/api/v1/users/bulk", json={"users": [
+            {"username": "hashed", "email": "hashed@example.com", "password": "password123"}
+        ]}).json()
+    finally:
+        event.remove(pool, "checkout", on_checkout)
+        event.remove(pool, "checkin", on_checkin)
+
+    assert data["created"] == 1
+    assert held_while_hashing == [0]
+
+
+def test_export_users_ndjson(client: TestClient, monkeypatch):
+    """Test that the NDJSON export streams every user without password hashes."""
+    monkeypatch.setattr("app.services.export.EXPORT_BATCH_SIZE", 2)
+    for i in range(5):
+        client.post("/api/v1/users/", json={
+            "username": f"export{i}",
+            "email": f"export{i}@example.com",
+            "password": "password123"
+        })
+
+    response = client.get("/api/v1/users/export")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    records = [json.loads(line) for line in response.text.splitlines()]
+    assert [record["username"] for record in records] == [f"export{i}" for i in range(5)]
+    assert "password_hash" not in records[0]
+    assert records[0]["role"] == "user"
+
+
+def test_export_users_invalid_format(client: TestClient):
+    """Test that unsupported export formats are rejected."""
+    assert client.get("/api/v1/users/export?format=xml").status_code == 422
+
+
+def test_list_users_fast_path_matches_schema(client: TestClient):
+    """Test that the unvalidated list output matches UserResponse serialization."""
+    created = client.post("/api/v1/users/", json={
+        "username": "fastpath",
+        "email": "fastpath@example.com",
+        "password": "password123",
+        "full_name": "Fast Path",
+        "role": "admin"
+    }).json()
+
+    listed = client.get("/api/v1/users/").json()["users"][0]
+
+    assert listed == created
+    assert list(listed) == list(UserResponse.model_fields)
+
+
+def test_get_user_etag_not_modified(client: TestClient):
+    """Test that a matching If-None-Match gets 304 until the user changes."""
+    user = client.post("/api/v1/users/", json={
+        "username": "etaguser",
+        "email": "etag@example.com",
+        "password": "password123"
+    }).json()
+
+    response = client.get(f"/api/v1/users/{user['id']}")
+    etag = response.headers["etag"]
+    assert response.headers["cache-control"] == "no-cache"
+
+    cached = client.get(f"/api/v1/users/{user['id']}", headers={"If-None-Match": etag})
+    assert cached.status_code == 304
+
+    client.put(f"/api/v1/users/{user['id']}", json={"full_name": "Renamed"})
+    response = client.get(f"/api/v1/users/{user['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["full_name"] == "Renamed"
+
+    client.delete(f"/api/v1/users/{user['id']}")
+    assert client.get(f"/api/v1/users/{user['id']}").status_code == 404